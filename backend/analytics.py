@@ -0,0 +1,293 @@
+"""analytics.py – Incremental analytics counters kept in the `analytics` table.
+
+Proposal inserts, updates and deletes are picked up from the session flush and
+applied as per-key deltas to the `proposalsByStatus`, `monthlyProposals` and
+`teamPerformance` rows inside the same transaction.  Bulk statements, which
+bypass the flush, pass their before/after rows to `proposal_deltas` and
+`record_deltas` instead.  The full GROUP BY
+recompute (`update_analytics`) runs in a background refresher that coalesces
+bursts of writes into at most one recompute per refresh interval.  Its GROUP BY
+queries run on the read pool; the writer (a single connection on SQLite) is
+only taken for the short UPDATE publishing the result.
+"""
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import ReadSessionLocal, SessionLocal
+from models import Analytics, Proposal, User
+
+ANALYTICS_KEYS = ["proposalsByStatus", "proposalsByPriority", "monthlyProposals", "teamPerformance", "recentActivity"]
+COUNTER_KEYS = ["proposalsByStatus", "monthlyProposals", "teamPerformance"]
+META_KEY = "_meta"
+
+
+def _monthly_window_start() -> datetime:
+    """Start of the window counted by `monthlyProposals` (first day of the current month)."""
+    return datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def init_analytics(db: Session) -> None:
+    for key in ANALYTICS_KEYS + [META_KEY]:
+        if not db.query(Analytics).filter(Analytics.key == key).first():
+            db.add(Analytics(key=key, data={}))
+    db.commit()
+
+
+def compute_analytics(db: Session) -> Dict[str, dict]:
+    """Full GROUP BY recompute of the counter rows (O(table size)); read-only."""
+    status_counts = db.query(Proposal.status, func.count(Proposal.id)).group_by(Proposal.status).all()
+    proposals_by_status = {s or "Unknown": c for s, c in status_counts}
+
+    monthly = (
+        db.query(
+            func.strftime("%Y-%m", Proposal.created_at).label("month"),
+            func.count(Proposal.id),
+        )
+        .filter(Proposal.created_at >= _monthly_window_start())
+        .group_by("month")
+        .all()
+    )
+    monthly_dict = {m: c for m, c in monthly}
+
+    team_perf = (
+        db.query(User.username, func.count(Proposal.id))
+        .join(Proposal, Proposal.owner_id == User.id)
+        .group_by(User.username)
+        .all()
+    )
+    team_perf_dict = {u: c for u, c in team_perf}
+
+    return {
+        "proposalsByStatus": proposals_by_status,
+        "monthlyProposals": monthly_dict,
+        "teamPerformance": team_perf_dict,
+        META_KEY: {"refreshedAt": datetime.utcnow().isoformat()},
+    }
+
+
+def publish_analytics(db: Session, mapping: Dict[str, dict]) -> None:
+    """Overwrite the counter rows with *mapping* in a single commit."""
+    for key, data in mapping.items():
+        db.query(Analytics).filter(Analytics.key == key).update({"data": data})
+    db.commit()
+
+
+def update_analytics(read_db: Session, write_db: Session) -> None:
+    """Recompute on *read_db*, then publish the result on *write_db*."""
+    mapping = compute_analytics(read_db)
+    read_db.rollback()  # end the read transaction before taking the writer
+    publish_analytics(write_db, mapping)
+
+
+# INCREMENTAL DELTAS
+def _month_key(created_at: Optional[datetime]) -> Optional[str]:
+    if created_at is None or created_at < _monthly_window_start():
+        return None
+    return created_at.strftime("%Y-%m")
+
+
+def _old_value(state, attr: str):
+    """Value of *attr* before the current flush (falls back to the current value)."""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.object, attr)
+
+
+def _contribution(status, created_at, owner_id) -> Dict[str, Counter]:
+    """Counter keys a single proposal row contributes to."""
+    out = {key: Counter() for key in COUNTER_KEYS}
+    out["proposalsByStatus"][status or "Unknown"] += 1
+    month = _month_key(created_at)
+    if month:
+        out["monthlyProposals"][month] += 1
+    if owner_id is not None:
+        out["teamPerformance"][owner_id] += 1
+    return out
+
+
+def _merge(total: Dict[str, Counter], part: Dict[str, Counter], sign: int) -> None:
+    for key, counter in part.items():
+        for k, v in counter.items():
+            total[key][k] += sign * v
+
+
+def collect_proposal_deltas(session: Session) -> Dict[str, Counter]:
+    """Per-key deltas for the Proposal rows flushed in *session* (call from after_flush)."""
+    deltas: Dict[str, Counter] = defaultdict(Counter)
+    for obj in session.new:
+        if isinstance(obj, Proposal):
+            _merge(deltas, _contribution(obj.status, obj.created_at, obj.owner_id), +1)
+    for obj in session.deleted:
+        if isinstance(obj, Proposal):
+            state = inspect(obj)
+            _merge(deltas, _contribution(
+                _old_value(state, "status"), _old_value(state, "created_at"), _old_value(state, "owner_id")
+            ), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, Proposal):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in ("status", "created_at", "owner_id")):
+            continue
+        _merge(deltas, _contribution(
+            _old_value(state, "status"), _old_value(state, "created_at"), _old_value(state, "owner_id")
+        ), -1)
+        _merge(deltas, _contribution(obj.status, obj.created_at, obj.owner_id), +1)
+    return _nonzero(deltas)
+
+
+def proposal_deltas(removed: Iterable[tuple] = (), added: Iterable[tuple] = ()) -> Dict[str, Counter]:
+    """Per-key deltas for proposal rows written outside the ORM flush (bulk statements).
+
+    Rows are ``(status, created_at, owner_id)`` before (*removed*) and after (*added*) the change.
+    """
+    deltas: Dict[str, Counter] = defaultdict(Counter)
+    for row in removed:
+        _merge(deltas, _contribution(*row), -1)
+    for row in added:
+        _merge(deltas, _contribution(*row), +1)
+    return _nonzero(deltas)
+
+
+def _nonzero(deltas: Dict[str, Counter]) -> Dict[str, Counter]:
+    return {key: Counter({k: v for k, v in c.items() if v}) for key, c in deltas.items() if any(c.values())}
+
+
+def apply_deltas(connection, deltas: Dict[str, Counter]) -> None:
+    """Apply per-key deltas to the analytics rows using *connection* (same transaction)."""
+    if not deltas:
+        return
+    team = deltas.get("teamPerformance")
+    if team:
+        # teamPerformance is keyed by username; owner ids only touch the users PK index
+        names = dict(connection.execute(
+            select(User.id, User.username).where(User.id.in_(list(team)))
+        ).all())
+        deltas["teamPerformance"] = Counter({names[i]: v for i, v in team.items() if i in names})
+
+    table = Analytics.__table__
+    for key, counter in deltas.items():
+        row = connection.execute(select(table.c.data).where(table.c.key == key)).first()
+        if row is None:
+            continue
+        data = dict(row.data or {})
+        for k, v in counter.items():
+            value = data.get(k, 0) + v
+            if value > 0:
+                data[k] = value
+            else:
+                data.pop(k, None)
+        connection.execute(table.update().where(table.c.key == key).values(data=data))
+
+
+def record_deltas(session: Session, deltas: Dict[str, Counter]) -> None:
+    """Apply *deltas* in *session*'s transaction and schedule a refresh once it commits."""
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+        session.info["analytics_dirty"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def track_proposal_changes(session, flush_context):
+    record_deltas(session, collect_proposal_deltas(session))
+
+
+@event.listens_for(Session, "after_commit")
+def schedule_refresh(session):
+    if session.info.pop("analytics_dirty", False):
+        refresher.mark_dirty()
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_refresh(session):
+    session.info.pop("analytics_dirty", None)
+
+
+# BACKGROUND REFRESHER
+class AnalyticsRefresher:
+    """Worker thread that debounces "dirty" signals into periodic full recomputes.
+
+    Writes only call `mark_dirty()`; the thread recomputes at most once per
+    `interval` seconds while writes keep arriving, and at least once per
+    `max_idle` seconds as a reconciliation pass.
+    """
+
+    def __init__(self, interval: float, max_idle: float):
+        self.interval = interval
+        self.max_idle = max_idle
+        self.last_refresh: Optional[float] = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty.is_set()
+
+    def mark_dirty(self) -> None:
+        self._dirty.set()
+
+    def refresh_now(self) -> None:
+        # cleared before reading: a write committed after the read snapshot (whose deltas the
+        # published result overwrites) marks dirty again and gets the next recompute
+        self._dirty.clear()
+        with ReadSessionLocal() as read_db, SessionLocal() as write_db:
+            update_analytics(read_db, write_db)
+        self.last_refresh = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._dirty.wait(self.max_idle)
+            if self._stop.is_set():
+                break
+            if self.last_refresh is not None:
+                # coalesce: everything marked dirty until the interval elapses shares one recompute
+                remaining = self.interval - (time.monotonic() - self.last_refresh)
+                if remaining > 0 and self._stop.wait(remaining):
+                    break
+            try:
+                self.refresh_now()
+            except Exception:
+                self._dirty.set()
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._dirty.set()
+
+
+refresher = AnalyticsRefresher(
+    interval=settings.ANALYTICS_REFRESH_INTERVAL_SECONDS,
+    max_idle=settings.ANALYTICS_RECONCILE_INTERVAL_SECONDS,
+)
+
+
+def read_snapshot(db: Session) -> dict:
+    """Return the last published analytics snapshot plus staleness information."""
+    rows = db.query(Analytics).all()
+    data = {
+        row.key: json.loads(row.data) if isinstance(row.data, str) else row.data
+        for row in rows
+    }
+    meta = data.pop(META_KEY, None) or {}
+    data["refreshedAt"] = meta.get("refreshedAt")
+    data["stale"] = refresher.dirty
+    return data
@@ -1,14 +1,21 @@
 """auth.py – Central auth utilities for Bearer‑token (JWT) login"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Union, Optional
+from typing import Any, Tuple, Union, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
-from db import SessionLocal
+from config import settings
+from db import AsyncReadSessionLocal, ReadSessionLocal, SessionLocal
+from hashing import hasher
 import models
 
 # CONFIGURATION
@@ -16,17 +23,101 @@ SECRET_KEY = "CHANGE_ME_TO_SOMETHING_RANDOM_AND_SECURE"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+# CACHES
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at: Optional[float] = None) -> None:
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (value, deadline)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight authenticated identity handed to request handlers."""
+    id: int
+    username: str
+    role_name: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role_name=user.role.name if user.role else None,
+            is_active=bool(user.is_active),
+        )
+
+
+# Invalidation below only reaches this process's cache: with several workers, the others
+# see a role or `is_active` change once their entry expires, after at most
+# PRINCIPAL_CACHE_TTL_SECONDS.
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+# Decoded tokens live until their own `exp`; the TTL here is only an upper bound.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    principal_cache.pop(target.id)
+
+
+@event.listens_for(models.Role, "after_update")
+@event.listens_for(models.Role, "after_delete")
+def _invalidate_role(mapper, connection, target):
+    # role changes are rare; drop every principal rather than tracking members
+    principal_cache.clear()
 
 # PASSWORD HELPERS
+# bcrypt runs on the dedicated hashing pool (see hashing.py), never inline.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Return True if the password matches its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return hasher.verify_and_update(plain_password, hashed_password)[0]
+
+def verify_password_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if `pwd_context` settings changed."""
+    return hasher.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a raw password for storage."""
-    return pwd_context.hash(password)
+    return hasher.hash(password)
 
 # DATABASE HELPERS
 def get_db():
@@ -54,38 +145,104 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode & validate a JWT, returning payload or None if invalid/expired."""
+    """Decode & validate a JWT, returning payload or None if invalid/expired.
+
+    Successful decodes are memoized until the token's own expiry.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token, payload, expires_at=float(exp))
+    return payload
+
+
+def load_principal(user_id: int) -> Optional[Principal]:
+    """Return the cached principal for *user_id*, loading user + role on a miss.
+
+    Inactive users are returned too; the dependencies below reject them.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    with ReadSessionLocal() as db:
+        user = (
+            db.query(models.User)
+            .options(joinedload(models.User.role))
+            .filter(models.User.id == user_id)
+            .first()
+        )
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
 
 # CURRENT USER DEPENDENCY
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> models.User:
-    """FastAPI dependency that returns the *current* authenticated user."""
+def _credentials_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _authenticated(user: Optional[Principal]) -> Principal:
+    if user is None:
+        raise _credentials_error("User not found")
+    if not user.is_active:
+        raise _credentials_error("User is inactive")
+    return user
+
+def _token_subject(token: str) -> int:
     payload = decode_access_token(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error("Invalid or expired token")
     user_id = payload.get("sub")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token missing subject",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
+        raise _credentials_error("Token missing subject")
+    return int(user_id)
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """FastAPI dependency that returns the *current* authenticated principal.
+
+    Cache hits on both the token and the principal skip the database entirely.
+    """
+    return _authenticated(load_principal(_token_subject(token)))
+
+async def load_principal_async(user_id: int) -> Optional[Principal]:
+    """`load_principal` for async handlers: cache hits never leave the event loop."""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    if AsyncReadSessionLocal is None:
+        return await run_in_threadpool(load_principal, user_id)
+    async with AsyncReadSessionLocal() as db:
+        user = (
+            await db.execute(
+                select(models.User).options(joinedload(models.User.role)).where(models.User.id == user_id)
+            )
+        ).scalar_one_or_none()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Async counterpart of `get_current_user` (no threadpool hop on cache hits)."""
+    return _authenticated(await load_principal_async(_token_subject(token)))
+
+def get_stream_user(
+    token: Optional[str] = None,
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+) -> Principal:
+    """Like `get_current_user`, but also accepts `?token=` since browsers'
+    EventSource cannot send an Authorization header."""
+    if not (header_token or token):
+        raise _credentials_error("Not authenticated")
+    return get_current_user(header_token or token)
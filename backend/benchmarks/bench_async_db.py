@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+bench_async_db.py
+
+Requests/sec of the read endpoints (`/list_proposal`, `/notifications`,
+`/get_proposal_by_id`) at high client concurrency with the sync data-access
+mode (threadpool) versus `DB_ASYNC=true` (AsyncEngine on aiosqlite).  Each
+mode runs the app in its own server process; the load generator is an
+asyncio client holding `--clients` concurrent connections.
+
+Usage:
+    python benchmarks/bench_async_db.py --clients 500 --seconds 15
+    python benchmarks/bench_async_db.py --modes async --clients 500
+"""
+import argparse
+import asyncio
+import time
+
+from common import free_port, latency_summary, serve_in_subprocess, write_results
+
+
+async def load(base: str, clients: int, seconds: float, proposals: int) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        await client.post("/register", json={"username": "bench", "email": "bench@example.com", "password": "pw", "role": "manager"})
+        token = (await client.post("/login", data={"username": "bench", "password": "pw"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        ids = []
+        for i in range(proposals):
+            r = await client.post("/proposals", json={"title": f"Proposal {i}", "description": "bench"}, headers=headers)
+            ids.append(r.json()["id"])
+
+        paths = ["/list_proposal?limit=20", "/notifications?limit=20"] + [f"/get_proposal_by_id/{i}" for i in ids[:5]]
+        latencies, statuses = [], {}
+        stop_at = time.perf_counter() + seconds
+
+        async def worker(n: int) -> None:
+            i = n
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    status = (await client.get(paths[i % len(paths)], headers=headers)).status_code
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                if status != 200:
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+                latencies.append(time.perf_counter() - started)
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.perf_counter() - started
+    return {"requests": len(latencies), "errors": sum(statuses.values()), "error_statuses": statuses,
+            "requests_per_sec": len(latencies) / elapsed, "latency": latency_summary(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--proposals", type=int, default=50)
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        port = free_port()
+        proc = serve_in_subprocess(port, DB_ASYNC=mode == "async")
+        try:
+            stats = asyncio.run(load(f"http://127.0.0.1:{port}", args.clients, args.seconds, args.proposals))
+        finally:
+            proc.terminate()
+            proc.wait()
+        results.append({"mode": mode, **stats})
+
+    write_results({"benchmark": "async_db", "params": vars(args), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+bench_llm_client.py
+
+Throughput of the shared pooled Ollama client versus one new connection
+per request, against the local stub server (no real model needed).
+
+Usage:
+    python benchmarks/bench_llm_client.py --requests 200 --concurrency 8 --latency 0.05
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import latency_summary, write_results
+from ollama_stub import start_stub_server
+
+
+def run(label: str, call, total: int, concurrency: int) -> dict:
+    latencies = []
+
+    def one(i: int) -> None:
+        started = time.perf_counter()
+        call(f"prompt {i} " * 20)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    return {"client": label, "requests_per_sec": total / elapsed, "latency": latency_summary(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub latency per request (seconds)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    import requests
+    from llm_client import OllamaClient
+
+    server = start_stub_server(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    model = "llama3.2:latest"
+
+    def unpooled(prompt: str) -> str:
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        return requests.post(f"{base_url}/api/generate", json=payload).json()["response"]
+
+    client = OllamaClient(
+        base_url, connect_timeout=5, read_timeout=60, max_retries=0, backoff=0,
+        pool_size=args.concurrency, max_concurrency_per_model=args.concurrency,
+    )
+    runs = [
+        run("unpooled", unpooled, args.requests, args.concurrency),
+        run("pooled", lambda p: client.generate(p, model, 0.1), args.requests, args.concurrency),
+        run("pooled_batch", lambda p: client.batch([p], model, 0.1), args.requests, args.concurrency),
+    ]
+    server.shutdown()
+    write_results({"benchmark": "llm_client", "params": vars(args), "runs": runs}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+bench_login_flood.py
+
+Measures /login throughput and the latency of a non-auth endpoint
+(`GET /templates` with a cached token) while a login flood is running.
+
+Usage:
+    python benchmarks/bench_login_flood.py --flood 32 --probes 4 --seconds 10 --hash-workers 2
+    python benchmarks/bench_login_flood.py --hash-workers 0   # inline hashing, for comparison
+"""
+import argparse
+import threading
+import time
+
+from common import free_port, latency_summary, serve_in_thread, use_temp_database, write_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flood", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent non-auth clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--hash-workers", type=int, default=2)
+    parser.add_argument("--hash-queue", type=int, default=16)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    use_temp_database(HASH_WORKERS=args.hash_workers, HASH_QUEUE_SIZE=args.hash_queue)
+    import requests
+    import main as app_module
+
+    port = free_port()
+    server = serve_in_thread(app_module.app, port)
+    base = f"http://127.0.0.1:{port}"
+
+    requests.post(f"{base}/register", json={"username": "bench", "email": "bench@example.com", "password": "pw", "role": "manager"})
+    token = requests.post(f"{base}/login", data={"username": "bench", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    logins = {"ok": 0, "rejected": 0, "failed": 0}
+    login_latencies, probe_latencies = [], []
+
+    def flood() -> None:
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            r = session.post(f"{base}/login", data={"username": "bench", "password": "pw"})
+            elapsed = time.perf_counter() - started
+            with lock:
+                if r.status_code == 200:
+                    logins["ok"] += 1
+                    login_latencies.append(elapsed)
+                elif r.status_code == 503:
+                    logins["rejected"] += 1
+                else:
+                    logins["failed"] += 1
+
+    def probe() -> None:
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            session.get(f"{base}/templates", headers=headers)
+            with lock:
+                probe_latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=flood) for _ in range(args.flood)]
+    threads += [threading.Thread(target=probe) for _ in range(args.probes)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    server.should_exit = True
+
+    write_results({
+        "benchmark": "login_flood",
+        "params": vars(args),
+        "login_per_sec": logins["ok"] / args.seconds,
+        "logins": logins,
+        "login_latency": latency_summary(login_latencies),
+        "non_auth_latency": latency_summary(probe_latencies),
+        "hashing": app_module.hasher.stats(),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+bench_pdf_extract.py
+
+Compares page extraction throughput (pages/sec) of pdf_data_read.extract_text
+across worker counts on a generated multi-page PDF.
+
+Usage:
+    python benchmarks/bench_pdf_extract.py --pages 200 --workers 1 2 4 8
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from common import write_results, write_sample_pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    import pdf_data_read
+
+    pdf_path = Path(tempfile.mkdtemp(prefix="bidbuilder-bench-")) / "sample.pdf"
+    write_sample_pdf(str(pdf_path), args.pages)
+
+    runs = []
+    baseline = None
+    for workers in args.workers:
+        # warm the pool so process start-up is not counted against throughput
+        pdf_data_read.extract_text(pdf_path, workers=workers)
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            text = pdf_data_read.extract_text(pdf_path, workers=workers)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        baseline = baseline or best
+        runs.append({
+            "workers": workers,
+            "seconds": best,
+            "pages_per_sec": args.pages / best,
+            "speedup": baseline / best,
+            "chars": len(text),
+        })
+
+    write_results({"benchmark": "pdf_extract", "pages": args.pages, "runs": runs}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_proposal_list.py
+
+CPU time and peak Python memory to page through `--proposals` proposals the
+way `/list_proposal` does, comparing:
+
+* `orm`       – full `Proposal` instances validated through `ProposalOut`
+                (`from_attributes`) and dumped to JSON, as the response-model
+                path does;
+* `projected` – `PROPOSAL_PROJECTION` row tuples serialized with orjson;
+* `sparse`    – the same with `fields=id,title,status,owner_name`.
+
+Each proposal carries `--text-size` characters of description and
+requirements so the cost of the large text columns shows up.  Peak memory
+is tracemalloc's figure for one full walk; buffers allocated inside
+pydantic-core's Rust serializer are not traced, so the `orm` peak is a
+lower bound.
+
+Usage:
+    python benchmarks/bench_proposal_list.py --proposals 10000 --page-size 500
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from common import use_temp_database, write_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--proposals", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--text-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    use_temp_database(PAGE_SIZE_MAX=max(args.page_size, 500))
+    from fastapi import Response
+    from pydantic import TypeAdapter
+    from typing import List
+
+    import main as app_module
+    from db import Base, ReadSessionLocal, SessionLocal, engine
+    from models import Proposal, User
+    from pagination import CursorPage
+    from projections import page_response
+
+    Base.metadata.create_all(bind=engine)
+    text = ("scope delivery migration budget timeline risk " * (args.text_size // 46 + 1))[:args.text_size]
+    with SessionLocal() as db:
+        owner = User(username="owner", email="owner@example.com", hashed_password="x")
+        db.add(owner)
+        db.flush()
+        db.bulk_insert_mappings(Proposal, [
+            {"title": f"Proposal {i}", "description": text, "requirements": text, "owner_id": owner.id,
+             "status": "Draft", "client_name": "Acme", "estimated_value": i}
+            for i in range(args.proposals)
+        ])
+        db.commit()
+        owner_id = owner.id
+
+    adapter = TypeAdapter(List[app_module.ProposalOut])
+    projection = app_module.PROPOSAL_PROJECTION
+    condition = Proposal.owner_id == owner_id
+
+    def pages(fetch, render):
+        """Walk every page; returns (rows, response bytes)."""
+        rows = size = 0
+        cursor = None
+        with ReadSessionLocal() as db:
+            while True:
+                page = CursorPage(Response(), cursor=cursor, limit=args.page_size)
+                batch = fetch(db, page)
+                size += len(render(batch, page))
+                rows += len(batch)
+                cursor = page.next_cursor
+                if cursor is None:
+                    return rows, size
+
+    def orm_path():
+        return pages(
+            lambda db, page: page.apply(db.query(Proposal).filter(condition), Proposal.id),
+            lambda batch, page: adapter.dump_json(adapter.validate_python(batch, from_attributes=True), by_alias=True),
+        )
+
+    def projected_path(names):
+        return lambda: pages(
+            lambda db, page: page.apply(projection.query(db, names).filter(condition), Proposal.id),
+            lambda batch, page: page_response(batch, names, page).body,
+        )
+
+    variants = {
+        "orm": orm_path,
+        "projected": projected_path(projection.parse(None)),
+        "sparse": projected_path(projection.parse("id,title,status,owner_name")),
+    }
+
+    results = []
+    for name, run in variants.items():
+        run()  # warm-up
+        cpu = []
+        for _ in range(args.repeat):
+            gc.collect()
+            started = time.process_time()
+            rows, size = run()
+            cpu.append(time.process_time() - started)
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append({
+            "variant": name,
+            "rows": rows,
+            "response_bytes": size,
+            "cpu_seconds_best": min(cpu),
+            "cpu_ms_per_1k_rows": min(cpu) / rows * 1000 * 1000,
+            "peak_memory_mb": peak / 2**20,
+        })
+
+    write_results({"benchmark": "proposal_list", "params": vars(args), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+bench_read_write_mix.py
+
+Read throughput while writes are running: `--readers` clients page through
+`/list_proposal` and `/notifications` while `--writers` clients create and
+edit proposals and post chat messages.  Reports requests/sec, latency and
+error counts per side (a "database is locked" error surfaces as a 500).
+
+Usage:
+    python benchmarks/bench_read_write_mix.py --readers 32 --writers 8 --seconds 15
+    python benchmarks/bench_read_write_mix.py --readers 450 --writers 50   # 500 concurrent clients
+    python benchmarks/bench_read_write_mix.py --read-pool 1   # shrink the read pool for comparison
+"""
+import argparse
+import asyncio
+import time
+
+from common import free_port, latency_summary, serve_in_subprocess, write_results
+
+
+async def run(base: str, readers: int, writers: int, seconds: float) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=readers + writers)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        await client.post("/register", json={"username": "bench", "email": "bench@example.com", "password": "pw", "role": "manager"})
+        token = (await client.post("/login", data={"username": "bench", "password": "pw"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        seed = await client.post("/proposals", json={"title": "Seed", "description": "bench"}, headers=headers)
+        proposal_id = seed.json()["id"]
+
+        stats = {side: {"latencies": [], "errors": 0, "statuses": {}} for side in ("read", "write")}
+        stop_at = time.perf_counter() + seconds
+
+        async def call(side: str, method: str, url: str, **kwargs) -> None:
+            started = time.perf_counter()
+            try:
+                r = await client.request(method, url, headers=headers, **kwargs)
+                status = r.status_code
+            except httpx.HTTPError:
+                status = "transport"
+            bucket = stats[side]
+            bucket["latencies"].append(time.perf_counter() - started)
+            if status != 200:
+                bucket["errors"] += 1
+                bucket["statuses"][str(status)] = bucket["statuses"].get(str(status), 0) + 1
+
+        async def reader(n: int) -> None:
+            paths = ["/list_proposal?limit=50", "/notifications?limit=50", f"/get_proposal_by_id/{proposal_id}"]
+            i = n
+            while time.perf_counter() < stop_at:
+                await call("read", "GET", paths[i % len(paths)])
+                i += 1
+
+        async def writer(n: int) -> None:
+            i = 0
+            while time.perf_counter() < stop_at:
+                kind = i % 3
+                if kind == 0:
+                    await call("write", "POST", "/proposals", json={"title": f"W{n}-{i}", "description": "bench"})
+                elif kind == 1:
+                    await call("write", "PUT", f"/proposals/{proposal_id}", json={"title": f"Seed {n}-{i}", "description": "bench"})
+                else:
+                    await call("write", "POST", f"/proposals/{proposal_id}/chat", json={"content": f"msg {n}-{i}"})
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[reader(n) for n in range(readers)], *[writer(n) for n in range(writers)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        side: {
+            "requests_per_sec": len(bucket["latencies"]) / elapsed,
+            "errors": bucket["errors"],
+            "error_statuses": bucket["statuses"],
+            "latency": latency_summary(bucket["latencies"]),
+        }
+        for side, bucket in stats.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--read-pool", type=int, default=None, help="override DB_READ_POOL_SIZE")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    overrides = {"DB_READ_POOL_SIZE": args.read_pool} if args.read_pool else {}
+    port = free_port()
+    proc = serve_in_subprocess(port, **overrides)
+    try:
+        results = asyncio.run(run(f"http://127.0.0.1:{port}", args.readers, args.writers, args.seconds))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    write_results({"benchmark": "read_write_mix", "params": vars(args), **results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+bench_section_edits.py
+
+Measures section save latency and notification table growth for a mix of
+content-only edits, reassignments, and repeated assignments to the same
+user, then reports the notification outbox metrics.
+
+Usage:
+    python benchmarks/bench_section_edits.py --sections 50 --edits 2000 --assign-ratio 0.1
+"""
+import argparse
+import random
+import time
+
+from common import latency_summary, use_temp_database, write_results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=2000)
+    parser.add_argument("--assign-ratio", type=float, default=0.1, help="fraction of saves that (re)assign")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    use_temp_database()
+    from db import Base, SessionLocal, engine
+    from models import Notification, Proposal, ProposalSection, User
+    from notifications import outbox
+    from search import ensure_search_index
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    rng = random.Random(args.seed)
+
+    with SessionLocal() as db:
+        users = [User(username=f"u{i}", email=f"u{i}@example.com", hashed_password="x") for i in range(args.users)]
+        db.add_all(users)
+        db.flush()
+        proposal = Proposal(title="Bench", description="", owner_id=users[0].id)
+        db.add(proposal)
+        db.flush()
+        db.add_all(ProposalSection(proposal_id=proposal.id, title=f"S{i}", content="") for i in range(args.sections))
+        db.commit()
+        user_ids = [u.id for u in users]
+        section_ids = [s.id for s in db.query(ProposalSection.id)]
+
+    outbox.start()
+    latencies, assignments = [], 0
+    db = SessionLocal()
+    for n in range(args.edits):
+        section = db.get(ProposalSection, rng.choice(section_ids))
+        started = time.perf_counter()
+        if rng.random() < args.assign_ratio:
+            section.assigned_user_id = rng.choice(user_ids)
+            assignments += 1
+        else:
+            section.content = f"revision {n}"
+        db.commit()
+        latencies.append(time.perf_counter() - started)
+    db.close()
+    outbox.stop()
+
+    with SessionLocal() as db:
+        rows = db.query(Notification).count()
+
+    write_results({
+        "benchmark": "section_edits",
+        "params": vars(args),
+        "saves": latency_summary(latencies),
+        "assignment_saves": assignments,
+        "notification_rows": rows,
+        "rows_per_save": rows / args.edits,
+        "outbox": outbox.stats(),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""common.py – Shared helpers for the backend benchmark scripts."""
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BACKEND_DIR))
+
+
+def use_temp_database(**settings_overrides) -> str:
+    """Point the app at a throwaway SQLite file; call before importing `main`."""
+    path = Path(tempfile.mkdtemp(prefix="bidbuilder-bench-")) / "bench.db"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    for key, value in settings_overrides.items():
+        os.environ[key] = str(value)
+    return str(path)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_in_thread(app, port: int):
+    """Run *app* under uvicorn on a background thread; returns the server."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def serve_in_subprocess(port: int, **settings_overrides):
+    """Run the app under uvicorn in a child process (settings passed via the
+    environment, so each child can use a different configuration); returns
+    the `Popen` once the server answers."""
+    import httpx
+
+    use_temp_database()
+    env = dict(os.environ, **{key: str(value) for key, value in settings_overrides.items()})
+    proc = subprocess.Popen([sys.executable, __file__, "--serve", str(port)], env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds for a list of latencies in seconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def run_metadata() -> dict:
+    """Commit, time and host of this run, so saved results can be compared over time."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(results: dict, output: str = None) -> None:
+    text = json.dumps({**results, "run": run_metadata()}, indent=2, default=str)
+    if output:
+        Path(output).write_text(text)
+    print(text)
+
+
+def write_sample_pdf(path: str, pages: int, lines_per_page: int = 40) -> str:
+    """Write a plain multi-page text PDF (Helvetica, no external dependencies)."""
+    words = ("proposal scope delivery migration platform budget timeline risk "
+             "integration support security compliance training milestone").split()
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(pages):
+        lines = [
+            " ".join(words[(p + i + j) % len(words)] for j in range(10))
+            for i in range(lines_per_page)
+        ]
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td", f"(Page {p + 1}) Tj"]
+        ops += ["T* (%s) Tj" % line for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+    return path
+
+
+if __name__ == "__main__" and len(sys.argv) == 3 and sys.argv[1] == "--serve":
+    import uvicorn
+    import main as app_module
+
+    uvicorn.run(app_module.app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+datagen.py
+
+Synthetic data set for load tests: roles, managers and users, templates,
+proposals (a mix of manager drafts, proposals assigned to users, pending
+approvals and approved ones), sections, comments, chat messages and
+notifications.  Rows are bulk-inserted with Core `executemany` in batches
+of `--batch-size`, so 1M proposals stream through in bounded memory.  The
+search index is built once at the end instead of row by row.
+
+Every generated account has the password `--password`.  Usernames are
+`manager<N>` and `user<N>`.
+
+Usage:
+    python benchmarks/datagen.py --scale 10k                      # throwaway DB, prints its path
+    python benchmarks/datagen.py --scale 100k --database /tmp/bb.db
+    python benchmarks/datagen.py --proposals 250000 --users 2000 --database /tmp/bb.db
+"""
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+from common import use_temp_database, write_results
+
+SCALES = {
+    # proposals, managers, users
+    "10k": (10_000, 20, 200),
+    "100k": (100_000, 100, 2_000),
+    "1m": (1_000_000, 500, 20_000),
+}
+
+STATUSES = ["Draft", "In Progress", "Pending Approval", "Approved", "Rejected"]
+STATUS_WEIGHTS = [30, 30, 15, 20, 5]
+CATEGORIES = ["Software", "Cloud", "Consulting", "Infrastructure", "Security", "Data", "Support"]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+SECTION_TITLES = ["Executive Summary", "Technical Architecture", "Implementation Plan",
+                  "Budget Analysis", "Risk Assessment", "Timeline", "Team", "Compliance"]
+WORDS = ("proposal scope delivery migration platform budget timeline risk integration support "
+         "security compliance training milestone cloud crm analytics dashboard vendor contract "
+         "deployment rollout governance architecture reporting automation licensing sla uptime").split()
+SYLLABLES = ["ka", "lo", "mi", "ne", "ra", "tu", "vo", "zi", "pe", "sa", "do", "fi", "gu", "ha", "ju", "be"]
+
+
+def _vocabulary(size: int = 5_000) -> List[str]:
+    """Domain words first, then pronounceable filler, so term frequencies follow a Zipf curve."""
+    rng = random.Random(0)
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+VOCABULARY = _vocabulary()
+_ZIPF = list(itertools.accumulate(1.0 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, cum_weights=_ZIPF, k=words))
+
+
+def search_terms(count: int = 50) -> List[str]:
+    """Words each found in a few percent of documents, for search load."""
+    return VOCABULARY[300:300 + count]
+
+
+def batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Generator:
+    """Builds row dicts for every table; ids are assigned here so children can reference parents."""
+
+    def __init__(self, args, rng: random.Random, password_hash: str):
+        self.args = args
+        self.rng = rng
+        self.password_hash = password_hash
+        self.now = datetime.utcnow()
+        self.manager_ids = list(range(1, args.managers + 1))
+        self.user_ids = list(range(args.managers + 1, args.managers + args.users + 1))
+
+    def created_at(self) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(365 * 24 * 3600))
+
+    def roles(self) -> Iterator[dict]:
+        for role_id, name in ((1, "manager"), (2, "user"), (3, "admin")):
+            yield {"id": role_id, "name": name}
+
+    def users(self) -> Iterator[dict]:
+        for i, user_id in enumerate(self.manager_ids):
+            yield self._user(user_id, f"manager{i}", 1)
+        for i, user_id in enumerate(self.user_ids):
+            yield self._user(user_id, f"user{i}", 2)
+        yield self._user(len(self.manager_ids) + len(self.user_ids) + 1, "admin", 3)
+
+    def _user(self, user_id: int, username: str, role_id: int) -> dict:
+        return {"id": user_id, "username": username, "email": f"{username}@example.com",
+                "hashed_password": self.password_hash, "is_active": True, "role_id": role_id}
+
+    def templates(self) -> Iterator[dict]:
+        for i in range(self.args.templates):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            yield {
+                "id": i + 1, "name": f"{category} template {i}", "category": category,
+                "description": sentence(self.rng, 30), "sections": self.rng.sample(SECTION_TITLES, 5),
+                "estimated_value": self.rng.randrange(10_000, 1_000_000), "timeline": f"{self.rng.randint(1, 12)} months",
+                "usage_count": self.rng.randrange(100), "content": None, "created_at": self.created_at(),
+            }
+
+    def proposals(self) -> Iterator[dict]:
+        rng = self.rng
+        for proposal_id in range(1, self.args.proposals + 1):
+            manager_id = rng.choice(self.manager_ids)
+            status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+            assigned = status != "Draft" and rng.random() < self.args.assigned_ratio
+            created = self.created_at()
+            yield {
+                "id": proposal_id,
+                "title": f"{rng.choice(CATEGORIES)} {sentence(rng, 3)} #{proposal_id}",
+                "description": sentence(rng, rng.randint(40, 200)),
+                "category": rng.choice(CATEGORIES),
+                "status": status,
+                "created_at": created,
+                "updated_at": created,
+                "owner_id": rng.choice(self.user_ids) if assigned else manager_id,
+                "assigned_by_manager_id": manager_id if assigned else None,
+                "template_id": rng.randint(1, self.args.templates) if self.args.templates and rng.random() < 0.3 else None,
+                "estimated_value": rng.randrange(5_000, 2_000_000),
+                "timeline": f"{rng.randint(1, 18)} months",
+                "priority": rng.choice(PRIORITIES),
+                "requirements": f"Assigned by manager_id:{manager_id}" if assigned else sentence(rng, 20),
+                "client_name": f"Client {rng.randrange(5_000)}",
+            }
+
+    def sections(self) -> Iterator[dict]:
+        rng = self.rng
+        section_id = 0
+        for proposal_id in range(1, self.args.proposals + 1):
+            for title in SECTION_TITLES[:self.args.sections]:
+                section_id += 1
+                yield {
+                    "id": section_id, "proposal_id": proposal_id, "title": title,
+                    "content": sentence(rng, rng.randint(20, 120)), "is_sensitive": rng.random() < 0.05,
+                    "assigned_user_id": rng.choice(self.user_ids) if rng.random() < 0.3 else None,
+                }
+
+    def comments(self) -> Iterator[dict]:
+        rng = self.rng
+        people = self.manager_ids + self.user_ids
+        for proposal_id in range(1, self.args.proposals + 1):
+            for _ in range(rng.randint(0, 2 * self.args.comments)):
+                yield {"proposal_id": proposal_id, "user_id": rng.choice(people),
+                       "content": sentence(rng, rng.randint(5, 40)), "created_at": self.created_at()}
+
+    def chat_messages(self) -> Iterator[dict]:
+        rng = self.rng
+        for proposal_id in range(1, self.args.proposals + 1):
+            for _ in range(rng.randint(0, 2 * self.args.chat)):
+                yield {"proposal_id": proposal_id, "sender_id": rng.choice(self.manager_ids + self.user_ids[:1]),
+                       "content": sentence(rng, rng.randint(3, 30)), "created_at": self.created_at(),
+                       "visible_to_user": True}
+
+    def notifications(self) -> Iterator[dict]:
+        rng = self.rng
+        for user_id in self.manager_ids + self.user_ids:
+            for _ in range(rng.randint(0, 2 * self.args.notifications)):
+                yield {"user_id": user_id, "is_read": rng.random() < 0.7, "created_at": self.created_at(),
+                       "message": f"You have been assigned to section '{rng.choice(SECTION_TITLES)}' "
+                                  f"in proposal ID {rng.randint(1, self.args.proposals)}."}
+
+
+def generate(args) -> Dict[str, dict]:
+    """Insert the data set into the configured database; returns per-table row counts and timings."""
+    import main  # noqa: F401  – creates the schema, search index and migrations like the running app
+    from auth import get_password_hash
+    from db import engine
+    from models import (
+        Comment, Notification, Proposal, ProposalChatMessage, ProposalSection, Role, Template, User,
+    )
+    from search import drop_search_index, ensure_search_index, fts_available
+
+    with engine.connect() as conn:
+        if conn.execute(User.__table__.select().limit(1)).first() is not None:
+            raise SystemExit("datagen: the target database already has users; use an empty database")
+
+    gen = Generator(args, random.Random(args.seed), get_password_hash(args.password))
+    plan: List[tuple] = [
+        (Role, gen.roles), (User, gen.users), (Template, gen.templates), (Proposal, gen.proposals),
+        (ProposalSection, gen.sections), (Comment, gen.comments), (ProposalChatMessage, gen.chat_messages),
+        (Notification, gen.notifications),
+    ]
+
+    # per-row FTS triggers would double the insert cost; drop the index and rebuild it once at the end
+    if fts_available(engine):
+        with engine.begin() as conn:
+            drop_search_index(conn)
+
+    tables: Dict[str, dict] = {}
+    for model, rows in plan:
+        started = time.perf_counter()
+        count = insert_rows(engine, model.__table__, rows, args.batch_size)
+        elapsed = time.perf_counter() - started
+        tables[model.__tablename__] = {"rows": count, "seconds": elapsed, "rows_per_second": count / elapsed if elapsed else 0.0}
+
+    started = time.perf_counter()
+    ensure_search_index(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    tables["search_index"] = {"seconds": time.perf_counter() - started}
+    return tables
+
+
+def insert_rows(engine, table, rows: Callable[[], Iterator[dict]], batch_size: int) -> int:
+    """executemany *rows* into *table*, one transaction per batch."""
+    count = 0
+    for batch in batched(rows(), batch_size):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--database", help="SQLite file to create (default: a throwaway temp file)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Data set options, shared with load_driver.py."""
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="preset proposals/managers/users")
+    parser.add_argument("--proposals", type=int, help="override the preset proposal count")
+    parser.add_argument("--managers", type=int, help="override the preset manager count")
+    parser.add_argument("--users", type=int, help="override the preset user count")
+    parser.add_argument("--templates", type=int, default=25)
+    parser.add_argument("--sections", type=int, default=4, help="sections per proposal (max %d)" % len(SECTION_TITLES))
+    parser.add_argument("--comments", type=int, default=1, help="average comments per proposal")
+    parser.add_argument("--chat", type=int, default=2, help="average chat messages per proposal")
+    parser.add_argument("--notifications", type=int, default=20, help="average notifications per user")
+    parser.add_argument("--assigned-ratio", type=float, default=0.6, help="share of non-draft proposals assigned to users")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def resolve_scale(args) -> None:
+    proposals, managers, users = SCALES[args.scale]
+    args.proposals = args.proposals or proposals
+    args.managers = args.managers or managers
+    args.users = args.users or users
+    args.sections = min(args.sections, len(SECTION_TITLES))
+
+
+def point_at_database(path: str = None) -> str:
+    """Select the database for this process; call before importing the app."""
+    import os
+
+    if path:
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+        return path
+    return use_temp_database()
+
+
+def main() -> None:
+    args = parse_args()
+    resolve_scale(args)
+    path = point_at_database(args.database)
+    started = time.perf_counter()
+    tables = generate(args)
+    write_results({
+        "benchmark": "datagen",
+        "database": path,
+        "params": vars(args),
+        "seconds": time.perf_counter() - started,
+        "tables": tables,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
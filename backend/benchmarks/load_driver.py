@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+load_driver.py
+
+Scripted load test against a data set from datagen.py.  The app is served
+in-process; `--clients` virtual users (a `--manager-share` of them managers,
+the rest users) log in once and then loop over a weighted mix of the main
+endpoints, picking proposal and section ids they are allowed to see.
+Reports throughput, error counts, mean SQL statements (`X-Query-Count`)
+and p50/p95/p99 latency per route template.
+
+Usage:
+    python benchmarks/load_driver.py --scale 10k --clients 32 --seconds 30 --output runs/10k.json
+    python benchmarks/load_driver.py --database /tmp/bb.db --clients 64     # reuse a generated database
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import defaultdict
+from statistics import mean
+from typing import Dict, List, Optional
+
+from common import free_port, latency_summary, serve_in_thread, write_results
+from datagen import add_arguments, generate, point_at_database, resolve_scale, search_terms
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+LOGIN_CONCURRENCY = 4
+
+# route template -> weight, per role
+MANAGER_MIX = {
+    "GET /list_proposal": 20,
+    "GET /get_proposal_by_id/{proposal_id}": 12,
+    "GET /manager/pending_approval": 10,
+    "GET /proposals/{proposal_id}/chat": 10,
+    "POST /proposals/{proposal_id}/chat": 4,
+    "GET /search": 8,
+    "GET /notifications": 10,
+    "GET /notifications/unread_count": 12,
+    "GET /manager/users": 3,
+    "GET /templates": 3,
+    "GET /analytics": 2,
+    "POST /proposals": 3,
+    "POST /sections/assign": 3,
+}
+USER_MIX = {
+    "GET /list_proposal": 12,
+    "GET /my_assigned_proposals": 18,
+    "GET /get_proposal_by_id/{proposal_id}": 12,
+    "GET /proposals/{proposal_id}/chat": 14,
+    "POST /proposals/{proposal_id}/chat": 5,
+    "GET /sections/{section_id}": 8,
+    "POST /sections/comment": 3,
+    "GET /search": 5,
+    "GET /notifications": 10,
+    "GET /notifications/unread_count": 12,
+    "GET /templates": 2,
+}
+
+
+class Account:
+    def __init__(self, role: str, username: str, user_id: int, owned: List[int], chat: List[int], sections: List[int]):
+        self.role = role
+        self.username = username
+        self.user_id = user_id
+        self.owned = owned          # proposals get_proposal_by_id returns
+        self.chat = chat            # proposals whose chat the account may use
+        self.sections = sections    # sections of owned proposals
+        self.headers: Dict[str, str] = {}
+
+
+def load_accounts(managers: int, users: int, sample: int) -> List[Account]:
+    """Pick the first *managers* managers and *users* users and up to *sample* ids each may touch."""
+    from sqlalchemy import select
+
+    from db import SessionLocal
+    from models import Proposal, ProposalSection, Role, User
+
+    accounts = []
+    with SessionLocal() as db:
+        for role, count in (("manager", managers), ("user", users)):
+            rows = db.execute(
+                select(User.id, User.username).join(Role).where(Role.name == role).order_by(User.id).limit(count)
+            ).all()
+            for user_id, username in rows:
+                owned = db.scalars(select(Proposal.id).where(Proposal.owner_id == user_id).limit(sample)).all()
+                if role == "manager":
+                    chat = db.scalars(
+                        select(Proposal.id).where(Proposal.assigned_by_manager_id == user_id).limit(sample)
+                    ).all()
+                else:
+                    chat = db.scalars(select(Proposal.id).where(
+                        Proposal.owner_id == user_id, Proposal.assigned_by_manager_id.isnot(None),
+                    ).limit(sample)).all()
+                sections = db.scalars(
+                    select(ProposalSection.id).where(ProposalSection.proposal_id.in_(owned[:50])).limit(sample)
+                ).all() if owned else []
+                accounts.append(Account(role, username, user_id, list(owned), list(chat), list(sections)))
+    return accounts
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.statements: Dict[str, List[int]] = defaultdict(list)
+
+    def record(self, route: str, seconds: float, status, query_count: Optional[int]) -> None:
+        self.latencies[route].append(seconds)
+        if query_count is not None:
+            self.statements[route].append(query_count)
+        if not (isinstance(status, int) and 200 <= status < 300):
+            self.errors[route][str(status)] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route in sorted(self.latencies):
+            samples = self.latencies[route]
+            routes[route] = {
+                "requests_per_sec": len(samples) / elapsed if elapsed else 0.0,
+                "errors": sum(self.errors[route].values()),
+                "error_statuses": dict(self.errors[route]),
+                "mean_sql_statements": mean(self.statements[route]) if self.statements[route] else None,
+                "latency": latency_summary(samples),
+            }
+        everything = [s for samples in self.latencies.values() for s in samples]
+        return {
+            "total": {
+                "requests": len(everything),
+                "requests_per_sec": len(everything) / elapsed if elapsed else 0.0,
+                "errors": sum(sum(e.values()) for e in self.errors.values()),
+                "latency": latency_summary(everything),
+            },
+            "routes": routes,
+        }
+
+
+async def run(base: str, accounts: List[Account], password: str, seconds: float, warmup: float, seed: int) -> dict:
+    import httpx
+
+    logins = Recorder()
+    recorder = Recorder()
+    all_user_ids = [a.user_id for a in accounts if a.role == "user"]
+    terms = search_terms()
+    limits = httpx.Limits(max_connections=len(accounts))
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+
+        async def call(stats: Recorder, route: str, method: str, url: str, headers=None, **kwargs):
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, **kwargs)
+                status, count = response.status_code, response.headers.get(QUERY_COUNT_HEADER)
+                count = int(count) if count is not None else None
+            except httpx.HTTPError as exc:
+                response, status, count = None, type(exc).__name__, None
+            if stats is not None:
+                stats.record(route, time.perf_counter() - started, status, count)
+            return response
+
+        login_slots = asyncio.Semaphore(LOGIN_CONCURRENCY)
+
+        async def login(account: Account) -> None:
+            async with login_slots:
+                while True:
+                    response = await call(logins, "POST /login", "POST", "/login",
+                                          data={"username": account.username, "password": password})
+                    if response is None or response.status_code != 503:
+                        break
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+            if response is None or response.status_code != 200:
+                status = response.status_code if response is not None else "no response"
+                raise SystemExit(f"load_driver: cannot log in as {account.username} ({status}); "
+                                 f"was the data set generated with --password {password!r}?")
+            account.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # logins are bcrypt-bound; do them up front, a few at a time, so they do not skew the mix
+        started = time.perf_counter()
+        await asyncio.gather(*(login(a) for a in accounts))
+        login_elapsed = time.perf_counter() - started
+
+        async def step(account: Account, rng: random.Random, stats) -> None:
+            mix = MANAGER_MIX if account.role == "manager" else USER_MIX
+            route = rng.choices(list(mix), list(mix.values()))[0]
+            method, template = route.split(" ", 1)
+            kwargs = {}
+            path = template
+            if "{proposal_id}" in template:
+                pool = account.chat if "/chat" in template else account.owned
+                if not pool:
+                    return
+                path = template.format(proposal_id=rng.choice(pool))
+            elif "{section_id}" in template:
+                if not account.sections:
+                    return
+                path = template.format(section_id=rng.choice(account.sections))
+            if route == "GET /search":
+                kwargs["params"] = {"q": rng.choice(terms)}
+            elif route in ("GET /list_proposal", "GET /my_assigned_proposals", "GET /manager/pending_approval",
+                           "GET /notifications", "GET /proposals/{proposal_id}/chat"):
+                kwargs["params"] = {"limit": 50}
+            elif method == "POST" and "/chat" in template:
+                kwargs["json"] = {"content": f"load test message {rng.randrange(10**6)}"}
+            elif route == "POST /proposals":
+                kwargs["json"] = {"title": f"Load test {rng.randrange(10**6)}", "description": "load test"}
+            elif route == "POST /sections/assign":
+                if not account.sections or not all_user_ids:
+                    return
+                kwargs["json"] = {"section_id": rng.choice(account.sections), "user_id": rng.choice(all_user_ids)}
+            elif route == "POST /sections/comment":
+                if not account.sections:
+                    return
+                kwargs["json"] = {"section_id": rng.choice(account.sections), "content": "load test comment"}
+            await call(stats, route, method, path, headers=account.headers, **kwargs)
+
+        async def client_loop(account: Account, n: int, until: float, stats) -> None:
+            rng = random.Random(seed * 1_000 + n)
+            while time.perf_counter() < until:
+                await step(account, rng, stats)
+
+        if warmup:
+            until = time.perf_counter() + warmup
+            await asyncio.gather(*(client_loop(a, n, until, None) for n, a in enumerate(accounts)))
+
+        started = time.perf_counter()
+        until = started + seconds
+        await asyncio.gather(*(client_loop(a, n, until, recorder) for n, a in enumerate(accounts)))
+        elapsed = time.perf_counter() - started
+
+    results = recorder.summary(elapsed)
+    results["login"] = logins.summary(login_elapsed)["routes"].get("POST /login")
+    results["seconds"] = elapsed
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--database", help="a database generated by datagen.py (default: generate --scale into a temp file)")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--manager-share", type=float, default=0.25, help="share of clients that are managers")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="unrecorded seconds before measuring")
+    parser.add_argument("--ids-per-client", type=int, default=200, help="proposal/section ids sampled per client")
+    parser.add_argument("--query-count-mode", choices=["off", "warn"], default="warn",
+                        help="QUERY_COUNT_MODE for the app; 'off' drops the per-route SQL statement counts")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    resolve_scale(args)
+
+    path = point_at_database(args.database)
+    os.environ["QUERY_COUNT_MODE"] = args.query_count_mode
+    datagen = None
+    if not args.database:
+        started = time.perf_counter()
+        datagen = {"seconds": None, "tables": generate(args)}
+        datagen["seconds"] = time.perf_counter() - started
+    import main as app_module
+
+    managers = max(1, round(args.clients * args.manager_share))
+    accounts = load_accounts(managers, max(args.clients - managers, 0), args.ids_per_client)
+    port = free_port()
+    server = serve_in_thread(app_module.app, port)
+    try:
+        results = asyncio.run(run(f"http://127.0.0.1:{port}", accounts, args.password, args.seconds, args.warmup, args.seed))
+    finally:
+        server.should_exit = True
+
+    write_results({
+        "benchmark": "load_driver",
+        "database": path,
+        "params": vars(args),
+        "clients": {"managers": sum(a.role == "manager" for a in accounts),
+                    "users": sum(a.role == "user" for a in accounts)},
+        "datagen": datagen,
+        **results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+ollama_stub.py
+
+A local stand-in for the Ollama HTTP API (`/api/generate`, streaming and
+non-streaming, plus `/api/tags` and `/api/version`) with configurable
+latency, so summarization benchmarks and tests can run offline.
+
+Responses are deterministic: "Stub summary of <n> prompt characters." split
+into word tokens.
+
+Usage:
+    python benchmarks/ollama_stub.py --port 11434 --latency 0.5 --token-delay 0.02
+    OLLAMA_BASE_URL=http://127.0.0.1:11434 uvicorn main:app
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real server
+    disable_nagle_algorithm = True  # Go's net/http sets TCP_NODELAY too
+    latency = 0.0                   # seconds before the first token
+    token_delay = 0.0               # seconds between streamed tokens
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "llama3.2:latest"}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "stub"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "stub")
+        tokens = [f"{w} " for w in f"Stub summary of {len(request.get('prompt', ''))} prompt characters.".split()]
+        time.sleep(self.latency)
+
+        if not request.get("stream", True):
+            self._send_json(200, {"model": model, "response": "".join(tokens).strip(), "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                self._write_chunk({"model": model, "response": token, "done": False})
+                time.sleep(self.token_delay)
+            self._write_chunk({"model": model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True   # client went away: stop "generating"
+
+    def _write_chunk(self, body: dict) -> None:
+        data = json.dumps(body).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, token_delay: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; the bound port is `server.server_port`."""
+    handler = type("Handler", (StubOllamaHandler,), {"latency": latency, "token_delay": token_delay})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    server = start_stub_server(args.port, args.latency, args.token_delay)
+    print(f"Stub Ollama listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
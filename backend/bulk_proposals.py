@@ -0,0 +1,151 @@
+"""bulk_proposals.py – Batch create, status update and assignment of proposals.
+
+Each operation checks authorization against rows loaded in one SELECT, writes
+every accepted item with a single bulk INSERT or executemany UPDATE, and
+commits once.  Items that fail a check are skipped and reported; the others
+are still applied.
+
+Bulk statements bypass the ORM flush, so the side effects the flush hooks
+normally derive are produced here, once per batch:
+
+* analytics – one set of counter deltas for the whole batch (`record_deltas`),
+  and a single refresher wake-up after commit;
+* notifications – one notification per assignee listing all proposals they
+  received in the batch, handed to the outbox after commit;
+* live chat – sockets on reassigned proposals are told to re-check access.
+
+Results are returned in request order as
+``{"index", "proposal_id", "ok", "status_code", "detail"}``, where
+``status_code``/``detail`` match what the single-item endpoint would have
+returned.  Stored rows match the single endpoints too: an omitted status
+becomes `DEFAULT_PROPOSAL_STATUS`, and `/proposals/assign_to_user` sends the
+same assignment notification for its one proposal.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from analytics import proposal_deltas, record_deltas
+from auth import Principal
+from chat_hub import publish_access_changed
+from models import DEFAULT_PROPOSAL_STATUS, Proposal, Role, User
+from notifications import Draft, proposal_assignment_message, queue_notifications
+
+def _ok(index: int, proposal_id: int, **extra) -> dict:
+    return {"index": index, "proposal_id": proposal_id, "ok": True, "status_code": 200, "detail": None, **extra}
+
+
+def _failed(index: int, proposal_id: Optional[int], status_code: int, detail: str) -> dict:
+    return {"index": index, "proposal_id": proposal_id, "ok": False, "status_code": status_code, "detail": detail}
+
+
+def summarize(results: List[dict]) -> dict:
+    succeeded = sum(r["ok"] for r in results)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+def _load_proposals(db: Session, ids: Sequence[int]) -> Dict[int, tuple]:
+    """id -> (status, created_at, owner_id) for the proposals in *ids*, in one query."""
+    rows = db.execute(
+        select(Proposal.id, Proposal.status, Proposal.created_at, Proposal.owner_id).where(Proposal.id.in_(set(ids)))
+    ).all()
+    return {row.id: (row.status, row.created_at, row.owner_id) for row in rows}
+
+
+def _insert_returning_ids(db: Session, values: List[dict]) -> List[int]:
+    """INSERT *values* and return the new ids in the same order."""
+    if db.get_bind().dialect.name == "sqlite":
+        # sort_by_parameter_order falls back to one INSERT per row here.  SQLite holds one
+        # write lock per database and gives each row max(rowid) + 1, so the ids of a multi-row
+        # INSERT inside this transaction ascend in VALUES order and sorting restores it.
+        return sorted(db.execute(insert(Proposal).returning(Proposal.id), values).scalars().all())
+    return list(db.execute(
+        insert(Proposal).returning(Proposal.id, sort_by_parameter_order=True), values
+    ).scalars().all())
+
+
+def create_proposals(db: Session, owner: Principal, items: List[dict]) -> List[dict]:
+    """INSERT all *items* (ProposalCreate fields) owned by *owner* in one executemany."""
+    now = datetime.utcnow()
+    values = [
+        {**item, "status": item.get("status") or DEFAULT_PROPOSAL_STATUS, "owner_id": owner.id, "created_at": now, "updated_at": now}
+        for item in items
+    ]
+    ids = _insert_returning_ids(db, values)
+    record_deltas(db, proposal_deltas(added=[(v["status"], now, owner.id) for v in values]))
+    db.commit()
+    return [_ok(index, proposal_id) for index, proposal_id in enumerate(ids)]
+
+
+def update_statuses(db: Session, user: Principal, items: List[Tuple[int, str]]) -> List[dict]:
+    """Set the status of each ``(proposal_id, status)``; owners, managers and admins only."""
+    proposals = _load_proposals(db, [proposal_id for proposal_id, _ in items])
+    privileged = user.role_name in ("admin", "manager")
+    now = datetime.utcnow()
+    results, updates, removed, added, seen = [], [], [], [], set()
+    for index, (proposal_id, status) in enumerate(items):
+        row = proposals.get(proposal_id)
+        if proposal_id in seen:
+            results.append(_failed(index, proposal_id, 400, "Duplicate proposal_id in batch"))
+        elif row is None:
+            results.append(_failed(index, proposal_id, 404, "Proposal not found"))
+        elif row[2] != user.id and not privileged:
+            results.append(_failed(index, proposal_id, 403, "Not authorized"))
+        else:
+            updates.append({"id": proposal_id, "status": status, "updated_at": now})
+            removed.append(row)
+            added.append((status, row[1], row[2]))
+            results.append(_ok(index, proposal_id, status=status))
+        seen.add(proposal_id)
+
+    if updates:
+        db.execute(update(Proposal), updates)
+        record_deltas(db, proposal_deltas(removed, added))
+        db.commit()
+    return results
+
+
+def assign_proposals(db: Session, manager: Principal, items: List[Tuple[int, int]]) -> List[dict]:
+    """Hand each ``(proposal_id, user_id)`` from *manager* to a user, as `/proposals/assign_to_user` does."""
+    proposals = _load_proposals(db, [proposal_id for proposal_id, _ in items])
+    assignees = set(db.scalars(
+        select(User.id).join(Role, User.role_id == Role.id)
+        .where(User.id.in_({user_id for _, user_id in items}), Role.name == "user")
+    ).all())
+    requirements = f"Assigned by manager_id:{manager.id}"
+    now = datetime.utcnow()
+    results, updates, removed, added, seen = [], [], [], [], set()
+    received: Dict[int, List[int]] = defaultdict(list)
+    for index, (proposal_id, user_id) in enumerate(items):
+        row = proposals.get(proposal_id)
+        if proposal_id in seen:
+            results.append(_failed(index, proposal_id, 400, "Duplicate proposal_id in batch"))
+        elif row is None:
+            results.append(_failed(index, proposal_id, 404, "Proposal not found"))
+        elif row[2] != manager.id:
+            results.append(_failed(index, proposal_id, 403, "Proposal not owned by manager"))
+        elif user_id not in assignees:
+            results.append(_failed(index, proposal_id, 400, "Invalid user assignment"))
+        else:
+            updates.append({
+                "id": proposal_id, "owner_id": user_id, "assigned_by_manager_id": manager.id,
+                "requirements": requirements, "updated_at": now,
+            })
+            removed.append(row)
+            added.append((row[0], row[1], user_id))
+            received[user_id].append(proposal_id)
+            results.append(_ok(index, proposal_id, user_id=user_id))
+        seen.add(proposal_id)
+
+    if updates:
+        db.execute(update(Proposal), updates)
+        record_deltas(db, proposal_deltas(removed, added))
+        queue_notifications(db, [
+            Draft(user_id, proposal_assignment_message(manager.username, ids), now) for user_id, ids in received.items()
+        ])
+        db.commit()
+        publish_access_changed(update["id"] for update in updates)
+    return results
@@ -0,0 +1,139 @@
+"""chat_hub.py – Pub/sub fan-out for live proposal chat and notifications.
+
+WebSocket/SSE connections subscribe to a channel (a proposal's chat, or a
+user's notifications) on the process-wide `hub`; new messages are published
+once and delivered to every local subscriber's queue.  The transport between workers is pluggable:
+
+* `InProcessBackend` (default) – delivery stays inside this process.
+* `RedisBackend` – publishes through Redis pub/sub so every worker sharing
+  the Redis instance fans the message out to its own subscribers.  Selected
+  with `CHAT_PUBSUB_URL=redis://...` (requires the `redis` package).
+"""
+import asyncio
+import json
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from config import settings
+
+CHANNEL_PREFIX = "bidbuilder:"
+ACCESS_CHANGED = "access_changed"
+
+
+def proposal_channel(proposal_id: int) -> str:
+    return f"{CHANNEL_PREFIX}chat:{proposal_id}"
+
+
+def notification_channel(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}notifications:{user_id}"
+
+
+class InProcessBackend:
+    """Delivers published messages straight to this process's subscribers."""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str, dict], None]] = None
+
+    def start(self, deliver: Callable[[str, dict], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, message: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, message)
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class RedisBackend:
+    """Redis pub/sub transport shared by all workers pointing at the same server."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:  # optional dependency
+            raise RuntimeError("CHAT_PUBSUB_URL requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, deliver: Callable[[str, dict], None]) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{
+            f"{CHANNEL_PREFIX}*": lambda msg: deliver(msg["channel"].decode(), json.loads(msg["data"]))
+        })
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, channel: str, message: dict) -> None:
+        self._client.publish(channel, json.dumps(message, default=str))
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+class ChatHub:
+    """Tracks local subscriber queues per channel; safe to publish from any thread."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self.backend.start(self._deliver_local)
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CHAT_SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            for entry in [e for e in subscribers if e[1] is queue]:
+                subscribers.discard(entry)
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+    def publish(self, channel: str, message: dict) -> None:
+        self.backend.publish(channel, message)
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def _deliver_local(self, channel: str, message: dict) -> None:
+        with self._lock:
+            targets = list(self._subscribers.get(channel, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:  # subscriber's loop already closed
+                pass
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: dict) -> None:
+        # A subscriber that stops reading loses messages rather than blocking the hub.
+        if not queue.full():
+            queue.put_nowait(message)
+
+    def close(self) -> None:
+        self.backend.stop()
+
+
+def _make_backend():
+    url = settings.CHAT_PUBSUB_URL
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return InProcessBackend()
+
+
+hub = ChatHub(_make_backend())
+
+
+def publish_access_changed(proposal_ids) -> None:
+    """Tell live chat sockets on *proposal_ids* to re-check who may read them (after commit)."""
+    for proposal_id in proposal_ids:
+        hub.publish(proposal_channel(proposal_id), {"event": ACCESS_CHANGED})
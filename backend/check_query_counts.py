@@ -0,0 +1,157 @@
+"""
+check_query_counts.py – SQL statement budget and N+1 check for the endpoints.
+
+Builds a scratch SQLite database, calls each endpoint in `ENDPOINTS` through
+the app wrapped in `QueryCountMiddleware` in ``raise`` mode (whatever
+`QUERY_COUNT_MODE` is set to), and reads the statement count from the
+`X-Query-Count` header.  The data set is then grown tenfold and every
+endpoint is called again.  A request fails the check when
+
+* its count exceeds the endpoint's budget,
+* its count grew with the data (a per-row query), or
+* the middleware rejected it for repeating one statement
+  `N_PLUS_ONE_THRESHOLD` times, or
+* the response has no `X-Query-Count` header, so nothing was counted.
+
+Counts are taken on the second call of each request, after the principal and
+unread-count caches are warm.
+
+Usage:
+    python check_query_counts.py            # fail on budget overruns / N+1
+    python check_query_counts.py --verbose  # also print every count
+    python -m pytest tests/test_query_counts.py
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+if __name__ == "__main__":
+    os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{Path(tempfile.mkdtemp()) / 'counts.db'}")
+    os.environ.setdefault("LLM_CACHE_PATH", str(Path(tempfile.mkdtemp()) / "llm_cache.db"))
+
+SMALL = 3
+LARGE = 30
+
+# name -> (method, path, request kwargs, caller, statement budget); paths may use
+# {proposal_id}, {section_id} and {user_id} from the seeded data
+ENDPOINTS = {
+    "GET /list_proposal (manager)": ("GET", "/list_proposal", {}, "manager", 1),
+    "GET /list_proposal (user)": ("GET", "/list_proposal", {}, "user", 1),
+    "GET /get_proposal_by_id": ("GET", "/get_proposal_by_id/{proposal_id}", {}, "manager", 1),
+    "GET /my_assigned_proposals": ("GET", "/my_assigned_proposals", {}, "user", 1),
+    "GET /manager/pending_approval": ("GET", "/manager/pending_approval", {}, "manager", 1),
+    "GET /manager/users": ("GET", "/manager/users", {}, "manager", 1),
+    "GET /templates": ("GET", "/templates", {}, "user", 1),
+    "GET /notifications": ("GET", "/notifications", {}, "manager", 1),
+    "GET /notifications/unread_count": ("GET", "/notifications/unread_count", {}, "manager", 0),
+    "GET /proposals/{id}/chat": ("GET", "/proposals/{proposal_id}/chat", {}, "manager", 2),
+    "GET /sections/{id}": ("GET", "/sections/{section_id}", {}, "manager", 1),
+    "GET /search": ("GET", "/search", {"params": {"q": "migration"}}, "manager", 1),
+    "POST /sections/assign": (
+        "POST", "/sections/assign", {"json": {"section_id": "{section_id}", "user_id": "{user_id}"}}, "manager", 2,
+    ),
+}
+
+
+def seed(db, manager_id: int, user_id: int, proposal_id: int, count: int) -> None:
+    """Add *count* rows of every kind the endpoints list."""
+    from models import Notification, Proposal, ProposalChatMessage, ProposalSection, Role, User
+
+    role_id = db.query(Role.id).filter(Role.name == "user").scalar()
+    start = db.query(User).count()
+    db.add_all(
+        User(username=f"member{start + i}", email=f"member{start + i}@example.com", hashed_password="x", role_id=role_id)
+        for i in range(count)
+    )
+    db.add_all(Proposal(title=f"Cloud migration {i}", description="migration plan", owner_id=manager_id) for i in range(count))
+    db.add_all(
+        Proposal(title=f"Review {i}", description="migration", owner_id=user_id,
+                 assigned_by_manager_id=manager_id, status="Pending Approval")
+        for i in range(count)
+    )
+    db.add_all(ProposalSection(proposal_id=proposal_id, title=f"Section {i}", content="") for i in range(count))
+    db.add_all(Notification(user_id=manager_id, message=f"note {i}") for i in range(count))
+    db.add_all(ProposalChatMessage(proposal_id=proposal_id, sender_id=user_id, content=f"msg {i}") for i in range(count))
+    db.commit()
+
+
+def measure(client, tokens: dict, ids: dict) -> dict:
+    counts = {}
+    for name, (method, path, kwargs, caller, budget) in ENDPOINTS.items():
+        kwargs = {
+            key: {k: int(v.format(**ids)) if isinstance(v, str) and "{" in v else v for k, v in value.items()}
+            for key, value in kwargs.items()
+        }
+        headers = {"Authorization": f"Bearer {tokens[caller]}"}
+        for _ in range(2):
+            response = client.request(method, path.format(**ids), headers=headers, **kwargs)
+        count = response.headers.get("x-query-count")
+        counts[name] = (response.status_code, None if count is None else int(count), response.text)
+    return counts
+
+
+def check(verbose: bool = False) -> List[str]:
+    """Call every endpoint at both data sizes and return the failing ``name: problem`` entries."""
+    from fastapi.testclient import TestClient
+
+    import main as app_module
+    from db import SessionLocal
+    from models import Proposal, ProposalSection
+    from query_counter import QueryCountMiddleware
+
+    with TestClient(QueryCountMiddleware(app_module.app, mode="raise")) as client:
+        tokens, user_ids = {}, {}
+        for role in ("manager", "user"):
+            name = f"counts_{role}"
+            user_ids[role] = client.post(
+                "/register", json={"username": name, "email": f"{name}@example.com", "password": "pw", "role": role},
+            ).json()["id"]
+            tokens[role] = client.post("/login", data={"username": name, "password": "pw"}).json()["access_token"]
+        manager_id, user_id = user_ids["manager"], user_ids["user"]
+        with SessionLocal() as db:
+            proposal = Proposal(title="Chat proposal", description="", owner_id=manager_id)
+            db.add(proposal)
+            db.flush()
+            section = ProposalSection(proposal_id=proposal.id, title="Assigned", content="")
+            db.add(section)
+            db.commit()
+            ids = {"proposal_id": proposal.id, "section_id": section.id, "user_id": user_id}
+            seed(db, manager_id, user_id, proposal.id, SMALL)
+
+        small = measure(client, tokens, ids)
+        with SessionLocal() as db:
+            seed(db, manager_id, user_id, ids["proposal_id"], LARGE - SMALL)
+        large = measure(client, tokens, ids)
+
+    failures = []
+    for name, (_, _, _, _, budget) in ENDPOINTS.items():
+        (small_status, small_count, _), (status, count, body) = small[name], large[name]
+        problems = []
+        if status != 200 or small_status != 200:
+            problems.append(f"HTTP {small_status}/{status}: {body[:200]}")
+        if count is None or small_count is None:
+            problems.append("no X-Query-Count header; statements were not counted")
+        else:
+            if count > budget:
+                problems.append(f"{count} statements, budget {budget}")
+            if count > small_count:
+                problems.append(f"grew from {small_count} to {count} statements with {LARGE // SMALL}x the rows")
+        failures += [f"{name}: {problem}" for problem in problems]
+        print(f"{'FAIL' if problems else 'ok':4}  {name}" + (f"  [{small_count} -> {count}]" if verbose or problems else ""))
+        for problem in problems:
+            print(f"        {problem}")
+    return failures
+
+
+def main() -> int:
+    failures = check("--verbose" in sys.argv)
+    if failures:
+        print(f"\n{len(failures)} problem(s): endpoints over budget, N+1 or uncounted.")
+        return 1
+    print("\nAll endpoints within their query budgets.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+check_query_plans.py – Query-plan regression check for the hot endpoints.
+
+Builds a scratch SQLite database, seeds a few rows of everything the hot
+endpoints read, and calls each endpoint in `HOT_ENDPOINTS` through the app,
+so the statements checked are exactly the ones the endpoint code builds.
+List endpoints are called twice: a first page of one row and the page after
+its `X-Next-Cursor`.  Every SELECT a request runs is passed to
+`EXPLAIN QUERY PLAN`, and the check fails when a plan
+
+* falls back to a full scan of a table (`SCAN <table>`, with or without a
+  covering index) instead of an index search, or
+* on a keyset-paginated endpoint, sorts with `USE TEMP B-TREE FOR ORDER BY`
+  instead of reading the page in index order.
+
+`HOT_STATEMENTS` covers hot statements that no GET request issues, such as
+the INSERT ... SELECT that enforces the per-user job limit.
+
+Usage:
+    python check_query_plans.py            # fail on full scans / sorted pages
+    python check_query_plans.py --verbose  # also print every plan
+    python -m pytest tests/test_query_plans.py
+"""
+import os
+import re
+import sys
+import tempfile
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+if __name__ == "__main__":
+    os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{Path(tempfile.mkdtemp()) / 'plans.db'}")
+    os.environ.setdefault("LLM_CACHE_PATH", str(Path(tempfile.mkdtemp()) / "llm_cache.db"))
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# name -> (path, query params, caller, keyset paginated); paths may use
+# {proposal_id}, {hidden_proposal_id} and {section_id} from the seeded data
+HOT_ENDPOINTS = {
+    "GET /list_proposal (manager)": ("/list_proposal", {}, "manager", True),
+    "GET /list_proposal (user)": ("/list_proposal", {}, "user", True),
+    "GET /my_assigned_proposals": ("/my_assigned_proposals", {}, "user", True),
+    "GET /manager/pending_approval": ("/manager/pending_approval", {}, "manager", True),
+    "GET /templates": ("/templates", {}, "user", True),
+    "GET /notifications": ("/notifications", {}, "manager", True),
+    "GET /notifications?unread_only=true": ("/notifications", {"unread_only": "true"}, "manager", True),
+    "GET /proposals/{id}/chat": ("/proposals/{proposal_id}/chat", {}, "manager", True),
+    "GET /proposals/{id}/chat (hidden messages filtered)": ("/proposals/{hidden_proposal_id}/chat", {}, "user", True),
+    "GET /get_proposal_by_id": ("/get_proposal_by_id/{proposal_id}", {}, "manager", False),
+    "GET /sections/{id}": ("/sections/{section_id}", {}, "manager", False),
+    "GET /notifications/unread_count": ("/notifications/unread_count", {}, "manager", False),
+    "GET /search": ("/search", {"q": "migration"}, "manager", False),
+}
+
+
+def _job_within_limit(db, user_id: int) -> None:
+    from jobs import SUMMARY, job_manager
+
+    db.execute(job_manager.insert_within_limit(user_id, SUMMARY, {}))
+    db.rollback()
+
+
+# name -> function(db, user_id) running the statement
+HOT_STATEMENTS = {
+    "POST /jobs/* (active job limit)": _job_within_limit,
+}
+
+# endpoint -> table it may scan: templates are shared by everyone, so the list walks the
+# table in id order and stops at the page size
+ALLOWED_SCANS = {"GET /templates": "templates"}
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?! VIRTUAL TABLE)")
+SORTED_PAGE = "USE TEMP B-TREE FOR ORDER BY"
+
+_capture: ContextVar[Optional[list]] = ContextVar("plan_capture", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    statements = _capture.get()
+    head = statement.lstrip().upper()
+    # INSERT ... SELECT is checked for its SELECT part (e.g. the job limit's count)
+    if statements is not None and (head.startswith("SELECT") or (head.startswith("INSERT") and " SELECT " in head)):
+        statements.append((statement, parameters))
+
+
+class CaptureStatements:
+    """ASGI wrapper collecting the SELECTs each request runs (threadpool work included) into `last`."""
+
+    def __init__(self, app):
+        self.app = app
+        self.last: List[tuple] = []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.last = []
+        token = _capture.set(self.last)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _capture.reset(token)
+
+
+def seed(db, manager_id: int, user_id: int) -> dict:
+    """Two or more rows of everything the hot endpoints list, so each has a second page."""
+    from models import Notification, Proposal, ProposalChatMessage, ProposalSection, Template
+
+    owned = [Proposal(title=f"Cloud migration {i}", description="migration plan", owner_id=manager_id) for i in range(2)]
+    assigned = [
+        Proposal(title=f"Assigned {i}", description="migration", owner_id=user_id, assigned_by_manager_id=manager_id)
+        for i in range(2)
+    ]
+    pending = [
+        Proposal(title=f"Review {i}", description="migration", owner_id=user_id,
+                 assigned_by_manager_id=manager_id, status="Pending Approval")
+        for i in range(2)
+    ]
+    # approved while the user still owns it: the user's chat history hides manager-only messages
+    hidden = Proposal(title="Approved", description="", owner_id=user_id, assigned_by_manager_id=manager_id, status="Approved")
+    db.add_all(owned + assigned + pending + [hidden])
+    db.flush()
+    sections = [ProposalSection(proposal_id=owned[0].id, title=f"Section {i}", content="migration") for i in range(2)]
+    db.add_all(sections)
+    db.add_all(
+        Template(name=f"Plan template {i}", category="IT", description="", sections=[], estimated_value=0, timeline="1 week")
+        for i in range(2)
+    )
+    db.add_all(Notification(user_id=manager_id, message=f"note {i}") for i in range(3))
+    for proposal in (owned[0], hidden):
+        db.add_all(ProposalChatMessage(proposal_id=proposal.id, sender_id=user_id, content=f"msg {i}") for i in range(3))
+    db.add(ProposalChatMessage(proposal_id=hidden.id, sender_id=manager_id, content="internal", visible_to_user=False))
+    db.commit()
+    return {"proposal_id": owned[0].id, "hidden_proposal_id": hidden.id, "section_id": sections[0].id}
+
+
+def collect() -> dict:
+    """Map each hot endpoint (and page) to the SELECTs it runs; raises if a request fails."""
+    from fastapi.testclient import TestClient
+
+    import main as app_module
+    from db import SessionLocal
+
+    app = CaptureStatements(app_module.app)
+    found = {}
+    with TestClient(app) as client:
+        tokens, user_ids = {}, {}
+        for role in ("manager", "user"):
+            name = f"plans_{role}"
+            user_ids[role] = client.post(
+                "/register", json={"username": name, "email": f"{name}@example.com", "password": "pw", "role": role},
+            ).json()["id"]
+            tokens[role] = client.post("/login", data={"username": name, "password": "pw"}).json()["access_token"]
+        with SessionLocal() as db:
+            ids = seed(db, user_ids["manager"], user_ids["user"])
+
+        def call(name: str, path: str, caller: str, params: dict) -> Optional[str]:
+            response = client.get(path, params=params, headers={"Authorization": f"Bearer {tokens[caller]}"})
+            if response.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {response.status_code}: {response.text[:200]}")
+            found[name] = list(app.last)
+            return response.headers.get("X-Next-Cursor")
+
+        for name, (path, params, caller, paged) in HOT_ENDPOINTS.items():
+            path = path.format(**ids)
+            if not paged:
+                call(name, path, caller, params)
+                continue
+            cursor = call(f"{name} [first page]", path, caller, {**params, "limit": 1})
+            if cursor is None:
+                raise RuntimeError(f"{name}: no second page; seed more rows")
+            call(f"{name} [next page]", path, caller, {**params, "limit": 1, "cursor": cursor})
+
+        with SessionLocal() as db:
+            for name, run in HOT_STATEMENTS.items():
+                found[name] = statements = []
+                token = _capture.set(statements)
+                try:
+                    run(db, user_ids["user"])
+                finally:
+                    _capture.reset(token)
+    return found
+
+
+def explain(statement: str, parameters) -> list:
+    from db import engine
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan: list, endpoint: str, paged: bool) -> list:
+    from db import Base
+
+    found = []
+    for line in plan:
+        match = FULL_SCAN.match(line)
+        # `SCAN anon_1` reads a subquery's rows (e.g. a union branch), not a table
+        if match and match.group(1) in Base.metadata.tables and ALLOWED_SCANS.get(endpoint) != match.group(1):
+            found.append(line)
+        elif paged and SORTED_PAGE in line:
+            found.append(line)
+    return found
+
+
+def check(verbose: bool = False) -> List[str]:
+    """Run every hot endpoint and return the failing ``name: plan line`` entries."""
+    failures = []
+    for name, statements in collect().items():
+        endpoint, _, page = name.partition(" [")
+        for statement, parameters in statements:
+            plan = explain(statement, parameters)
+            bad = plan_problems(plan, endpoint, paged=bool(page))
+            failures += [f"{name}: {line}" for line in bad]
+            print(f"{'FAIL' if bad else 'ok':4}  {name}")
+            if bad or verbose:
+                for line in plan:
+                    print(f"        {line}")
+    return failures
+
+
+def main() -> int:
+    failures = check("--verbose" in sys.argv)
+    if failures:
+        print(f"\n{len(failures)} plan problem(s): full table scans or sorted keyset pages.")
+        return 1
+    print("\nAll hot paths use indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,5 +7,62 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     SECRET_KEY: str = 'supersecretkey'
     ALGORITHM: str = 'HS256'
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_SIZE: int = 16
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_TMP_DIR: Optional[str] = None
+    PDF_WORKERS: int = 4
+    PDF_EXTRACT_WORKERS: int = 0  # 0 = one per CPU
+    PDF_PAGES_PER_SHARD: int = 8
+    PDF_PARALLEL_MIN_PAGES: int = 16
+    PDF_SUMMARY_CHUNK_CHARS: int = 6000
+    PDF_SUMMARY_CHUNK_OVERLAP: int = 300
+    PDF_SUMMARY_MAX_CONCURRENCY: int = 4
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_READ_TIMEOUT: float = 300.0
+    OLLAMA_MAX_RETRIES: int = 2
+    OLLAMA_BACKOFF_SECONDS: float = 0.5
+    OLLAMA_POOL_SIZE: int = 16
+    OLLAMA_MAX_CONCURRENCY_PER_MODEL: int = 4
+    LLM_CACHE_PATH: Optional[str] = None  # default: backend/llm_cache.db
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    JOB_WORKERS: int = 4
+    JOB_MAX_PER_USER: int = 3
+    JOB_STALE_AFTER_SECONDS: int = 1800  # running jobs older than this are re-queued
+    JOB_UPLOAD_DIR: Optional[str] = None  # default: backend/job_uploads
+    CHAT_PUBSUB_URL: Optional[str] = None  # e.g. redis://localhost:6379/0 for multi-worker
+    CHAT_SUBSCRIBER_QUEUE_SIZE: int = 256
+    UNREAD_COUNT_TTL_SECONDS: int = 300
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    NOTIFICATION_BATCH_SIZE: int = 200
+    NOTIFICATION_FLUSH_INTERVAL_SECONDS: float = 0.25
+    NOTIFICATION_DEDUPE_WINDOW_SECONDS: float = 60.0
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # bounds how long other workers see stale roles / is_active
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    TOKEN_CACHE_SIZE: int = 10_000
+    DB_ASYNC: bool = False  # serve async handlers from an AsyncEngine (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URI: Optional[str] = None  # default: SQLALCHEMY_DATABASE_URI with the async driver
+    DB_READ_POOL_SIZE: int = 8
+    DB_WRITE_TIMEOUT_SECONDS: float = 30.0  # wait for the single SQLite writer connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -65536  # negative = KiB, i.e. 64 MiB per connection
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    METRICS_ENABLED: bool = False  # latency/SQL/LLM metrics, served at /metrics
+    METRICS_TOKEN: Optional[str] = None  # if set, /metrics requires "Authorization: Bearer <token>"
+    PROFILER_ENABLED: bool = False  # allow admins to arm the sampling profiler (/admin/profiler)
+    PROFILER_SAMPLE_INTERVAL_MS: float = 10.0
+    PROFILER_MAX_DEPTH: int = 128
+    PROFILER_MAX_SECONDS: float = 300.0  # longest a session may stay armed
+    QUERY_COUNT_MODE: str = "off"  # off | warn | raise – see query_counter.py
+    N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    BULK_MAX_ITEMS: int = 500  # items per /proposals/bulk* request
+    ANALYTICS_REFRESH_INTERVAL_SECONDS: float = 5.0
+    ANALYTICS_RECONCILE_INTERVAL_SECONDS: int = 3600
 
 settings = Settings()
@@ -3,18 +3,86 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent))
 
 # db.py: Database setup for FastAPI backend using SQLAlchemy
-from sqlalchemy import create_engine
+#
+# Two engines share the database:
+#   * `engine` – the writer.  On SQLite its pool holds a single connection, so
+#     writes queue in Python instead of failing with "database is locked".
+#   * `read_engine` – a pool of read-only connections for endpoints that never
+#     write; with WAL they read concurrently with the writer.
+# Every SQLite connection gets the pragma profile from `config.Settings`.
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 # Use SQLite for local dev; swap to PostgreSQL by changing the URL
 from config import settings
+from profiler import profiler
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
+IS_SQLITE = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas(readonly: bool) -> list:
+    """PRAGMA statements run on every new SQLite connection."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS.upper()}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE.upper()}",
+    ]
+    if readonly:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        pragmas.insert(0, f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE.upper()}")
+    return pragmas
+
+
+def install_pragmas(sync_engine, readonly: bool) -> None:
+    if not IS_SQLITE:
+        return
+    statements = sqlite_pragmas(readonly)
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def _engine_options(readonly: bool) -> dict:
+    if not IS_SQLITE:
+        return {"pool_pre_ping": True}
+    if readonly:
+        return {"pool_size": settings.DB_READ_POOL_SIZE, "max_overflow": settings.DB_READ_POOL_SIZE}
+    return {"pool_size": 1, "max_overflow": 0, "pool_timeout": settings.DB_WRITE_TIMEOUT_SECONDS}
+
+
+_connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=_connect_args, **_engine_options(readonly=False))
+read_engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=_connect_args, **_engine_options(readonly=True))
+install_pragmas(engine, readonly=False)
+install_pragmas(read_engine, readonly=True)
+
+
+
+def pool_stats(sync_engine) -> dict:
+    """Connection counts of a `QueuePool` (empty for pools without them)."""
+    pool = sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 # Dependency for FastAPI routes
@@ -24,3 +92,95 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session on the read-only pool, for handlers that never write."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async mode (DB_ASYNC=true): an AsyncEngine on aiosqlite / asyncpg for `async def` handlers
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver."""
+    if settings.ASYNC_DATABASE_URI:
+        return settings.ASYNC_DATABASE_URI
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"DB_ASYNC has no async driver for {backend!r}; set ASYNC_DATABASE_URI")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class RequestAsyncSession(AsyncSession):
+    """`AsyncSession` whose `run_sync` work is sampled for the calling request (see profiler.py)."""
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await super().run_sync(profiler.attached(fn), *args, **kwargs)
+
+
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if settings.DB_ASYNC:
+    async_url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(async_url, **_engine_options(readonly=False))
+    async_read_engine = create_async_engine(async_url, **_engine_options(readonly=True))
+    install_pragmas(async_engine.sync_engine, readonly=False)
+    install_pragmas(async_read_engine.sync_engine, readonly=True)
+    # objects are serialized after the session closes, so keep loaded state after commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, class_=RequestAsyncSession)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, expire_on_commit=False, class_=RequestAsyncSession)
+
+
+class ThreadpoolSession:
+    """Sync-mode stand-in for `AsyncSession`: `run_sync` runs ORM work on the threadpool."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await run_in_threadpool(profiler.attached(fn), self.sync_session, *args, **kwargs)
+
+    def close(self) -> None:
+        self.sync_session.close()
+
+
+AsyncDB = Union[AsyncSession, ThreadpoolSession]
+
+
+@asynccontextmanager
+async def _async_session(async_factory, sync_factory):
+    if async_factory is not None:
+        async with async_factory() as db:
+            yield db
+    else:
+        db = ThreadpoolSession(sync_factory())
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def get_async_db():
+    """Dependency for `async def` handlers.
+
+    Yields an `AsyncSession` in async mode and a `ThreadpoolSession` otherwise;
+    either way `await db.run_sync(fn)` calls `fn(session)` with a sync Session,
+    so handlers have one code path for both modes.
+    """
+    async with _async_session(AsyncSessionLocal, SessionLocal) as db:
+        yield db
+
+
+async def get_async_read_db():
+    """`get_async_db` on the read-only pool."""
+    async with _async_session(AsyncReadSessionLocal, ReadSessionLocal) as db:
+        yield db
@@ -0,0 +1,128 @@
+"""hashing.py – Dedicated, bounded executor for bcrypt password hashing.
+
+bcrypt is deliberately slow, so /login and /register hand it to a small
+process pool instead of running it on FastAPI's shared threadpool.  At most
+`HASH_WORKERS + HASH_QUEUE_SIZE` jobs may be in flight; further requests are
+rejected immediately with `HashPoolSaturated` (mapped to HTTP 503) rather
+than queueing behind the flood.  If a worker process dies (OOM, a signal),
+the request that finds the pool broken gets `HashPoolBroken` (also 503) and
+the pool is replaced for the next one.  `HASH_WORKERS = 0` hashes inline.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashPoolSaturated(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class HashPoolBroken(Exception):
+    """Raised when a hashing worker died; the pool is replaced for later requests."""
+
+
+# Executed in the worker processes; must stay module-level so they pickle.
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._slots = threading.BoundedSemaphore(max(self.capacity, 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.restarts = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:  # another request already replaced it
+                return
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolSaturated()
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool as exc:
+            self._replace_broken(executor)
+            raise HashPoolBroken() from exc
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += time.perf_counter() - started
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify *password*; also return a new hash if the stored one uses outdated parameters."""
+        ok, new_hash = self._run(_verify_and_update, password, hashed)
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return ok, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "queue_depth": max(self.in_flight - self.workers, 0),
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "restarts": self.restarts,
+                "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+hasher = PasswordHasher(workers=settings.HASH_WORKERS, queue_size=settings.HASH_QUEUE_SIZE)
@@ -0,0 +1,228 @@
+"""jobs.py – Background summarization jobs persisted in `summary_jobs`.
+
+Submitting a job inserts a row and returns immediately; a bounded worker
+pool runs `generate_summary` / `summarize_pdf` and writes the result back.
+Each user may only have `JOB_MAX_PER_USER` jobs queued or running at once;
+the limit is checked by the INSERT itself, so concurrent submits cannot pass
+it together.  Workers claim a job by moving it from queued to running with a
+conditional UPDATE, so a job enqueued by several processes runs once.
+
+Queued jobs are resumed on startup.  A running job is only re-queued once it
+has been running for `JOB_STALE_AFTER_SECONDS`: other workers may still be
+running it, and the process that crashed cannot say so.  That sweep repeats
+while the app runs, and a write-back from a job that was re-queued meanwhile
+is dropped.
+"""
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import SessionLocal
+from models import SummaryJob, User
+from pdf_data_read import SummaryCancelled, summarize_pdf
+from summary_generator import generate_summary
+
+SUMMARY = "summary"
+PDF_SUMMARY = "pdf_summary"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobLimitExceeded(Exception):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+def job_upload_dir() -> Path:
+    path = Path(settings.JOB_UPLOAD_DIR or Path(__file__).resolve().parent / "job_uploads")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _run_job(kind: str, params: dict, cancel_event: threading.Event) -> str:
+    if kind == SUMMARY:
+        return generate_summary(params["title"], params["description"], use_cache=params.get("use_cache", True))
+    if kind == PDF_SUMMARY:
+        return summarize_pdf(params["path"], use_cache=params.get("use_cache", True), cancel_event=cancel_event)
+    raise ValueError(f"Unknown job kind {kind!r}")
+
+
+class JobManager:
+    def __init__(self, workers: int, max_per_user: int):
+        self.max_per_user = max_per_user
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-job")
+        self._cancel_events: Dict[int, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def insert_within_limit(self, user_id: int, kind: str, params: dict):
+        """INSERT ... SELECT adding a queued job only while the user has fewer than `max_per_user` active."""
+        active = (
+            select(func.count())
+            .select_from(SummaryJob)
+            .where(SummaryJob.user_id == user_id, SummaryJob.status.in_(ACTIVE_STATUSES))
+            .scalar_subquery()
+        )
+        row = select(
+            literal(user_id), literal(kind), literal(QUEUED),
+            literal(params, SummaryJob.params.type), literal(datetime.utcnow(), SummaryJob.created_at.type),
+        ).where(active < self.max_per_user)
+        return (
+            insert(SummaryJob)
+            .from_select(["user_id", "kind", "status", "params", "created_at"], row)
+            .returning(SummaryJob.id)
+        )
+
+    def submit(self, db: Session, user_id: int, kind: str, params: dict) -> SummaryJob:
+        # Serializes one user's submits where the database has row locks (Postgres); SQLite
+        # ignores FOR UPDATE, but its single writer already runs the INSERTs one at a time.
+        db.execute(select(User.id).where(User.id == user_id).with_for_update())
+        job_id = db.execute(self.insert_within_limit(user_id, kind, params)).scalar_one_or_none()
+        if job_id is None:
+            db.rollback()
+            raise JobLimitExceeded()
+        db.commit()
+        job = db.get(SummaryJob, job_id)
+        self._enqueue(job_id)
+        return job
+
+    def cancel(self, db: Session, job: SummaryJob) -> SummaryJob:
+        """Cancel a queued or running job; finished jobs are returned unchanged."""
+        cancelled = db.execute(
+            update(SummaryJob)
+            .where(SummaryJob.id == job.id, SummaryJob.status.in_(ACTIVE_STATUSES))
+            .values(status=CANCELLED, finished_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        db.refresh(job)
+        if cancelled:
+            with self._lock:
+                event = self._cancel_events.get(job.id)
+            if event is not None:
+                event.set()
+        return job
+
+    def resume_pending(self) -> int:
+        """Enqueue queued and stale running jobs, then keep sweeping for stale ones; called on startup."""
+        ids = self._requeue(include_queued=True)
+        if self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="summary-job-sweeper", daemon=True)
+            self._sweeper.start()
+        return len(ids)
+
+    def _sweep(self) -> None:
+        while not self._stopped.wait(settings.JOB_STALE_AFTER_SECONDS / 4):
+            try:
+                self._requeue(include_queued=False)
+            except Exception:  # keep sweeping; the next pass retries
+                pass
+
+    def _requeue(self, include_queued: bool) -> List[int]:
+        """Move jobs running for over `JOB_STALE_AFTER_SECONDS` back to queued and enqueue them."""
+        stale = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+        with SessionLocal() as db:
+            ids = list(db.scalars(
+                update(SummaryJob)
+                .where(SummaryJob.status == RUNNING, or_(SummaryJob.started_at.is_(None), SummaryJob.started_at < stale))
+                .values(status=QUEUED, started_at=None)
+                .returning(SummaryJob.id)
+            ))
+            if include_queued:
+                ids = list(db.scalars(select(SummaryJob.id).where(SummaryJob.status == QUEUED).order_by(SummaryJob.id)))
+            db.commit()
+        for job_id in ids:
+            self._enqueue(job_id)
+        return ids
+
+    def _enqueue(self, job_id: int) -> None:
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+        self._executor.submit(self._work, job_id)
+
+    def _work(self, job_id: int) -> None:
+        with self._lock:
+            cancel_event = self._cancel_events.get(job_id) or threading.Event()
+        db = SessionLocal()
+        try:
+            started_at = datetime.utcnow()
+            # Only one worker, in any process, moves the job from queued to running.  The
+            # commit releases the (single, on SQLite) writer connection for the whole model call.
+            row = db.execute(
+                update(SummaryJob)
+                .where(SummaryJob.id == job_id, SummaryJob.status == QUEUED)
+                .values(status=RUNNING, started_at=started_at)
+                .returning(SummaryJob.kind, SummaryJob.params)
+            ).first()
+            db.commit()
+            if row is None:
+                return
+
+            try:
+                result, error, status = _run_job(row.kind, dict(row.params or {}), cancel_event), None, SUCCEEDED
+            except SummaryCancelled:
+                result, error, status = None, None, CANCELLED
+            except Exception as exc:
+                result, error, status = None, str(exc), FAILED
+
+            # skipped if the job was cancelled, or re-queued as stale and claimed again
+            db.execute(
+                update(SummaryJob)
+                .where(SummaryJob.id == job_id, SummaryJob.status == RUNNING, SummaryJob.started_at == started_at)
+                .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
+            with self._lock:
+                if self._cancel_events.get(job_id) is cancel_event:
+                    del self._cancel_events[job_id]
+            self._cleanup_upload(job_id)
+
+    def _cleanup_upload(self, job_id: int) -> None:
+        with SessionLocal() as db:
+            job = db.get(SummaryJob, job_id)
+            if job is None or job.kind != PDF_SUMMARY or job.status in ACTIVE_STATUSES:
+                return
+            path = (job.params or {}).get("path")
+        if path:
+            Path(path).unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        # unfinished jobs stay queued/running in the table and resume on next startup
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def store_job_upload(temp_path: Path) -> Path:
+    """Move a streamed upload somewhere that survives restarts until its job finishes."""
+    target = job_upload_dir() / temp_path.name
+    shutil.move(str(temp_path), target)
+    return target
+
+
+def job_to_dict(job: SummaryJob) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+job_manager = JobManager(workers=settings.JOB_WORKERS, max_per_user=settings.JOB_MAX_PER_USER)
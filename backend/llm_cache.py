@@ -0,0 +1,150 @@
+"""llm_cache.py – Persistent, content-addressed cache for LLM outputs.
+
+Entries live in a small SQLite file (separate from the application database,
+opened on first use rather than at import)
+keyed by a SHA-256 of the normalized input, model name, prompt template and
+temperature.  The cache is bounded by total stored bytes; the least recently
+used entries are evicted first.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from config import settings
+
+# Only bump an entry's recency if it has not been touched for this long, so hot
+# keys do not turn every hit into a write.
+_TOUCH_INTERVAL_SECONDS = 60
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace so trivially different inputs share a cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.total_bytes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """The cache connection, opened on first use (call with `_lock` held)."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+            self.total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(inputs: dict, model: str, template: str, temperature: float) -> str:
+        payload = json.dumps(
+            {"inputs": inputs, "model": model, "template": template, "temperature": temperature},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db().execute("SELECT value, last_access FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if now - row[1] > _TOUCH_INTERVAL_SECONDS:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            old = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for key, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.total_bytes -= size
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], str], bypass: bool = False) -> str:
+        """Return the cached value for *key*, computing and storing it on a miss.
+
+        With *bypass* the cache is neither read nor written.
+        """
+        if bypass:
+            return compute()
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                "entries": entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM llm_cache")
+            self.total_bytes = 0
+
+
+llm_cache = LLMCache(
+    settings.LLM_CACHE_PATH or str(Path(__file__).resolve().parent / "llm_cache.db"),
+    settings.LLM_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,175 @@
+"""llm_client.py – Shared HTTP client for the Ollama API.
+
+One `OllamaClient` per base URL keeps a pooled keep-alive `requests.Session`,
+applies connect/read timeouts, retries transient failures with exponential
+backoff, and caps concurrent requests per model with a semaphore.
+`get_llm()` returns a small LLM handle (`invoke` / `stream` / `batch`) used by
+`summary_generator` and `pdf_data_read`.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+from metrics import observe_llm_call
+
+RETRY_STATUS = {500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the model server cannot produce a response."""
+
+
+class OllamaClient:
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float,
+        read_timeout: float,
+        max_retries: int,
+        backoff: float,
+        pool_size: int,
+        max_concurrency_per_model: int,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._semaphores:
+                self._semaphores[model] = threading.BoundedSemaphore(self.max_concurrency_per_model)
+            return self._semaphores[model]
+
+    def _post(self, payload: dict, stream: bool) -> requests.Response:
+        """POST /api/generate, retrying connection errors, timeouts and 5xx responses."""
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(
+                    f"{self.base_url}/api/generate", json=payload, timeout=self.timeout, stream=stream
+                )
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    if response.status_code >= 400:
+                        detail = response.text[:200]
+                        response.close()
+                        raise LLMError(f"Ollama returned {response.status_code}: {detail}")
+                    return response
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= self.max_retries:
+                    raise LLMError(f"Ollama request failed: {exc}") from exc
+            attempt += 1
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+
+    @staticmethod
+    def _payload(prompt: str, model: str, temperature: float, stream: bool) -> dict:
+        return {"model": model, "prompt": prompt, "stream": stream, "options": {"temperature": temperature}}
+
+    def generate(self, prompt: str, model: str, temperature: float) -> str:
+        with self._semaphore(model):
+            started = time.perf_counter()
+            response = self._post(self._payload(prompt, model, temperature, stream=False), stream=False)
+            body = response.json()
+            text = body.get("response", "")
+            observe_llm_call(model, "generate", time.perf_counter() - started, prompt, text,
+                             body.get("prompt_eval_count"), body.get("eval_count"))
+            return text
+
+    def stream(self, prompt: str, model: str, temperature: float) -> Iterator[str]:
+        """Yield response tokens; closing the generator closes the HTTP stream."""
+        with self._semaphore(model):
+            started = time.perf_counter()
+            response = self._post(self._payload(prompt, model, temperature, stream=True), stream=True)
+            parts, final = [], {}
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        parts.append(chunk["response"])
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+            finally:
+                response.close()
+                observe_llm_call(model, "stream", time.perf_counter() - started, prompt, "".join(parts),
+                                 final.get("prompt_eval_count"), final.get("eval_count"))
+
+    def batch(self, prompts: List[str], model: str, temperature: float) -> List[str]:
+        """Run several prompts concurrently over the pooled connections, in order.
+
+        Ollama's generate API takes one prompt per request, so a batch is
+        dispatched as parallel requests bounded by the per-model semaphore.
+        """
+        if len(prompts) <= 1:
+            return [self.generate(p, model, temperature) for p in prompts]
+        with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_concurrency_per_model)) as pool:
+            return list(pool.map(lambda p: self.generate(p, model, temperature), prompts))
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class LLM:
+    """A model bound to a shared client: `invoke(prompt) -> str`, `stream(prompt)`, `batch(prompts)`."""
+
+    def __init__(self, client: OllamaClient, model: str, temperature: float):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, prompt: str) -> str:
+        return self.client.generate(prompt, self.model, self.temperature)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        return self.client.stream(prompt, self.model, self.temperature)
+
+    def batch(self, prompts: List[str]) -> List[str]:
+        return self.client.batch(prompts, self.model, self.temperature)
+
+
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: Optional[str] = None) -> OllamaClient:
+    base_url = (base_url or settings.OLLAMA_BASE_URL).rstrip("/")
+    with _clients_lock:
+        if base_url not in _clients:
+            _clients[base_url] = OllamaClient(
+                base_url,
+                connect_timeout=settings.OLLAMA_CONNECT_TIMEOUT,
+                read_timeout=settings.OLLAMA_READ_TIMEOUT,
+                max_retries=settings.OLLAMA_MAX_RETRIES,
+                backoff=settings.OLLAMA_BACKOFF_SECONDS,
+                pool_size=settings.OLLAMA_POOL_SIZE,
+                max_concurrency_per_model=settings.OLLAMA_MAX_CONCURRENCY_PER_MODEL,
+            )
+        return _clients[base_url]
+
+
+def get_llm(model: str, temperature: float, base_url: Optional[str] = None) -> LLM:
+    return LLM(get_client(base_url), model, temperature)
+
+
+def close_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
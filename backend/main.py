@@ -1,25 +1,32 @@
 # main.py
 from __future__ import annotations
 
-import sys, json
+import asyncio, hmac, sys, json, time
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Optional, Any
 
 sys.path.append(str(Path(__file__).parent.resolve()))
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import event
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from pydantic import BaseModel, Field, field_serializer
 import uvicorn
-from fastapi import UploadFile, File, Form, Body
+from starlette.concurrency import run_in_threadpool
+from fastapi import UploadFile, File, Form, Body, Query
 
-from db import Base, engine, get_db, SessionLocal
-from summary_generator import generate_summary
+from db import (
+    AsyncDB, Base, engine, get_async_read_db, get_db, get_read_db, pool_stats, read_engine, ReadSessionLocal, SessionLocal,
+)
+from summary_generator import generate_summary, stream_summary, summary_cache_key
+from llm_cache import llm_cache
+from llm_client import close_clients
+from sse import format_sse, sse_response
+from chat_hub import ACCESS_CHANGED, hub, proposal_channel, publish_access_changed
+from config import settings
 from models import (
     User,
     Role,
@@ -27,12 +34,32 @@ from models import (
     ProposalSection,
     Comment,
     Template,
-    Analytics,
     Notification,
     ProposalChatMessage,  # <-- add this
+    SummaryJob,
+    DEFAULT_PROPOSAL_STATUS,
+)
+from auth import (
+    get_password_hash, verify_password_and_update, create_access_token, decode_access_token,
+    get_current_user, get_current_user_async, get_stream_user, load_principal, Principal,
 )
-from auth import get_password_hash, verify_password, create_access_token, get_current_user
+from hashing import HashPoolBroken, HashPoolSaturated, hasher
 from pdf_data_read import summarize_pdf
+from analytics import init_analytics, read_snapshot, refresher
+from search import ensure_search_index, search
+from migrations import run_migrations
+from uploads import stream_upload_to_tempfile, run_in_worker_pool, shutdown_worker_pool
+from jobs import PDF_SUMMARY, SUMMARY, JobLimitExceeded, job_manager, job_to_dict, store_job_upload
+from pagination import CursorPage, NEXT_CURSOR_HEADER
+from projections import Projection, page_response
+from bulk_proposals import assign_proposals, create_proposals, summarize, update_statuses
+from query_counter import QUERY_COUNT_HEADER, QueryCountMiddleware
+import metrics
+from profiler import ProfiledRoute, ProfilerMiddleware, ProfileSession, profiler
+from notifications import (
+    Draft, mark_all_read, mark_read, notification_events, outbox, proposal_assignment_message, queue_notifications,
+    unread_counter,
+)
 
 
 from fastapi import FastAPI, Depends, HTTPException
@@ -40,6 +67,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+run_migrations(engine)
 
 app = FastAPI()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
@@ -50,7 +79,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER],
 )
+app.add_middleware(QueryCountMiddleware)
+if settings.METRICS_ENABLED:
+    # added last, so it wraps everything else and sees the final status code
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.registry.register_stats("bidbuilder_llm_cache", llm_cache.stats)
+    metrics.registry.register_stats("bidbuilder_password_hashing", hasher.stats)
+    metrics.registry.register_stats("bidbuilder_notification_outbox", outbox.stats)
+    metrics.registry.register_stats("bidbuilder_db_write_pool", lambda: pool_stats(engine))
+    metrics.registry.register_stats("bidbuilder_db_read_pool", lambda: pool_stats(read_engine))
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+    app.router.route_class = ProfiledRoute  # before any route is declared
 
 
 # Default Templates
@@ -85,53 +127,42 @@ def seed_templates(db: Session) -> None:
         )
     db.commit()
 
-def init_analytics(db: Session) -> None:
-    keys = ["proposalsByStatus", "proposalsByPriority", "monthlyProposals", "teamPerformance", "recentActivity"]
-    for key in keys:
-        if not db.query(Analytics).filter(Analytics.key == key).first():
-            db.add(Analytics(key=key, data={}))
-    db.commit()
-
 @app.on_event("startup")
 def on_startup() -> None:
     db = SessionLocal()
     seed_templates(db)
     init_analytics(db)
-    update_analytics(db)
     db.close()
-
-def update_analytics(db: Session) -> None:
-    status_counts = db.query(Proposal.status, func.count(Proposal.id)).group_by(Proposal.status).all()
-    proposals_by_status = {s or "Unknown": c for s, c in status_counts}
-
-    six_months_ago = datetime.utcnow().replace(day=1)
-    monthly = (
-        db.query(
-            func.strftime("%Y-%m", Proposal.created_at).label("month"),
-            func.count(Proposal.id),
-        )
-        .filter(Proposal.created_at >= six_months_ago)
-        .group_by("month")
-        .all()
+    refresher.start()
+    outbox.start()
+    refresher.mark_dirty()
+    job_manager.resume_pending()
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    refresher.stop()
+    outbox.stop()
+    hasher.shutdown()
+    shutdown_worker_pool()
+    job_manager.shutdown()
+    close_clients()
+    hub.close()
+
+@app.exception_handler(HashPoolSaturated)
+def hash_pool_saturated_handler(request: Request, exc: HashPoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service busy, please retry"},
+        headers={"Retry-After": "1"},
     )
-    monthly_dict = {m: c for m, c in monthly}
 
-    team_perf = (
-        db.query(User.username, func.count(Proposal.id))
-        .join(Proposal, Proposal.owner_id == User.id)
-        .group_by(User.username)
-        .all()
+@app.exception_handler(HashPoolBroken)
+def hash_pool_broken_handler(request: Request, exc: HashPoolBroken):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service restarting, please retry"},
+        headers={"Retry-After": "1"},
     )
-    team_perf_dict = {u: c for u, c in team_perf}
-
-    mapping = {
-        "proposalsByStatus": proposals_by_status,
-        "monthlyProposals": monthly_dict,
-        "teamPerformance": team_perf_dict,
-    }
-    for key, data in mapping.items():
-        db.query(Analytics).filter(Analytics.key == key).update({"data": data})
-    db.commit()
 
 # Pydantic Schemas
 class UserCreate(BaseModel):
@@ -182,6 +213,40 @@ class ProposalOut(BaseModel):
     client_name: Optional[str] = None
     model_config = {"from_attributes": True, "populate_by_name": True}
 
+# Columns behind ProposalOut for the projected list endpoints (keys are output names)
+PROPOSAL_PROJECTION = Projection(
+    {
+        "id": Proposal.id,
+        "title": Proposal.title,
+        "description": Proposal.description,
+        "owner_id": Proposal.owner_id,
+        "owner_name": User.username,
+        "category": Proposal.category,
+        "template_id": Proposal.template_id,
+        "estimatedValue": Proposal.estimated_value,
+        "timeline": Proposal.timeline,
+        "priority": Proposal.priority,
+        "status": Proposal.status,
+        "requirements": Proposal.requirements,
+        "client_name": Proposal.client_name,
+    },
+    joins={"owner_name": (User, User.id == Proposal.owner_id)},
+)
+
+
+def proposal_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated subset of ProposalOut fields, e.g. id,title,status"),
+) -> List[str]:
+    return PROPOSAL_PROJECTION.parse(fields)
+
+
+async def proposal_page(db: AsyncDB, page: CursorPage, names: List[str], *conditions, any_of=()):
+    """One page of projected proposal rows matching *conditions* (and one of *any_of*), as an orjson response."""
+    rows = await db.run_sync(lambda s: page.apply(
+        PROPOSAL_PROJECTION.query(s, names).filter(*conditions), Proposal.id, any_of=any_of,
+    ))
+    return page_response(rows, names, page)
+
 class ProposalSectionAssignRequest(BaseModel):
     section_id: int
     user_id: int
@@ -229,16 +294,29 @@ class CommentOut(BaseModel):
     proposal_id: int
     user_id: int
     content: str
-    created_at: str
+    created_at: datetime
     model_config = {"from_attributes": True}
 
 class NotificationOut(BaseModel):
     id: int
     message: str
-    created_at: str
+    created_at: datetime
     is_read: bool
     model_config = {"from_attributes": True}
 
+    @field_serializer("created_at")
+    def _serialize_created_at(self, value: datetime) -> str:
+        return value.isoformat()
+
+class ProfilerStartRequest(BaseModel):
+    route: Optional[str] = None  # route template, e.g. "/search"
+    requests: Optional[int] = Field(None, ge=1, le=10_000)
+    slower_than_ms: Optional[float] = Field(None, gt=0)
+    duration_seconds: float = Field(60.0, gt=0)
+
+class NotificationReadRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=1000)
+
 class ProposalAssignmentRequest(BaseModel):
     proposal_id: int
     user_id: int
@@ -249,6 +327,16 @@ class SubmitBackToManager(BaseModel):
 class ApproveProposal(BaseModel):
     proposal_id: int
 
+# --- Bulk Schemas (one transaction per request, per-item results) ---
+class BulkProposalCreate(BaseModel):
+    items: List[ProposalCreate] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+class BulkStatusUpdateRequest(BaseModel):
+    items: List[ProposalStatusUpdateRequest] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+class BulkAssignmentRequest(BaseModel):
+    items: List[ProposalAssignmentRequest] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
 # --- Chat Schemas ---
 class ChatMessageCreate(BaseModel):
     content: str
@@ -269,9 +357,12 @@ class ChatMessageOut(BaseModel):
 
 # Auth Endpoints
 @app.post("/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter((User.username == user.username) | (User.email == user.email)).first():
+def register(user: UserCreate, db: Session = Depends(get_db), read_db: Session = Depends(get_read_db)):
+    if read_db.query(User).filter((User.username == user.username) | (User.email == user.email)).first():
         raise HTTPException(status_code=400, detail="Username or email already registered")
+    read_db.close()
+    # hash before touching the writer connection so bcrypt never holds it
+    hashed_password = get_password_hash(user.password)
     allowed = {"user", "manager", "admin"}
     role_name = (user.role or "user").lower()
     if role_name not in allowed:
@@ -285,7 +376,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=hashed_password,
         role_id=role.id,
     )
     db.add(db_user)
@@ -294,10 +385,19 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     return {"id": db_user.id, "username": db_user.username, "email": db_user.email, "role": role.name}
 
 @app.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_read_db)):
+    user = db.query(User).options(joinedload(User.role)).filter(User.username == form_data.username).first()
+    if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
+    db.close()  # release the read connection while bcrypt runs
+    verified, new_hash = verify_password_and_update(form_data.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    if new_hash:
+        # CryptContext parameters changed since this hash was stored
+        with SessionLocal() as write_db:
+            write_db.query(User).filter(User.id == user.id).update({"hashed_password": new_hash})
+            write_db.commit()
     token = create_access_token(data={"sub": user.id})
     return {
         "access_token": token,
@@ -307,13 +407,79 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         "role": user.role.name if user.role else None
     }
 
+@app.get("/auth/hashing_stats")
+def hashing_stats(user: Principal = Depends(get_current_user)):
+    if user.role_name != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view hashing stats")
+    return hasher.stats()
+
+def _require_profiler_admin(user: Principal) -> None:
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled (PROFILER_ENABLED)")
+    if user.role_name != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can use the profiler")
+
+@app.post("/admin/profiler/start")
+def start_profiler(req: ProfilerStartRequest, user: Principal = Depends(get_current_user)):
+    _require_profiler_admin(user)
+    if req.route is None and req.slower_than_ms is None:
+        raise HTTPException(status_code=400, detail="Give a route, a slower_than_ms threshold, or both")
+    if req.route is not None and req.route not in {getattr(r, "path", None) for r in app.routes}:
+        raise HTTPException(status_code=400, detail=f"Unknown route {req.route!r}")
+    profiler.start(ProfileSession(
+        route=req.route,
+        requests=req.requests,
+        slower_than_ms=req.slower_than_ms,
+        duration_seconds=min(req.duration_seconds, settings.PROFILER_MAX_SECONDS),
+    ))
+    return profiler.status()
+
+@app.post("/admin/profiler/stop")
+def stop_profiler(user: Principal = Depends(get_current_user)):
+    _require_profiler_admin(user)
+    profiler.stop()
+    return profiler.status()
+
+@app.get("/admin/profiler")
+def profiler_status(user: Principal = Depends(get_current_user)):
+    _require_profiler_admin(user)
+    return profiler.status()
+
+@app.get("/admin/profiler/profile")
+def download_profile(
+    route: str,
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    user: Principal = Depends(get_current_user),
+):
+    """Captured samples for *route* as collapsed stacks or a speedscope JSON file."""
+    _require_profiler_admin(user)
+    if route not in profiler.status()["routes"]:
+        raise HTTPException(status_code=404, detail=f"No samples captured for {route!r}")
+    name = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    if format == "speedscope":
+        body, media_type, filename = json.dumps(profiler.speedscope(route)), "application/json", f"{name}.speedscope.json"
+    else:
+        body, media_type, filename = profiler.collapsed(route), "text/plain", f"{name}.collapsed.txt"
+    return Response(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    """Prometheus scrape endpoint; requires the `METRICS_TOKEN` bearer token when one is configured."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/proposals", response_model=ProposalOut)
 def create_proposal(
     proposal: ProposalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    if user.role.name == "user":
+    if user.role_name == "user":
         raise HTTPException(status_code=403, detail="Only managers can create proposals")
 
     db_proposal = Proposal(
@@ -325,14 +491,13 @@ def create_proposal(
         estimated_value=proposal.estimated_value,
         timeline=proposal.timeline,
         priority=proposal.priority,
-        status=proposal.status,
+        status=proposal.status or DEFAULT_PROPOSAL_STATUS,
         requirements=proposal.requirements,
         client_name=proposal.client_name,
     )
     db.add(db_proposal)
     db.commit()
     db.refresh(db_proposal)
-    update_analytics(db)
     return db_proposal
 
 
@@ -341,9 +506,9 @@ def create_proposal_from_template(
     template_id: int,
     title: str,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    if user.role.name == "user":
+    if user.role_name == "user":
         raise HTTPException(status_code=403, detail="Only managers can create proposals from templates")
 
     template = db.query(Template).filter(Template.id == template_id).first()
@@ -370,14 +535,14 @@ def edit_proposal(
     proposal_id: int,
     proposal_data: ProposalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
 
-    is_manager = user.role.name == "manager"
-    is_user = user.role.name == "user"
+    is_manager = user.role_name == "manager"
+    is_user = user.role_name == "user"
     is_assigned_user = proposal.owner_id == user.id and "manager_id:" in (proposal.requirements or "")
     is_pending_submission = proposal.status == "Pending Approval"
 
@@ -405,9 +570,9 @@ def edit_proposal(
 def create_template(
     template: ProposalTemplateCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    if user.role.name not in {"admin", "manager"}:
+    if user.role_name not in {"admin", "manager"}:
         raise HTTPException(status_code=403, detail="Not authorized")
 
     if db.query(Template).filter(Template.name == template.name).first():
@@ -439,47 +604,40 @@ def create_template(
 
 
 @app.get("/templates", response_model=List[ProposalTemplateOut])
-def list_templates(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return db.query(Template).all()
+async def list_templates(
+    page: CursorPage = Depends(),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await db.run_sync(lambda s: page.apply(s.query(Template), Template.id))
 
 # Analytics
 @app.get("/analytics")
-def get_analytics(db: Session = Depends(get_db)):
-    rows = db.query(Analytics).all()
-    return {
-        row.key: json.loads(row.data) if isinstance(row.data, str) else row.data
-        for row in rows
-    }
+async def get_analytics(db: AsyncDB = Depends(get_async_read_db)):
+    return await db.run_sync(read_snapshot)
 
 
 # Assign Section to User
 @app.post("/sections/assign")
-def assign_section(req: ProposalSectionAssignRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    section = db.query(ProposalSection).filter(ProposalSection.id == req.section_id).first()
+def assign_section(req: ProposalSectionAssignRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    section = (
+        db.query(ProposalSection)
+        .options(joinedload(ProposalSection.proposal))
+        .filter(ProposalSection.id == req.section_id)
+        .first()
+    )
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     # Only proposal owner or admin/manager can assign
-    if section.proposal.owner_id != user.id and user.role.name not in ["admin", "manager"]:
+    if section.proposal.owner_id != user.id and user.role_name not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     section.assigned_user_id = req.user_id
     db.commit()
     return {"ok": True}
 
-# Notify assigned user when a section is assigned
-@event.listens_for(ProposalSection, 'after_update')
-def notify_section_assignment(mapper, connection, target):
-    if target.assigned_user_id:
-        ins = Notification.__table__.insert().values(
-            user_id=target.assigned_user_id,
-            message=f"You have been assigned to section '{target.title}' in proposal ID {target.proposal_id}.",
-            created_at=datetime.utcnow(),
-            is_read=False
-        )
-        connection.execute(ins)
-
 # Add Comment to Section
 @app.post("/sections/comment", response_model=CommentOut)
-def comment_section(req: ProposalSectionCommentRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def comment_section(req: ProposalSectionCommentRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     section = db.query(ProposalSection).filter(ProposalSection.id == req.section_id).first()
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
@@ -491,22 +649,23 @@ def comment_section(req: ProposalSectionCommentRequest, db: Session = Depends(ge
 
 # Search Proposals/Sections
 @app.get("/search")
-def search_proposals(q: str, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    proposals = db.query(Proposal).filter(Proposal.owner_id == user.id, Proposal.description.ilike(f"%{q}%")).all()
-    sections = db.query(ProposalSection).join(Proposal).filter(Proposal.owner_id == user.id, ProposalSection.content.ilike(f"%{q}%")).all()
-    return {
-        "proposals": [{"id": p.id, "title": p.title, "description": p.description} for p in proposals],
-        "sections": [{"id": s.id, "title": s.title, "content": s.content, "proposal_id": s.proposal_id} for s in sections]
-    }
+async def search_proposals(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    return await db.run_sync(search, q, owner_id=user.id, limit=limit, offset=offset)
 
 # Update Proposal Status (Workflow)
 @app.post("/proposals/status")
-def update_proposal_status(req: ProposalStatusUpdateRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update_proposal_status(req: ProposalStatusUpdateRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     proposal = db.query(Proposal).filter(Proposal.id == req.proposal_id).first()
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     # Only owner or admin/manager can update status
-    if proposal.owner_id != user.id and user.role.name not in ["admin", "manager"]:
+    if proposal.owner_id != user.id and user.role_name not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     proposal.status = req.status
     db.commit()
@@ -514,16 +673,73 @@ def update_proposal_status(req: ProposalStatusUpdateRequest, db: Session = Depen
 
 # List Notifications
 @app.get("/notifications", response_model=List[NotificationOut])
-def list_notifications(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return db.query(Notification).filter(Notification.user_id == user.id).order_by(Notification.created_at.desc()).all()
+async def list_notifications(
+    page: CursorPage = Depends(),
+    unread_only: bool = False,
+    after_id: Optional[int] = Query(None, description="Only notifications newer than this id"),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    def load(s: Session):
+        query = s.query(Notification).filter(Notification.user_id == user.id)
+        if unread_only:
+            query = query.filter(Notification.is_read == False)
+        if after_id is not None:
+            query = query.filter(Notification.id > after_id)
+        return page.apply(query, Notification.id, descending=True, sort_column=Notification.created_at)
+    return await db.run_sync(load)
+
+@app.get("/notifications/stream")
+async def stream_notifications(request: Request, user: Principal = Depends(get_stream_user)):
+    """
+    Server-Sent Events: one `unread` event with the current count, any
+    notifications newer than `Last-Event-ID` (on reconnect), then a
+    `notification` event per new notification and `unread` events when
+    the count changes elsewhere.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    last_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return sse_response(notification_events(request, user.id, last_id))
+
+@app.get("/notifications/outbox_stats")
+def notification_outbox_stats(user: Principal = Depends(get_current_user)):
+    if user.role_name != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view notification stats")
+    return outbox.stats()
+
+@app.get("/notifications/unread_count")
+async def notifications_unread_count(db: AsyncDB = Depends(get_async_read_db), user: Principal = Depends(get_current_user_async)):
+    return {"unread": await db.run_sync(unread_counter.get, user.id)}
+
+@app.post("/notifications/read")
+def mark_notifications_read(
+    req: NotificationReadRequest, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)
+):
+    updated, unread = mark_read(db, user.id, req.ids)
+    return {"updated": updated, "unread": unread}
+
+@app.post("/notifications/read_all")
+def mark_all_notifications_read(db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return {"updated": mark_all_read(db, user.id), "unread": 0}
+
+@app.put("/notifications/{notification_id}/read")
+def mark_notification_read(
+    notification_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)
+):
+    updated, unread = mark_read(db, user.id, [notification_id])
+    if not updated and not db.query(Notification.id).filter(
+        Notification.id == notification_id, Notification.user_id == user.id
+    ).first():
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"updated": updated, "unread": unread}
 
 # Section-level Access Control Example (middleware for sensitive sections)
 @app.get("/sections/{section_id}", response_model=ProposalSectionOut)
-def get_section(section_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    section = db.query(ProposalSection).filter(ProposalSection.id == section_id).first()
+async def get_section(section_id: int, db: AsyncDB = Depends(get_async_read_db), user: Principal = Depends(get_current_user_async)):
+    section = await db.run_sync(lambda s: s.query(ProposalSection).filter(ProposalSection.id == section_id).first())
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
-    if section.is_sensitive and user.role.name == "junior":
+    if section.is_sensitive and user.role_name == "junior":
         raise HTTPException(status_code=403, detail="Not authorized to view sensitive section")
     return section
 
@@ -531,60 +747,109 @@ def get_section(section_id: int, db: Session = Depends(get_db), user: User = Dep
 @app.post("/get_summary")
 def get_summary(
     proposal: ProposalCreate,
+    no_cache: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     # Assume generate_summary is a custom function you have implemented elsewhere
-    summary = generate_summary(proposal.title, proposal.description)
+    summary = generate_summary(proposal.title, proposal.description, use_cache=not no_cache)
     return {"summary": summary}
 
+@app.post("/get_summary/stream")
+async def stream_proposal_summary(
+    request: Request,
+    proposal: ProposalCreate,
+    no_cache: bool = False,
+    user: Principal = Depends(get_current_user),
+):
+    """
+    Stream the summary as Server-Sent Events: `token` events carrying text
+    deltas, then one `done` event with the full summary and timings.
+    Generation stops as soon as the client disconnects.
+    """
+    key = summary_cache_key(proposal.title, proposal.description)
+
+    async def events():
+        started = time.perf_counter()
+        cached = None if no_cache else await run_in_threadpool(llm_cache.get, key)
+        if cached is not None:
+            yield format_sse({"token": cached}, event="token")
+            yield format_sse({"summary": cached, "cached": True, "ttft_ms": 0.0,
+                              "total_ms": (time.perf_counter() - started) * 1000}, event="done")
+            return
+
+        tokens = stream_summary(proposal.title, proposal.description)
+        parts, ttft = [], None
+        try:
+            while True:
+                token = await run_in_threadpool(next, tokens, None)
+                if token is None:
+                    break
+                if await request.is_disconnected():
+                    return
+                if ttft is None:
+                    ttft = (time.perf_counter() - started) * 1000
+                parts.append(token)
+                yield format_sse({"token": token}, event="token")
+        finally:
+            await run_in_threadpool(tokens.close)
+
+        summary = "".join(parts).strip()
+        if not no_cache:
+            await run_in_threadpool(llm_cache.set, key, summary)
+        yield format_sse({"summary": summary, "cached": False, "ttft_ms": ttft,
+                          "total_ms": (time.perf_counter() - started) * 1000}, event="done")
+
+    return sse_response(events())
+
 @app.delete("/proposals/{proposal_id}")
 def delete_proposal(
     proposal_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     # Only owner or admin/manager can delete
-    if proposal.owner_id != user.id and user.role.name not in ["admin", "manager"]:
+    if proposal.owner_id != user.id and user.role_name not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete this proposal")
     db.delete(proposal)
     db.commit()
-    update_analytics(db)  # Update analytics after commit
     return {"ok": True, "message": "Proposal deleted"}
 
 # List Proposals
 @app.get("/list_proposal", response_model=List[ProposalOut])
-def list_proposal(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+async def list_proposal(
+    page: CursorPage = Depends(),
+    names: List[str] = Depends(proposal_fields),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
 ):
-    if user.role.name == "manager":
-        proposals = db.query(Proposal).filter(
-            (Proposal.owner_id == user.id) |
-            (Proposal.assigned_by_manager_id == user.id)
-        ).all()
-    elif user.role.name == "user":
-        proposals = db.query(Proposal).filter(
-            (Proposal.owner_id == user.id) &
-            (Proposal.status != "Pending Approval")
-        ).all()
+    if user.role_name == "manager":
+        return await proposal_page(
+            db, page, names, any_of=(Proposal.owner_id == user.id, Proposal.assigned_by_manager_id == user.id),
+        )
+    elif user.role_name == "user":
+        return await proposal_page(db, page, names, Proposal.owner_id == user.id, Proposal.status != "Pending Approval")
     else:
-        proposals = []
-    return proposals
+        return []
 
 
 
 # Get Proposal by ID
 @app.get("/get_proposal_by_id/{proposal_id}", response_model=ProposalOut)
-def get_proposal_by_id(
+async def get_proposal_by_id(
     proposal_id: int,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
 ):
-    proposal = db.query(Proposal).filter(Proposal.id == proposal_id, Proposal.owner_id == user.id).first()
+    proposal = await db.run_sync(
+        lambda s: s.query(Proposal)
+        .options(joinedload(Proposal.owner))
+        .filter(Proposal.id == proposal_id, Proposal.owner_id == user.id)
+        .first()
+    )
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     # Add owner_name to the response
@@ -596,41 +861,99 @@ def get_proposal_by_id(
 for m in (ProposalCreate, ProposalOut, ProposalTemplateCreate, ProposalTemplateOut):
     m.model_rebuild()
 
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA journal_mode=WAL")
-    cursor.close()
 
-@app.post("/read_data_from_pdf")
-async def read_data_from_pdf(
-    file: UploadFile = File(...)):
-    """
-    Accepts a PDF file and a question, returns the summary generated from the PDF.
+PDF_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+@app.post("/read_data_from_pdf", openapi_extra=PDF_UPLOAD_OPENAPI)
+async def read_data_from_pdf(request: Request, no_cache: bool = False):
     """
-    # Save the uploaded file temporarily
-    temp_path = f"temp_{file.filename}"
-    with open(temp_path, "wb") as f:
-        f.write(await file.read())
+    Accepts a PDF upload (multipart field `file`) and returns its summary.
 
+    The upload is streamed to a unique temp file with a size cap, and the
+    extraction/summarization runs on the PDF worker pool.
+    """
+    temp_path, _ = await stream_upload_to_tempfile(request, field_name="file", suffix=".pdf")
     try:
-        summary = summarize_pdf(temp_path)
+        summary = await run_in_worker_pool(summarize_pdf, str(temp_path), not no_cache)
     finally:
-        import os
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        temp_path.unlink(missing_ok=True)
 
     return {"summary": summary}
 
-@app.get("/manager/users", response_model=List[UserOut])
-def get_users_under_manager(
+# --- Summarization Jobs ---
+
+def _submit_job(db: Session, user: Principal, kind: str, params: dict) -> dict:
+    try:
+        job = job_manager.submit(db, user.id, kind, params)
+    except JobLimitExceeded:
+        raise HTTPException(status_code=429, detail="Too many summarization jobs in progress")
+    return job_to_dict(job)
+
+def _get_own_job(db: Session, job_id: int, user: Principal) -> SummaryJob:
+    job = db.query(SummaryJob).filter(SummaryJob.id == job_id).first()
+    if not job or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs/summary", status_code=202)
+def submit_summary_job(
+    proposal: ProposalCreate,
+    no_cache: bool = False,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    params = {"title": proposal.title, "description": proposal.description, "use_cache": not no_cache}
+    return _submit_job(db, user, SUMMARY, params)
+
+@app.post("/jobs/pdf_summary", status_code=202, openapi_extra=PDF_UPLOAD_OPENAPI)
+async def submit_pdf_summary_job(
+    request: Request,
+    no_cache: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: Principal = Depends(get_current_user),
 ):
-    if user.role.name != "manager":
+    temp_path, filename = await stream_upload_to_tempfile(request, field_name="file", suffix=".pdf")
+    stored = await run_in_threadpool(store_job_upload, temp_path)
+    params = {"path": str(stored), "filename": filename, "use_cache": not no_cache}
+    try:
+        return await run_in_threadpool(_submit_job, db, user, PDF_SUMMARY, params)
+    except HTTPException:
+        stored.unlink(missing_ok=True)
+        raise
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: int, db: AsyncDB = Depends(get_async_read_db), user: Principal = Depends(get_current_user_async)):
+    return job_to_dict(await db.run_sync(_get_own_job, job_id, user))
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    job = job_manager.cancel(db, _get_own_job(db, job_id, user))
+    return job_to_dict(job)
+
+@app.get("/manager/users", response_model=List[UserOut])
+async def get_users_under_manager(
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async)
+):
+    if user.role_name != "manager":
         raise HTTPException(status_code=403, detail="Only managers can view user list")
 
-    users = db.query(User).join(Role).filter(Role.name == "user").all()
+    users = await db.run_sync(
+        lambda s: s.query(User).join(Role).options(contains_eager(User.role)).filter(Role.name == "user").all()
+    )
 
     # Convert SQLAlchemy User objects to Pydantic safely
     return [
@@ -648,9 +971,9 @@ def get_users_under_manager(
 def assign_proposal_to_user(
     req: ProposalAssignmentRequest,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    if user.role.name != "manager":
+    if user.role_name != "manager":
         raise HTTPException(status_code=403, detail="Only managers can assign proposals")
 
     proposal = db.query(Proposal).filter(Proposal.id == req.proposal_id).first()
@@ -660,23 +983,58 @@ def assign_proposal_to_user(
     if proposal.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Proposal not owned by manager")
 
-    assignee = db.query(User).filter(User.id == req.user_id).first()
-    if not assignee or assignee.role.name != "user":
+    assignee = db.query(User).options(joinedload(User.role)).filter(User.id == req.user_id).first()
+    if not assignee or not assignee.role or assignee.role.name != "user":
         raise HTTPException(status_code=400, detail="Invalid user assignment")
 
     # Track original manager id
     proposal.owner_id = req.user_id
     proposal.assigned_by_manager_id = user.id  # <-- Add this line
     proposal.requirements = f"Assigned by manager_id:{user.id}"
+    queue_notifications(db, [
+        Draft(assignee.id, proposal_assignment_message(user.username, [proposal.id]), datetime.utcnow())
+    ])
     db.commit()
+    publish_access_changed([proposal.id])
     return {"ok": True, "message": f"Proposal {proposal.id} assigned to {assignee.username}"}
 
 
+@app.post("/proposals/bulk")
+def bulk_create_proposals(
+    req: BulkProposalCreate,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    if user.role_name == "user":
+        raise HTTPException(status_code=403, detail="Only managers can create proposals")
+    return summarize(create_proposals(db, user, [item.model_dump() for item in req.items]))
+
+
+@app.post("/proposals/bulk/status")
+def bulk_update_proposal_status(
+    req: BulkStatusUpdateRequest,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    return summarize(update_statuses(db, user, [(item.proposal_id, item.status) for item in req.items]))
+
+
+@app.post("/proposals/bulk/assign")
+def bulk_assign_proposals(
+    req: BulkAssignmentRequest,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    if user.role_name != "manager":
+        raise HTTPException(status_code=403, detail="Only managers can assign proposals")
+    return summarize(assign_proposals(db, user, [(item.proposal_id, item.user_id) for item in req.items]))
+
+
 @app.post("/proposals/submit_back_to_manager")
 def submit_proposal_back_to_manager(
     req: SubmitBackToManager,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     proposal_id = req.proposal_id
     proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
@@ -702,10 +1060,10 @@ def submit_proposal_back_to_manager(
 def approve_submitted_proposal(
     req: ApproveProposal,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
     proposal_id = req.proposal_id
-    if user.role.name != "manager":
+    if user.role_name != "manager":
         raise HTTPException(status_code=403, detail="Only managers can approve proposals")
 
     proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
@@ -723,49 +1081,43 @@ def approve_submitted_proposal(
     db.query(ProposalChatMessage).filter_by(proposal_id=proposal_id).update({"visible_to_user": False})
 
     db.commit()
+    publish_access_changed([proposal_id])
     return {"ok": True, "message": f"Proposal {proposal.id} approved and reassigned to manager"}
 
 @app.get("/my_assigned_proposals", response_model=List[ProposalOut])
-def my_assigned_proposals(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+async def my_assigned_proposals(
+    page: CursorPage = Depends(),
+    names: List[str] = Depends(proposal_fields),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
 ):
-    if user.role.name != "user":
+    if user.role_name != "user":
         raise HTTPException(status_code=403, detail="Only users can access assigned proposals")
 
-    proposals = db.query(Proposal).filter(
-        Proposal.owner_id == user.id,
-        Proposal.status != "Pending Approval"
-    ).all()
-    return proposals
+    return await proposal_page(db, page, names, Proposal.owner_id == user.id, Proposal.status != "Pending Approval")
 
 
 
 @app.get("/manager/pending_approval", response_model=List[ProposalOut])
-def manager_pending_approval(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+async def manager_pending_approval(
+    page: CursorPage = Depends(),
+    names: List[str] = Depends(proposal_fields),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
 ):
-    if user.role.name != "manager":
+    if user.role_name != "manager":
         raise HTTPException(status_code=403, detail="Only managers can view pending approvals")
 
-    proposals = db.query(Proposal).filter(
-        Proposal.status == "Pending Approval",
-        Proposal.assigned_by_manager_id == user.id
-    ).all()
-    return proposals
+    return await proposal_page(
+        db, page, names, Proposal.status == "Pending Approval", Proposal.assigned_by_manager_id == user.id,
+    )
 
 
 
 # --- Proposal Chat Endpoints ---
 
-@app.post("/proposals/{proposal_id}/chat", response_model=ChatMessageOut)
-def send_proposal_chat_message(
-    proposal_id: int,
-    msg: ChatMessageCreate,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-):
+def _chat_proposal(db: Session, proposal_id: int, user: Principal) -> Proposal:
+    """Load a proposal and check the caller may use its chat (owner or assigning manager)."""
     proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
@@ -773,33 +1125,161 @@ def send_proposal_chat_message(
     allowed_users = [proposal.owner_id, proposal.assigned_by_manager_id]
     if user.id not in allowed_users:
         raise HTTPException(status_code=403, detail="Not authorized")
+    return proposal
+
+def _hides_invisible_messages(proposal: Proposal, user: Principal) -> bool:
+    # If proposal is approved and user is not manager, hide messages
+    return proposal.status == "Approved" and user.id == proposal.owner_id
+
+def _chat_message_payload(chat_msg: ProposalChatMessage) -> dict:
+    data = ChatMessageOut.model_validate(chat_msg).model_dump(mode="json")
+    data.update(proposal_id=chat_msg.proposal_id, visible_to_user=chat_msg.visible_to_user)
+    return data
+
+def _post_chat_message(db: Session, proposal: Proposal, user: Principal, content: str) -> ProposalChatMessage:
+    """Persist a chat message and fan it out to live subscribers."""
     visible_to_user = proposal.status != "Approved"
     chat_msg = ProposalChatMessage(
-        proposal_id=proposal_id,
+        proposal_id=proposal.id,
         sender_id=user.id,
-        content=msg.content,
+        content=content,
         visible_to_user=visible_to_user,
     )
     db.add(chat_msg)
     db.commit()
     db.refresh(chat_msg)
+    hub.publish(proposal_channel(proposal.id), _chat_message_payload(chat_msg))
     return chat_msg
 
-@app.get("/proposals/{proposal_id}/chat", response_model=List[ChatMessageOut])
-def get_proposal_chat_messages(
+@app.post("/proposals/{proposal_id}/chat", response_model=ChatMessageOut)
+def send_proposal_chat_message(
     proposal_id: int,
+    msg: ChatMessageCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    proposal = db.query(Proposal).filter(Proposal.id == proposal_id).first()
-    if not proposal:
-        raise HTTPException(status_code=404, detail="Proposal not found")
-    allowed_users = [proposal.owner_id, proposal.assigned_by_manager_id]
-    if user.id not in allowed_users:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    # If proposal is approved and user is not manager, hide messages
-    if proposal.status == "Approved" and user.id == proposal.owner_id:
-        messages = db.query(ProposalChatMessage).filter_by(proposal_id=proposal_id, visible_to_user=True).all()
-    else:
-        messages = db.query(ProposalChatMessage).filter_by(proposal_id=proposal_id).all()
-    return messages
\ No newline at end of file
+    proposal = _chat_proposal(db, proposal_id, user)
+    return _post_chat_message(db, proposal, user, msg.content)
+
+@app.get("/proposals/{proposal_id}/chat", response_model=List[ChatMessageOut])
+async def get_proposal_chat_messages(
+    proposal_id: int,
+    page: CursorPage = Depends(),
+    db: AsyncDB = Depends(get_async_read_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    def load(s: Session):
+        proposal = _chat_proposal(s, proposal_id, user)
+        if _hides_invisible_messages(proposal, user):
+            query = s.query(ProposalChatMessage).filter_by(proposal_id=proposal_id, visible_to_user=True)
+        else:
+            query = s.query(ProposalChatMessage).filter_by(proposal_id=proposal_id)
+        return page.apply(query, ProposalChatMessage.id)
+    return await db.run_sync(load)
+
+def _open_chat_session(token: str, proposal_id: int):
+    """Authenticate and authorize a chat socket; returns (user, assigning manager id)."""
+    payload = decode_access_token(token)
+    user = load_principal(int(payload["sub"])) if payload and payload.get("sub") else None
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user, _chat_manager_id(proposal_id, user)
+
+def _chat_manager_id(proposal_id: int, user: Principal) -> Optional[int]:
+    """Re-check chat access on the primary; returns the proposal's assigning manager id."""
+    with SessionLocal() as db:
+        return _chat_proposal(db, proposal_id, user).assigned_by_manager_id
+
+def _missed_chat_messages(proposal_id: int, after_id: int, include_hidden: bool) -> List[dict]:
+    with ReadSessionLocal() as db:
+        query = db.query(ProposalChatMessage).filter(
+            ProposalChatMessage.proposal_id == proposal_id,
+            ProposalChatMessage.id > after_id,
+        )
+        if not include_hidden:
+            query = query.filter(ProposalChatMessage.visible_to_user == True)
+        return [_chat_message_payload(m) for m in query.order_by(ProposalChatMessage.id).limit(settings.PAGE_SIZE_MAX)]
+
+def _chat_frame_content(frame: dict) -> Optional[str]:
+    """The `content` of a `{"content": "..."}` frame, or None for anything else."""
+    try:
+        data = json.loads(frame.get("text") or frame.get("bytes") or b"")
+    except ValueError:
+        return None
+    content = data.get("content") if isinstance(data, dict) else None
+    return content if isinstance(content, str) and content else None
+
+def _post_chat_message_by_id(proposal_id: int, user: Principal, content: str) -> None:
+    with SessionLocal() as db:
+        _post_chat_message(db, _chat_proposal(db, proposal_id, user), user, content)
+
+@app.websocket("/ws/proposals/{proposal_id}/chat")
+async def proposal_chat_socket(
+    websocket: WebSocket,
+    proposal_id: int,
+    token: str,
+    after_id: Optional[int] = None,
+):
+    """
+    Live chat for one proposal. Authenticate with `?token=<JWT>`; only the
+    owner and the assigning manager may connect, and access is re-checked
+    whenever the proposal is assigned or approved. Messages hidden from the
+    user (`visible_to_user=false`) reach the assigning manager only.
+    Pass `after_id` to receive messages missed since a known message id.
+    Send `{"content": "..."}` to post; new messages arrive as JSON objects.
+    """
+    try:
+        user, manager_id = await run_in_threadpool(_open_chat_session, token, proposal_id)
+    except HTTPException as exc:
+        await websocket.close(code=4000 + exc.status_code, reason=str(exc.detail))
+        return
+
+    await websocket.accept()
+    channel = proposal_channel(proposal_id)
+    # Subscribe before the replay query so nothing committed in between is lost;
+    # messages that show up in both are skipped by id.
+    queue = hub.subscribe(channel)
+    sender = None
+
+    async def pump(replayed: set) -> None:
+        nonlocal manager_id
+        while True:
+            message = await queue.get()
+            if message.get("event") == ACCESS_CHANGED:
+                try:
+                    manager_id = await run_in_threadpool(_chat_manager_id, proposal_id, user)
+                except HTTPException as exc:
+                    await websocket.close(code=4000 + exc.status_code, reason=str(exc.detail))
+                    return
+                continue
+            if message["id"] in replayed:
+                continue
+            if not message.get("visible_to_user", True) and user.id != manager_id:
+                continue
+            await websocket.send_json(message)
+
+    try:
+        missed = []
+        if after_id is not None:
+            missed = await run_in_threadpool(_missed_chat_messages, proposal_id, after_id, user.id == manager_id)
+        for message in missed:
+            await websocket.send_json(message)
+        sender = asyncio.create_task(pump({message["id"] for message in missed}))
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            content = _chat_frame_content(frame)
+            if not content:
+                await websocket.send_json({"error": "Expected {\"content\": \"...\"}"})
+                continue
+            try:
+                await run_in_threadpool(_post_chat_message_by_id, proposal_id, user, content)
+            except HTTPException as exc:
+                await websocket.send_json({"error": exc.detail})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        hub.unsubscribe(channel, queue)
@@ -0,0 +1,310 @@
+"""metrics.py – In-process metrics exported in the Prometheus text format.
+
+* `MetricsMiddleware` – per-route request latency histogram and request
+  counter (labelled by the route template, not the raw path, so label
+  cardinality stays bounded).
+* SQLAlchemy cursor hooks – statement count and time, attributed to the
+  route of the request that ran them (``(background)`` for worker threads).
+* `instrument_llm` / `observe_llm_call` – model latency and prompt/completion
+  sizes for the summary operations and for each call to the model server.
+* `observe_pdf_stages` – extract/map/reduce seconds of each PDF summary.
+* `registry.register_stats()` – scrape-time gauges from the existing
+  ``stats()`` methods (LLM cache, password hashing, notification outbox,
+  connection pools).
+
+`registry.render()` produces the body served at ``/metrics``.  Observations
+take one short lock per metric; nothing is computed until scrape time.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+BACKGROUND_ROUTE = "(background)"
+UNMATCHED_ROUTE = "(unmatched)"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}" for lv, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(label_values)
+            if row is None:
+                row = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(lv, list(row)) for lv, row in self._values.items()]
+        lines = []
+        for lv, row in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, lv, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, lv)} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, lv)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._stats: List[Tuple[str, Callable[[], dict]]] = []
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, prefix: str, stats: Callable[[], dict]) -> None:
+        """Export every numeric value of ``stats()`` as a gauge ``<prefix>_<key>`` at scrape time."""
+        self._stats.append((prefix, stats))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for prefix, stats in self._stats:
+            try:
+                values = stats()
+            except Exception:  # a failing collector must not break the scrape
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "bidbuilder_http_request_duration_seconds", "Request latency by route.", ("method", "route"),
+)
+http_requests = registry.counter(
+    "bidbuilder_http_requests_total", "Requests by route and status code.", ("method", "route", "status"),
+)
+db_statements = registry.counter(
+    "bidbuilder_db_statements_total", "SQL statements executed, by route.", ("route",),
+)
+db_seconds = registry.counter(
+    "bidbuilder_db_statement_seconds_total", "Time spent executing SQL statements, by route.", ("route",),
+)
+llm_operation_seconds = registry.histogram(
+    "bidbuilder_llm_operation_duration_seconds",
+    "Summary operations (cache lookups included), by operation and outcome.",
+    ("operation", "outcome"), LLM_BUCKETS,
+)
+llm_call_seconds = registry.histogram(
+    "bidbuilder_llm_call_duration_seconds", "Model server calls, by model and mode.", ("model", "mode"), LLM_BUCKETS,
+)
+llm_prompt_chars = registry.counter(
+    "bidbuilder_llm_prompt_chars_total", "Characters sent to the model.", ("model",),
+)
+llm_completion_chars = registry.counter(
+    "bidbuilder_llm_completion_chars_total", "Characters received from the model.", ("model",),
+)
+llm_prompt_tokens = registry.counter(
+    "bidbuilder_llm_prompt_tokens_total", "Prompt tokens reported by the model server.", ("model",),
+)
+llm_completion_tokens = registry.counter(
+    "bidbuilder_llm_completion_tokens_total", "Completion tokens reported by the model server.", ("model",),
+)
+
+pdf_stage_seconds = registry.histogram(
+    "bidbuilder_pdf_summary_stage_duration_seconds",
+    "PDF summary stages (extract overlaps map), by stage.", ("stage",), LLM_BUCKETS,
+)
+pdf_chunks = registry.counter(
+    "bidbuilder_pdf_summary_chunks_total", "Chunks mapped by PDF summaries.",
+)
+
+
+class _RequestStats:
+    """SQL totals for one request; threadpool threads of the same request add to it concurrently."""
+
+    __slots__ = ("statements", "seconds", "lock")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, elapsed: float) -> None:
+        with self.lock:
+            self.statements += 1
+            self.seconds += elapsed
+
+
+_request: ContextVar[Optional[_RequestStats]] = ContextVar("request_metrics", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    elapsed = time.perf_counter() - started
+    _record_statement(elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _failed_statement(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_started"):
+        _record_statement(time.perf_counter() - conn.info["metrics_started"].pop())
+
+
+def _record_statement(elapsed: float) -> None:
+    stats = _request.get()
+    if stats is not None:
+        stats.add(elapsed)
+    else:
+        db_statements.inc(1, BACKGROUND_ROUTE)
+        db_seconds.inc(elapsed, BACKGROUND_ROUTE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL totals per HTTP route.
+
+    The duration runs until the response body is complete, so long-lived
+    streams (SSE) report their full connection time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats()
+        token = _request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_recorded(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_recorded)
+        finally:
+            _request.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            http_request_seconds.observe(time.perf_counter() - started, method, path)
+            http_requests.inc(1, method, path, str(status))
+            if stats.statements:
+                db_statements.inc(stats.statements, path)
+                db_seconds.inc(stats.seconds, path)
+
+
+def observe_llm_call(model: str, mode: str, seconds: float, prompt: str, completion: str,
+                     prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None) -> None:
+    """Record one request to the model server."""
+    llm_call_seconds.observe(seconds, model, mode)
+    llm_prompt_chars.inc(len(prompt), model)
+    llm_completion_chars.inc(len(completion), model)
+    if prompt_tokens is not None:
+        llm_prompt_tokens.inc(prompt_tokens, model)
+    if completion_tokens is not None:
+        llm_completion_tokens.inc(completion_tokens, model)
+
+
+def observe_pdf_stages(timings: dict) -> None:
+    """Record the ``<stage>_seconds`` entries and chunk count of one PDF summary's timings."""
+    for key, value in timings.items():
+        if key.endswith("_seconds"):
+            pdf_stage_seconds.observe(value, key[: -len("_seconds")])
+    pdf_chunks.inc(timings.get("chunks", 0))
+
+
+def instrument_llm(operation: str):
+    """Decorator timing a summary operation end to end (outcome ``ok`` or ``error``)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                llm_operation_seconds.observe(time.perf_counter() - started, operation, outcome)
+        return wrapper
+    return decorator
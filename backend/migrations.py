@@ -0,0 +1,132 @@
+"""
+migrations.py – Minimal versioned schema migrations.
+
+`Base.metadata.create_all` only creates tables that do not exist yet, so
+changes to existing tables (new indexes, columns) are written here as
+numbered steps.  Applied versions are recorded in `schema_migrations`;
+`run_migrations(engine)` applies the remaining steps in order and runs on
+startup.  Steps must be idempotent because a fresh database already has
+everything `create_all` builds.
+
+CLI:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list migrations and whether they are applied
+"""
+import sys
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from sqlalchemy.engine import Connection, Engine
+
+from db import Base
+
+
+class Migration(NamedTuple):
+    version: str
+    description: str
+    apply: Callable[[Connection], None]
+
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", String, primary_key=True),
+    Column("description", String),
+    Column("applied_at", DateTime),
+)
+
+
+def create_model_indexes(*names: str) -> Callable[[Connection], None]:
+    """Migration step that creates the named indexes declared on the models."""
+
+    def apply(conn: Connection) -> None:
+        indexes = {ix.name: ix for table in Base.metadata.sorted_tables for ix in table.indexes}
+        for name in names:
+            indexes[name].create(conn, checkfirst=True)
+
+    return apply
+
+
+def recreate_model_indexes(*names: str) -> Callable[[Connection], None]:
+    """Migration step that drops and re-creates the named indexes with their current model columns."""
+
+    def apply(conn: Connection) -> None:
+        indexes = {ix.name: ix for table in Base.metadata.sorted_tables for ix in table.indexes}
+        for name in names:
+            indexes[name].drop(conn, checkfirst=True)
+            indexes[name].create(conn)
+
+    return apply
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        "0001",
+        "composite indexes for proposal, notification, chat and section lookups",
+        create_model_indexes(
+            "ix_proposals_owner_status",
+            "ix_proposals_manager_status",
+            "ix_notifications_user_created",
+            "ix_chat_messages_proposal_visible_created",
+            "ix_proposal_sections_proposal_id",
+        ),
+    ),
+    Migration(
+        "0002",
+        "indexes ending in id for keyset-paginated proposal, notification and chat lists",
+        create_model_indexes(
+            "ix_proposals_owner_id",
+            "ix_proposals_manager_id",
+            "ix_notifications_user_id",
+            "ix_chat_messages_proposal_id",
+        ),
+    ),
+    Migration(
+        "0003",
+        "notification index ending in (created_at, id) for newest-first keyset pages",
+        recreate_model_indexes("ix_notifications_user_created"),
+    ),
+]
+
+
+def applied_versions(conn: Connection) -> set:
+    _meta.create_all(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply pending migrations, each in its own transaction; returns the versions applied."""
+    import models  # noqa: F401 – register all tables on Base.metadata
+
+    applied = []
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    for migration in MIGRATIONS:
+        if migration.version in done:
+            continue
+        with engine.begin() as conn:
+            migration.apply(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.utcnow(),
+            ))
+        applied.append(migration.version)
+    return applied
+
+
+if __name__ == "__main__":
+    from db import engine
+
+    if "--status" in sys.argv:
+        with engine.begin() as conn:
+            done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            mark = "x" if migration.version in done else " "
+            print(f"[{mark}] {migration.version}  {migration.description}")
+        sys.exit(0)
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    print(f"Applied: {', '.join(applied)}" if applied else "Database is up to date.")
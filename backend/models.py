@@ -1,9 +1,11 @@
 # models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from db import Base
 
+DEFAULT_PROPOSAL_STATUS = "Draft"
+
 class Analytics(Base):
     __tablename__ = "analytics"
     id = Column(Integer, primary_key=True, index=True)
@@ -37,7 +39,7 @@ class Proposal(Base):
     title = Column(String, index=True)
     description = Column(Text)
     category = Column(String, index=True)
-    status = Column(String, default="Draft")
+    status = Column(String, default=DEFAULT_PROPOSAL_STATUS)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -60,11 +62,19 @@ class Proposal(Base):
     sections = relationship("ProposalSection", back_populates="proposal")
     chat_messages = relationship("ProposalChatMessage", back_populates="proposal")
 
+    __table_args__ = (
+        Index("ix_proposals_owner_status", "owner_id", "status"),
+        Index("ix_proposals_manager_status", "assigned_by_manager_id", "status"),
+        # keyset pages are ordered by id
+        Index("ix_proposals_owner_id", "owner_id", "id"),
+        Index("ix_proposals_manager_id", "assigned_by_manager_id", "id"),
+    )
+
 
 class ProposalSection(Base):
     __tablename__ = "proposal_sections"
     id = Column(Integer, primary_key=True, index=True)
-    proposal_id = Column(Integer, ForeignKey("proposals.id"))
+    proposal_id = Column(Integer, ForeignKey("proposals.id"), index=True)
     title = Column(String)
     content = Column(Text)
     is_sensitive = Column(Boolean, default=False)
@@ -106,6 +116,12 @@ class Notification(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     is_read = Column(Boolean, default=False)
 
+    __table_args__ = (
+        # newest-first keyset pages are ordered by (created_at, id)
+        Index("ix_notifications_user_created", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_id", "user_id", "id"),
+    )
+
 class ProposalChatMessage(Base):
     __tablename__ = "proposal_chat_messages"
     id = Column(Integer, primary_key=True, index=True)
@@ -116,4 +132,22 @@ class ProposalChatMessage(Base):
     visible_to_user = Column(Boolean, default=True)  # True until proposal is approved
 
     proposal = relationship("Proposal", back_populates="chat_messages")
-    sender = relationship("User")
\ No newline at end of file
+    sender = relationship("User")
+
+    __table_args__ = (
+        Index("ix_chat_messages_proposal_visible_created", "proposal_id", "visible_to_user", "created_at"),
+        Index("ix_chat_messages_proposal_id", "proposal_id", "id"),
+    )
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    kind = Column(String)                 # "summary" or "pdf_summary"
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed, cancelled
+    params = Column(JSON)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,365 @@
+"""notifications.py – Notification outbox, live delivery and cached unread counters.
+
+Section assignment changes (detected from attribute history, so unrelated
+edits never notify) and bulk proposal assignments (`queue_notifications`) are
+queued on the session and handed to the `outbox` after commit.  The outbox collapses duplicates within a window and writes
+the survivors in batched bulk INSERTs off the request path.
+
+New `Notification` rows are published to the recipient's hub channel once
+written; `/notifications/stream` relays them as Server-Sent Events.  Unread
+counts are cached per user (seeded by one COUNT, then adjusted as
+notifications are created or read) so clients can poll cheaply or rely on
+the stream instead of re-downloading their history.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from chat_hub import hub, notification_channel
+from config import settings
+from db import ReadSessionLocal, SessionLocal
+from models import Notification, ProposalSection
+from sse import KEEPALIVE, format_sse
+
+PENDING_KEY = "pending_notifications"
+OUTBOX_KEY = "notification_outbox"
+
+
+class UnreadCounter:
+    """Per-user unread counts, cached for `ttl` seconds between COUNT queries."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._counts: Dict[int, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> int:
+        with self._lock:
+            cached = self._counts.get(user_id)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+        count = (
+            db.query(Notification)
+            .filter(Notification.user_id == user_id, Notification.is_read == False)
+            .count()
+        )
+        self.set(user_id, count)
+        return count
+
+    def set(self, user_id: int, count: int) -> None:
+        with self._lock:
+            self._counts[user_id] = (max(count, 0), time.time() + self.ttl)
+
+    def adjust(self, user_id: int, delta: int) -> Optional[int]:
+        """Apply *delta* to a cached count; returns the new count (None if not cached)."""
+        with self._lock:
+            cached = self._counts.get(user_id)
+            if cached is None or cached[1] <= time.time():
+                return None
+            count = max(cached[0] + delta, 0)
+            self._counts[user_id] = (count, cached[1])
+            return count
+
+
+unread_counter = UnreadCounter(ttl=settings.UNREAD_COUNT_TTL_SECONDS)
+
+
+def notification_payload(notification_id: int, message: str, created_at, is_read: bool = False) -> dict:
+    return {
+        "id": notification_id,
+        "message": message,
+        "created_at": created_at.isoformat() if created_at else None,
+        "is_read": bool(is_read),
+    }
+
+
+def queue_for_delivery(session: Session, user_id: int, payload: dict) -> None:
+    """Publish *payload* to *user_id* once *session* commits."""
+    session.info.setdefault(PENDING_KEY, []).append((user_id, payload))
+
+
+def publish_notifications(items: List[Tuple[int, dict]]) -> None:
+    for user_id, payload in items:
+        unread = unread_counter.adjust(user_id, +1)
+        hub.publish(notification_channel(user_id), {"event": "notification", "notification": payload, "unread": unread})
+
+
+def publish_unread(user_id: int, unread: int) -> None:
+    hub.publish(notification_channel(user_id), {"event": "unread", "unread": unread})
+
+
+class Draft(NamedTuple):
+    user_id: int
+    message: str
+    created_at: datetime
+
+
+def assignment_message(section: ProposalSection) -> str:
+    return f"You have been assigned to section '{section.title}' in proposal ID {section.proposal_id}."
+
+
+def proposal_assignment_message(manager: str, proposal_ids: List[int], shown: int = 20) -> str:
+    ids = ", ".join(str(i) for i in proposal_ids[:shown])
+    if len(proposal_ids) > shown:
+        ids += f" and {len(proposal_ids) - shown} more"
+    noun = "proposal" if len(proposal_ids) == 1 else "proposals"
+    return f"{manager} assigned you {len(proposal_ids)} {noun} (ID {ids})."
+
+
+class NotificationOutbox:
+    """Background writer that dedupes drafts and bulk-inserts them in batches.
+
+    Drafts for the same (user, message) seen within `dedupe_window` seconds
+    are dropped.  A batch is written when `batch_size` drafts are waiting or
+    `flush_interval` seconds after the first one arrived.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, dedupe_window: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._pending: List[Draft] = []
+        self._recent: Dict[Tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._full = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics = {
+            "enqueued": 0,
+            "deduplicated": 0,
+            "written": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "flush_seconds": 0.0,
+            "max_batch": 0,
+        }
+
+    def enqueue(self, drafts: List[Draft]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._prune_recent(now)
+            for draft in drafts:
+                key = (draft.user_id, draft.message)
+                self._metrics["enqueued"] += 1
+                if key in self._recent:
+                    self._metrics["deduplicated"] += 1
+                    continue
+                self._recent[key] = now
+                self._pending.append(draft)
+            full = len(self._pending) >= self.batch_size
+        if self._thread is None:
+            self.flush()  # writer not started (scripts, CLI): write synchronously
+            return
+        self._wake.set()
+        if full:
+            self._full.set()
+
+    def _prune_recent(self, now: float) -> None:
+        cutoff = now - self.dedupe_window
+        if self._recent and next(iter(self._recent.values())) < cutoff:
+            self._recent = {k: t for k, t in self._recent.items() if t >= cutoff}
+
+    def flush(self) -> int:
+        """Write everything pending now; returns the number of rows inserted."""
+        written = 0
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending[: self.batch_size], self._pending[self.batch_size:]
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _write(self, batch: List[Draft]) -> int:
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                # RETURNING carries user_id and message, so input order is not needed back: without
+                # sort_by_parameter_order SQLite gets one multi-row INSERT instead of one per row
+                rows = db.execute(
+                    insert(Notification).returning(
+                        Notification.id, Notification.user_id, Notification.message, Notification.created_at,
+                    ),
+                    [
+                        {"user_id": d.user_id, "message": d.message, "created_at": d.created_at, "is_read": False}
+                        for d in batch
+                    ],
+                ).all()
+                db.commit()
+            rows.sort(key=lambda r: r.id)  # publish in id order, as SSE catch-up replays them
+        except Exception:
+            with self._lock:
+                self._metrics["failed_batches"] += 1
+                self._pending[:0] = batch  # retried on the next flush
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics["written"] += len(rows)
+            self._metrics["batches"] += 1
+            self._metrics["flush_seconds"] += elapsed
+            self._metrics["max_batch"] = max(self._metrics["max_batch"], len(rows))
+        publish_notifications([(r.user_id, notification_payload(r.id, r.message, r.created_at)) for r in rows])
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            # let a burst accumulate into one batch unless it is already full
+            self._full.wait(self.flush_interval)
+            self._wake.clear()
+            self._full.clear()
+            try:
+                self.flush()
+            except Exception:
+                self._stop.wait(self.flush_interval)
+                self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread and write whatever is still pending."""
+        self._stop.set()
+        self._wake.set()
+        self._full.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["pending"] = len(self._pending)
+        stats["rows_per_second"] = stats["written"] / stats["flush_seconds"] if stats["flush_seconds"] else 0.0
+        stats["avg_batch"] = stats["written"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+
+outbox = NotificationOutbox(
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    flush_interval=settings.NOTIFICATION_FLUSH_INTERVAL_SECONDS,
+    dedupe_window=settings.NOTIFICATION_DEDUPE_WINDOW_SECONDS,
+)
+
+
+def queue_notifications(session: Session, drafts: List[Draft]) -> None:
+    """Hand *drafts* to the outbox once *session* commits (dropped on rollback)."""
+    session.info.setdefault(OUTBOX_KEY, []).extend(drafts)
+
+
+def _assignment_changed(section: ProposalSection) -> bool:
+    added = inspect(section).attrs.assigned_user_id.history.added
+    return bool(added) and added[0] is not None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_notifications(session, flush_context):
+    # pre-flush state and attribute history are still available here
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ProposalSection) and _assignment_changed(obj):
+            queue_notifications(session, [Draft(obj.assigned_user_id, assignment_message(obj), datetime.utcnow())])
+        elif isinstance(obj, Notification) and obj in session.new:
+            queue_for_delivery(session, obj.user_id, notification_payload(obj.id, obj.message, obj.created_at, obj.is_read))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_after_commit(session):
+    drafts = session.info.pop(OUTBOX_KEY, None)
+    if drafts:
+        outbox.enqueue(drafts)
+    items = session.info.pop(PENDING_KEY, None)
+    if items:
+        publish_notifications(items)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(OUTBOX_KEY, None)
+    session.info.pop(PENDING_KEY, None)
+
+
+def mark_read(db: Session, user_id: int, ids: List[int]) -> Tuple[int, int]:
+    """Mark the given notifications read in one UPDATE; returns (updated, unread)."""
+    updated = 0
+    if ids:
+        updated = (
+            db.query(Notification)
+            .filter(Notification.user_id == user_id, Notification.id.in_(ids), Notification.is_read == False)
+            .update({"is_read": True}, synchronize_session=False)
+        )
+        db.commit()
+    unread = unread_counter.adjust(user_id, -updated)
+    if unread is None:
+        unread = unread_counter.get(db, user_id)
+    if updated:
+        publish_unread(user_id, unread)
+    return updated, unread
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    """Mark every unread notification of *user_id* read in one UPDATE."""
+    updated = (
+        db.query(Notification)
+        .filter(Notification.user_id == user_id, Notification.is_read == False)
+        .update({"is_read": True}, synchronize_session=False)
+    )
+    db.commit()
+    unread_counter.set(user_id, 0)
+    publish_unread(user_id, 0)
+    return updated
+
+
+def _catch_up(user_id: int, last_event_id: Optional[int]) -> Tuple[int, List[dict]]:
+    with ReadSessionLocal() as db:
+        unread = unread_counter.get(db, user_id)
+        missed = []
+        if last_event_id is not None:
+            rows = (
+                db.query(Notification)
+                .filter(Notification.user_id == user_id, Notification.id > last_event_id)
+                .order_by(Notification.id)
+                .limit(settings.PAGE_SIZE_MAX)
+                .all()
+            )
+            missed = [notification_payload(n.id, n.message, n.created_at, n.is_read) for n in rows]
+    return unread, missed
+
+
+async def notification_events(request: Request, user_id: int, last_event_id: Optional[int]):
+    """SSE generator: current unread count, missed notifications, then live pushes."""
+    channel = notification_channel(user_id)
+    queue = hub.subscribe(channel)
+    try:
+        unread, missed = await run_in_threadpool(_catch_up, user_id, last_event_id)
+        yield format_sse({"unread": unread}, event="unread")
+        for payload in missed:
+            yield format_sse({"notification": payload}, event="notification", event_id=payload["id"])
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            if message["event"] == "notification":
+                payload = message["notification"]
+                yield format_sse(
+                    {"notification": payload, "unread": message.get("unread")},
+                    event="notification",
+                    event_id=payload["id"],
+                )
+            else:
+                yield format_sse({"unread": message["unread"]}, event="unread")
+    finally:
+        hub.unsubscribe(channel, queue)
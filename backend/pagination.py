@@ -0,0 +1,104 @@
+"""pagination.py – Keyset (cursor) pagination shared by the list endpoints.
+
+Lists are ordered by their primary key, or by a sort column with the id as
+tie-breaker (notifications: ``created_at``).  Cursors are opaque URL-safe
+strings encoding the ``(sort key, id)`` of the last row on a page; the next
+page is fetched with a ``WHERE (sort_key, id) > cursor`` predicate instead of
+an OFFSET, so every page costs the same, and with an index ending in the
+sort columns (``(owner_id, id)``, ``(user_id, created_at, id)``, ...) the
+database reads the page straight off the index without sorting.
+
+The cursor is header-only: response bodies stay plain lists (the shape
+clients already parse), and the cursor for the following page is returned
+in the ``X-Next-Cursor`` header, absent on the last page.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import DateTime, select, tuple_, union
+from sqlalchemy.orm import Query as OrmQuery
+
+from config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row_id: int, sort_key: Any = None) -> str:
+    payload = {"id": row_id}
+    if sort_key is not None:
+        payload["key"] = sort_key.isoformat() if isinstance(sort_key, datetime) else sort_key
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column=None) -> Tuple[int, Any]:
+    """``(id, sort key)`` of a cursor; the key is None unless *sort_column* is given."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        row_id = int(data["id"])
+        if sort_column is None:
+            return row_id, None
+        key = data["key"]
+        if isinstance(sort_column.type, DateTime):
+            key = datetime.fromisoformat(key)
+        return row_id, key
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class CursorPage:
+    """FastAPI dependency carrying ``cursor``/``limit`` query params for one request."""
+
+    def __init__(
+        self,
+        response: Response,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    ):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+        self.next_cursor: Optional[str] = None
+
+    def apply(
+        self, query: OrmQuery, id_column, descending: bool = False, any_of: Sequence = (), sort_column=None,
+    ) -> list:
+        """Return one page of *query* ordered by ``(sort_column, id_column)``, or by *id_column* alone.
+
+        *any_of* keeps the rows matching at least one of the given conditions.
+        Each condition is paged on its own and the ids are unioned, so every
+        branch is read from its own index in order; a plain ``OR`` leaves
+        the database a choice between walking the primary key and sorting.
+        """
+        columns = (id_column,) if sort_column is None else (sort_column, id_column)
+        keyset = []
+        if self.cursor:
+            last_id, last_key = decode_cursor(self.cursor, sort_column)
+            if sort_column is None:
+                keyset.append(id_column < last_id if descending else id_column > last_id)
+            else:
+                position, last = tuple_(sort_column, id_column), tuple_(last_key, last_id)
+                keyset.append(position < last if descending else position > last)
+        order = [column.desc() if descending else column for column in columns]
+
+        if any_of:
+            branches = [
+                select(id_column).where(condition, *keyset).order_by(*order).limit(self.limit + 1).subquery()
+                for condition in any_of
+            ]
+            query = query.filter(id_column.in_(union(*(select(branch.c[0]) for branch in branches))))
+        rows = query.filter(*keyset).order_by(*order).limit(self.limit + 1).all()
+
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last_row = rows[-1]
+            self.next_cursor = encode_cursor(
+                getattr(last_row, id_column.key),
+                None if sort_column is None else getattr(last_row, sort_column.key),
+            )
+            self.response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        return rows
@@ -6,84 +6,364 @@ using your locally-running Ollama model via LangChain.
 Usage:
     python pdf_data_read.py path/to/file.pdf
 """
-import sys
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
 
 import pdfplumber
-from langchain.docstore.document import Document
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_community.llms import Ollama  # Updated import
-from langchain.chains.summarize import load_summarize_chain
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.prompts import PromptTemplate
 
+from config import settings
+from llm_cache import file_digest, llm_cache
+from llm_client import get_llm
+from metrics import instrument_llm, observe_pdf_stages
 
-def extract_text(pdf_path: Path) -> str:
+logger = logging.getLogger(__name__)
+
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_workers = 0
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool for page extraction (re-created if the size changes)."""
+    global _extract_pool, _extract_pool_workers
+    with _extract_pool_lock:
+        if _extract_pool is None or _extract_pool_workers != workers:
+            if _extract_pool is not None:
+                _extract_pool.shutdown(wait=False)
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _extract_pool_workers = workers
+        return _extract_pool
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) – runs in a worker process."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def page_count(pdf_path: Path) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_page_text(
+    pdf_path: Path,
+    workers: Optional[int] = None,
+    pages_per_shard: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the text of each page of `pdf_path`, in page order.
+
+    Documents with at least `PDF_PARALLEL_MIN_PAGES` pages are sharded into
+    page ranges across a process pool; pages are yielded as soon as their
+    shard (and every earlier one) is done, so callers can start chunking
+    before extraction finishes.  Small files are read serially.
+    """
+    workers = workers if workers is not None else (settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1)
+    pages_per_shard = pages_per_shard or settings.PDF_PAGES_PER_SHARD
+    total = page_count(pdf_path)
+
+    if workers <= 1 or total < settings.PDF_PARALLEL_MIN_PAGES:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+        return
+
+    pool = _get_extract_pool(workers)
+    futures = [
+        pool.submit(_extract_page_range, str(pdf_path), start, min(start + pages_per_shard, total))
+        for start in range(0, total, pages_per_shard)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_text(pdf_path: Path, workers: Optional[int] = None) -> str:
     """
     Open the PDF at `pdf_path` and return its full text.
     """
-    text = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text.append(page_text)
-    return "\n".join(text)
+    return "\n".join(text for text in iter_page_text(pdf_path, workers=workers) if text)
+
+
+def iter_chunks(pages: Iterable[str], splitter) -> Iterator[str]:
+    """
+    Split page texts into chunks as the pages arrive.
+
+    The last chunk of each split may still grow, so it is carried over and
+    re-split together with the next page; only that tail is held in memory.
+    """
+    carry = ""
+    for text in pages:
+        if not text:
+            continue
+        carry = f"{carry}\n{text}" if carry else text
+        chunks = splitter.split_text(carry)
+        if not chunks:
+            carry = ""
+            continue
+        yield from chunks[:-1]
+        carry = chunks[-1]
+    if carry:
+        yield carry
+
+
+DEFAULT_MODEL = "llama3.2:latest"
+DEFAULT_BASE_URL = None  # settings.OLLAMA_BASE_URL
+TEMPERATURE = 0.1
+
+# Prompt for the final summary (also used directly when the text fits in one chunk)
+summary_prompt = PromptTemplate(
+    input_variables=["text"],
+    template=(
+        "Please provide a concise 4-5 line summary of the following document. "
+        "Focus on the main topic, key points, and essential information:\n\n"
+        "{text}\n\n"
+        "Summary:"
+    ),
+)
+
+# Map step: one partial summary per chunk
+map_prompt = PromptTemplate(
+    input_variables=["text"],
+    template=(
+        "The following is one section of a larger document. Summarize it in 2-3 "
+        "sentences, keeping names, figures and requirements:\n\n"
+        "{text}\n\n"
+        "Summary:"
+    ),
+)
+
+# Intermediate reduce step: merge several partial summaries into one
+combine_prompt = PromptTemplate(
+    input_variables=["text"],
+    template=(
+        "The following are summaries of consecutive sections of a document. "
+        "Merge them into a single summary of at most 5 sentences without losing "
+        "key points:\n\n"
+        "{text}\n\n"
+        "Summary:"
+    ),
+)
+
+
+class SummaryCancelled(Exception):
+    """Raised when a map-reduce summary is cancelled before it completes."""
+
+
+def _run_stage(llm, prompt: PromptTemplate, texts: Iterable[str], max_concurrency: int, cancel_event) -> List[str]:
+    """
+    Invoke *prompt* over *texts* concurrently (bounded), preserving order.
+
+    *texts* may be a generator: each text is submitted as soon as it is
+    produced, so the calls overlap whatever produces them (PDF extraction).
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise SummaryCancelled()
+    if isinstance(texts, list) and len(texts) == 1:
+        return [llm.invoke(prompt.format(text=texts[0])).strip()]
+    workers = min(max_concurrency, len(texts)) if isinstance(texts, list) else max_concurrency
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for text in texts:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SummaryCancelled()
+            futures.append(pool.submit(llm.invoke, prompt.format(text=text)))
+        results = []
+        for future in futures:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SummaryCancelled()
+                try:
+                    results.append(future.result(timeout=0.25).strip())
+                    break
+                except FuturesTimeout:
+                    continue
+        return results
+    finally:
+        # Not a `with` block: on cancel or error, return without waiting for the calls
+        # already in flight; queued ones are dropped and never reach the model.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _group_for_reduce(summaries: List[str], max_chars: int) -> List[List[str]]:
+    """Pack consecutive summaries into groups of at most *max_chars* (at least two per group)."""
+    groups, current, size = [], [], 0
+    for text in summaries:
+        if len(current) >= 2 and size + len(text) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+
+def map_reduce_summarize(
+    chunks: Iterable[str],
+    llm,
+    max_concurrency: Optional[int] = None,
+    reduce_max_chars: Optional[int] = None,
+    cancel_event: Optional[threading.Event] = None,
+    timings: Optional[dict] = None,
+) -> str:
+    """
+    Summarize *chunks* with a concurrent map step and a hierarchical reduce.
+
+    :param chunks:          A list, or a generator whose chunks are mapped as
+                            they are produced.
+    :param llm:             Anything with ``invoke(prompt: str) -> str`` (an
+                            Ollama LLM, or a stub in tests).
+    :param max_concurrency: Max simultaneous LLM calls per stage.
+    :param cancel_event:    Set it to abort; raises `SummaryCancelled`.
+    :param timings:         Optional dict filled with per-stage seconds/counts.
+    """
+    max_concurrency = max_concurrency or settings.PDF_SUMMARY_MAX_CONCURRENCY
+    reduce_max_chars = reduce_max_chars or settings.PDF_SUMMARY_CHUNK_CHARS
+    timings = timings if timings is not None else {}
+    chunks = iter(chunks)
+    started = time.perf_counter()
+    head = list(islice(chunks, 2))
+    if not head:
+        return ""
+    if len(head) == 1:
+        summary = _run_stage(llm, summary_prompt, head, 1, cancel_event)[0]
+        timings["reduce_seconds"] = time.perf_counter() - started
+        timings["llm_calls"] = 1
+        return summary
+
+    summaries = _run_stage(llm, map_prompt, chain(head, chunks), max_concurrency, cancel_event)
+    timings["map_seconds"] = time.perf_counter() - started
+    timings["llm_calls"] = len(summaries)
+
+    started = time.perf_counter()
+    levels = 0
+    while True:
+        groups = _group_for_reduce(summaries, reduce_max_chars)
+        levels += 1
+        if len(groups) == 1:
+            summary = _run_stage(llm, summary_prompt, ["\n\n".join(groups[0])], 1, cancel_event)[0]
+            timings["llm_calls"] += 1
+            break
+        summaries = _run_stage(llm, combine_prompt, ["\n\n".join(g) for g in groups], max_concurrency, cancel_event)
+        timings["llm_calls"] += len(groups)
+    timings["reduce_seconds"] = time.perf_counter() - started
+    timings["reduce_levels"] = levels
+    return summary
 
 
 def generate_summary_from_pdf(
     pdf_path: Path,
-    model_name: str = "llama3.2:latest",
-    base_url: str = "http://localhost:11434",
+    model_name: str = DEFAULT_MODEL,
+    base_url: Optional[str] = DEFAULT_BASE_URL,
+    llm=None,
+    cancel_event: Optional[threading.Event] = None,
+    timings: Optional[dict] = None,
 ) -> str:
     """
     Extracts text from a PDF and generates a 4-5 line summary.
 
-    :param pdf_path:   Path to the PDF file.
-    :param model_name: Ollama model identifier.
-    :param base_url:   Ollama HTTP API base URL.
-    :return:           Generated summary string.
+    :param pdf_path:     Path to the PDF file.
+    :param model_name:   Ollama model identifier.
+    :param base_url:     Ollama HTTP API base URL (defaults to OLLAMA_BASE_URL).
+    :param llm:          Optional LLM override (e.g. a local stub).
+    :param cancel_event: Optional event that aborts the summary when set.
+    :param timings:      Optional dict filled with per-stage timings;
+                         ``extract_seconds`` overlaps ``map_seconds``.
+    :return:             Generated summary string.
     """
-    # 1) Extract raw text
-    raw_text = extract_text(pdf_path)
-
-    # 2) Split into chunks (smaller chunks for better processing)
-    splitter = CharacterTextSplitter(chunk_size=1500, chunk_overlap=150)
-    chunks = splitter.split_text(raw_text)
-    docs = [Document(page_content=chunk) for chunk in chunks]
-
-    # 3) Initialize the Ollama LLM
-    llm = Ollama(model=model_name, base_url=base_url, temperature=0.1)
-
-    # 4) Define a simple prompt for summarization
-    summary_prompt = PromptTemplate(
-        input_variables=["text"],
-        template=(
-            "Please provide a concise 4-5 line summary of the following document. "
-            "Focus on the main topic, key points, and essential information:\n\n"
-            "{text}\n\n"
-            "Summary:"
-        ),
+    timings = timings if timings is not None else {}
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.PDF_SUMMARY_CHUNK_CHARS,
+        chunk_overlap=settings.PDF_SUMMARY_CHUNK_OVERLAP,
     )
 
-    # 5) Create a simple summarization chain
-    from langchain.chains import LLMChain
-    chain = LLMChain(llm=llm, prompt=summary_prompt, verbose=True)
+    # 1) Extract pages and split them into chunks that each fit comfortably in the model
+    #    context; chunks are produced while later pages are still being extracted
+    def produce_chunks() -> Iterator[str]:
+        started, count = time.perf_counter(), 0
+        for chunk in iter_chunks(iter_page_text(pdf_path), splitter):
+            count += 1
+            yield chunk
+        timings["extract_seconds"] = time.perf_counter() - started
+        timings["chunks"] = count
 
-    # 6) Run the chain on the full text
-    summary = chain.run(raw_text)
-    return summary.strip()
+    # 2) Get the shared Ollama client for this model
+    if llm is None:
+        llm = get_llm(model_name, TEMPERATURE, base_url)
+
+    # 3) Map each chunk as it is produced (overlapping extraction), then reduce
+    chunks = produce_chunks()
+    try:
+        return map_reduce_summarize(chunks, llm, cancel_event=cancel_event, timings=timings)
+    finally:
+        chunks.close()  # on cancel or error, stops extraction and drops its pending shards
 
 
-def summarize_pdf(pdf_path_str: str) -> str:
+@instrument_llm("pdf_summary")
+def summarize_pdf(
+    pdf_path_str: str,
+    use_cache: bool = True,
+    cancel_event: Optional[threading.Event] = None,
+) -> str:
     """
     Reads a PDF file and generates a 4-5 line summary.
+
+    Summaries are cached by the file's SHA-256 plus model, prompts,
+    temperature and chunking settings, so re-uploads of the same PDF skip the
+    model entirely.  Each computed summary logs its stage timings and records
+    them in the `/metrics` PDF stage histogram.
     :param pdf_path_str: Path to the PDF file as a string.
+    :param use_cache:    Set to False to bypass the summary cache.
+    :param cancel_event: Optional event that aborts the summary when set.
     :return: Summary string.
     """
     pdf_path = Path(pdf_path_str)
     if not pdf_path.is_file():
         raise FileNotFoundError(f"PDF not found at {pdf_path}")
-    return generate_summary_from_pdf(pdf_path)
+    key = llm_cache.make_key(
+        {
+            "sha256": file_digest(pdf_path),
+            "chunk_chars": settings.PDF_SUMMARY_CHUNK_CHARS,
+            "chunk_overlap": settings.PDF_SUMMARY_CHUNK_OVERLAP,
+        },
+        DEFAULT_MODEL,
+        "\n---\n".join(p.template for p in (map_prompt, combine_prompt, summary_prompt)),
+        TEMPERATURE,
+    )
+
+    def compute() -> str:
+        timings: dict = {}
+        try:
+            return generate_summary_from_pdf(pdf_path, cancel_event=cancel_event, timings=timings)
+        finally:
+            if timings:  # partial on cancel or error
+                observe_pdf_stages(timings)
+                logger.info("PDF summary of %s: %s", pdf_path.name, " ".join(
+                    f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in sorted(timings.items())
+                ))
+
+    return llm_cache.get_or_compute(key, compute, bypass=not use_cache)
 
 
 # Example usage:
@@ -0,0 +1,305 @@
+"""profiler.py – On-demand sampling profiler for slow or selected requests.
+
+An admin arms a `ProfileSession`:
+
+* for the next *N* requests to a route (``route="/search", requests=20``),
+* and/or for requests slower than a threshold (``slower_than_ms=500``).
+
+While a session is armed, `ProfilerMiddleware` registers every in-flight
+HTTP request, and a background thread reads all thread stacks every
+`PROFILER_SAMPLE_INTERVAL_MS`.  A stack counts toward a request when it runs
+work the request handed off through `attached()`: every `db.run_sync(...)`
+call, and sync endpoints, which `ProfiledRoute` wraps before they go to the
+threadpool.  The wrapper's frame is the key, so the owner is exact even for
+concurrent requests to one endpoint and for `run_sync` greenlets that share
+the event loop thread; the handed-off function becomes the stack root.
+
+When the request finishes, its samples are kept if it qualifies for the
+session and dropped otherwise.  The kept samples are aggregated per route and exported
+as collapsed stacks (flamegraph.pl, speedscope, inferno) or as a speedscope
+JSON file.
+
+Samples taken while an async handler is suspended on an ``await`` are not
+attributed to it, but the `run_sync` work it is waiting on is.  With
+`DB_ASYNC=true` on SQLite the statements themselves run on aiosqlite's thread
+and are not attributed; ORM work in the greenlet is.
+
+The overhead is bounded. Nothing runs unless a session is armed. The
+sampler wakes once per interval, walks each thread's stack once and keeps at
+most `PROFILER_MAX_DEPTH` frames of it; matching a stack to its request is
+one dict lookup, whatever the number of requests in flight. A session disarms itself after `PROFILER_MAX_SECONDS`
+or once it has captured its requests.
+"""
+import functools
+import inspect
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+
+from config import settings
+
+class ProfileSession:
+    def __init__(self, route: Optional[str], requests: Optional[int], slower_than_ms: Optional[float],
+                 duration_seconds: float):
+        self.route = route
+        self.remaining = requests
+        self.slower_than = slower_than_ms / 1000.0 if slower_than_ms is not None else None
+        self.expires_at = time.monotonic() + duration_seconds
+
+    def wants(self, route: Optional[str], seconds: float) -> bool:
+        if self.route is not None and route != self.route:
+            return False
+        if self.slower_than is not None and seconds < self.slower_than:
+            return False
+        return True
+
+
+class _InFlight:
+    __slots__ = ("scope", "started", "samples")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.samples: Counter = Counter()
+
+
+_current: ContextVar[Optional[_InFlight]] = ContextVar("profiled_request", default=None)
+
+
+class SamplingProfiler:
+    """Process-wide profiler; at most one session is armed at a time."""
+
+    def __init__(self, interval: float, max_depth: int):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.session: Optional[ProfileSession] = None
+        self.profiles: Dict[str, Counter] = {}
+        self.captured: Counter = Counter()
+        self._inflight: Dict[int, _InFlight] = {}
+        self._frames: Dict[object, _InFlight] = {}  # running `_run_for` frame -> request it works for
+        self._ids = itertools.count()
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # --- control -------------------------------------------------------
+    def start(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._stop.set()  # retire the previous session's sampler, if any
+            self._stop = threading.Event()
+            self.session = session
+            self._inflight.clear()
+            self.profiles.clear()
+            self.captured.clear()
+            stop = self._stop
+        threading.Thread(target=self._run, args=(stop,), name="sampling-profiler", daemon=True).start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self.session = None
+            self._inflight.clear()
+        self._stop.set()
+
+    @property
+    def armed(self) -> bool:
+        return self.session is not None
+
+    def status(self) -> dict:
+        with self._lock:
+            session = self.session
+            return {
+                "armed": session is not None,
+                "route": session.route if session else None,
+                "remaining_requests": session.remaining if session else None,
+                "slower_than_ms": session.slower_than * 1000 if session and session.slower_than is not None else None,
+                "expires_in_seconds": max(session.expires_at - time.monotonic(), 0.0) if session else None,
+                "interval_ms": self.interval * 1000,
+                "in_flight": len(self._inflight),
+                "routes": {
+                    route: {"requests": self.captured[route], "samples": sum(stacks.values())}
+                    for route, stacks in self.profiles.items()
+                },
+            }
+
+    # --- request tracking (called by the middleware) ---------------------
+    def begin(self, scope) -> Optional[int]:
+        with self._lock:
+            if self.session is None:
+                return None
+            key = next(self._ids)
+            request = self._inflight[key] = _InFlight(scope)
+        _current.set(request)
+        return key
+
+    def attached(self, fn: Callable) -> Callable:
+        """Wrap *fn* so the thread running it is sampled for the calling request.
+
+        Call it where the request's context is current; costs one context
+        lookup when no session is armed.
+        """
+        request = _current.get()
+        if request is None:
+            return fn
+        return lambda *args, **kwargs: self._run_for(request, fn, args, kwargs)
+
+    def endpoint(self, fn: Callable) -> Callable:
+        """Wrap a sync endpoint so the threadpool thread running it is sampled for its request."""
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            return self.attached(fn)(*args, **kwargs)
+
+        return run
+
+    def _run_for(self, request: _InFlight, fn: Callable, args, kwargs):
+        # Keyed by this frame rather than the thread: greenlets of different requests
+        # take turns on one thread, and each has its own `_run_for` frame on its stack.
+        frame = sys._getframe()
+        with self._lock:
+            self._frames[frame] = request
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._frames.pop(frame, None)
+
+    def finish(self, key: int) -> None:
+        with self._lock:
+            request = self._inflight.pop(key, None)
+            session = self.session
+            if request is None or session is None:
+                return
+            route = getattr(request.scope.get("route"), "path", None)
+            if not session.wants(route, time.perf_counter() - request.started):
+                return
+            self.profiles.setdefault(route, Counter()).update(request.samples)
+            self.captured[route] += 1
+            if session.remaining is not None:
+                session.remaining -= 1
+                if session.remaining <= 0:
+                    self.session = None
+                    self._inflight.clear()
+                    self._stop.set()
+
+    # --- sampling ------------------------------------------------------
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            with self._lock:
+                session = self.session
+                if session is not None and time.monotonic() >= session.expires_at:
+                    self.session = None
+                    self._inflight.clear()
+                    return
+                busy = bool(self._frames)
+            if session is None:
+                return
+            if busy:
+                self._sample()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            codes = []
+            while frame is not None and frame.f_code is not _ATTACHED_CODE:
+                if len(codes) < self.max_depth:
+                    codes.append(frame.f_code)
+                frame = frame.f_back
+            if frame is not None:
+                # the stack above the `attached` wrapper is the handed-off work
+                stacks.append((frame, tuple(self._label(c) for c in reversed(codes))))
+
+        with self._lock:
+            for frame, stack in stacks:
+                request = self._frames.get(frame)
+                if request is not None:
+                    request.samples[stack] += 1
+
+    # --- export --------------------------------------------------------
+    def collapsed(self, route: str) -> str:
+        """Brendan Gregg's collapsed-stack format: ``root;...;leaf count`` per line."""
+        with self._lock:
+            stacks = dict(self.profiles.get(route, {}))
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(stacks.items()))
+
+    def speedscope(self, route: str) -> dict:
+        """A speedscope (https://www.speedscope.app) sampled profile, weighted in milliseconds."""
+        with self._lock:
+            stacks = dict(self.profiles.get(route, {}))
+        frames, index, samples, weights = [], {}, [], []
+        for stack, count in stacks.items():
+            ids = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    name, _, where = label.rpartition(" (")
+                    file, _, line = where.rstrip(")").rpartition(":")
+                    frames.append({"name": name, "file": file, "line": int(line)})
+                ids.append(index[label])
+            samples.append(ids)
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"BidBuilder {route}",
+            "exporter": "bidbuilder-profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": route,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+_ATTACHED_CODE = SamplingProfiler._run_for.__code__
+
+profiler = SamplingProfiler(
+    interval=settings.PROFILER_SAMPLE_INTERVAL_MS / 1000.0,
+    max_depth=settings.PROFILER_MAX_DEPTH,
+)
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that hands sync endpoints to the threadpool through `profiler.endpoint`."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiler.endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class ProfilerMiddleware:
+    """Registers HTTP requests with the profiler while a session is armed."""
+
+    def __init__(self, app, profiler: SamplingProfiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.armed:
+            await self.app(scope, receive, send)
+            return
+        key = self.profiler.begin(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if key is not None:
+                self.profiler.finish(key)
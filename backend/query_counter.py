@@ -0,0 +1,136 @@
+"""query_counter.py – Per-request SQL statement counting and N+1 detection.
+
+Every statement executed on any engine is counted against the `QueryCount`
+of the request (or `count_queries()` block) it runs in.  A statement that
+runs over and over inside one request is the N+1 signature: a lazy-loaded
+relationship touched once per row.  `QueryCountMiddleware` checks each HTTP
+request according to `QUERY_COUNT_MODE`:
+
+* ``off`` (default) – nothing is counted.
+* ``warn`` – adds an ``X-Query-Count`` header and logs a warning when one
+  statement repeats `N_PLUS_ONE_THRESHOLD` times or more.
+* ``raise`` – same, but the offending request fails with a 500 so test runs
+  and `check_query_counts.py` catch it.
+"""
+import json
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+class QueryCount:
+    """Statements executed in one unit of work, keyed by SQL text."""
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.statements.values())
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    def repeated(self, threshold: int) -> Optional[Tuple[str, int]]:
+        """The most repeated statement if it ran at least *threshold* times."""
+        statement, times = self.most_repeated()
+        return (statement, times) if times >= threshold else None
+
+
+_current: ContextVar[Optional[QueryCount]] = ContextVar("query_count", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.statements[statement] += 1
+
+
+@contextmanager
+def count_queries():
+    """Count the statements run inside the block (including threadpool work it starts)."""
+    counter = QueryCount()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+class QueryCountMiddleware:
+    """ASGI middleware applying `QUERY_COUNT_MODE` to every HTTP request.
+
+    The check runs when the response starts, i.e. after the handler's own
+    queries; statements issued while a streaming body is produced are not
+    included.
+    """
+
+    def __init__(self, app, mode: str = None, threshold: int = None):
+        self.app = app
+        self.mode = (mode or settings.QUERY_COUNT_MODE).lower()
+        self.threshold = threshold or settings.N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        replaced = False
+
+        async def send_checked(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                repeat = counter.repeated(self.threshold)
+                if repeat is not None:
+                    statement, times = repeat
+                    logger.warning(
+                        "Possible N+1 in %s %s: %d statements, one repeated %d times: %s",
+                        scope["method"], scope["path"], counter.total, times, statement,
+                    )
+                    if self.mode == "raise":
+                        replaced = True
+                        await self._send_failure(send, counter.total, statement, times)
+                        return
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (QUERY_COUNT_HEADER.lower().encode(), str(counter.total).encode())
+                ]
+            await send(message)
+
+        with count_queries() as counter:
+            await self.app(scope, receive, send_checked)
+
+    @staticmethod
+    async def _send_failure(send, total: int, statement: str, times: int) -> None:
+        body = json.dumps({
+            "detail": "N+1 query pattern detected",
+            "queries": total,
+            "repeated": times,
+            "statement": statement,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (QUERY_COUNT_HEADER.lower().encode(), str(total).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,252 @@
+"""search.py – Full-text search over proposals and sections (SQLite FTS5).
+
+A single `search_index` FTS5 table holds one row per proposal (title,
+description, client name) and one per section (title, content).  Rows are
+keyed by rowid so the sync triggers and deletes stay index lookups:
+proposals use ``id * 2`` and sections ``id * 2 + 1``.
+
+Every row also carries its proposal owner as one token in the indexed
+`owner` column (``owner<id>``).  A search matches that token together with
+the terms, so FTS5 intersects the owner's posting list with the terms' and
+bm25 only ranks the caller's rows, instead of ranking every owner's matches
+and filtering them afterwards.  Triggers keep the token current when a
+proposal changes hands.
+
+Usage:
+    python search.py --rebuild    # re-index existing data
+"""
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from models import Proposal, ProposalSection
+
+PROPOSAL_KIND = "proposal"
+SECTION_KIND = "section"
+
+# bm25 column weights: title, body, client_name, owner (a filter, never ranked)
+BM25_WEIGHTS = (10.0, 1.0, 5.0, 0.0)
+TEXT_COLUMNS = "{title body client_name}"
+
+_OWNER = "'owner' || {}"
+_PROPOSAL_ROW = f"new.id * 2, new.title, new.description, new.client_name, new.id, {_OWNER.format('new.owner_id')}"
+_SECTION_ROW = (
+    "new.id * 2 + 1, new.title, new.content, NULL, new.proposal_id, "
+    f"(SELECT {_OWNER.format('owner_id')} FROM proposals WHERE id = new.proposal_id)"
+)
+_COLUMNS = "rowid, title, body, client_name, proposal_id, owner"
+
+_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, client_name, proposal_id UNINDEXED, owner,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_proposals_ai AFTER INSERT ON proposals BEGIN
+        INSERT INTO search_index({_COLUMNS}) VALUES ({_PROPOSAL_ROW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_proposals_au
+    AFTER UPDATE OF title, description, client_name, owner_id ON proposals BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+        INSERT INTO search_index({_COLUMNS}) VALUES ({_PROPOSAL_ROW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_proposals_owner_au
+    AFTER UPDATE OF owner_id ON proposals WHEN new.owner_id IS NOT old.owner_id BEGIN
+        UPDATE search_index SET owner = {_OWNER.format('new.owner_id')}
+        WHERE rowid IN (SELECT id * 2 + 1 FROM proposal_sections WHERE proposal_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_proposals_ad AFTER DELETE ON proposals BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_sections_ai AFTER INSERT ON proposal_sections BEGIN
+        INSERT INTO search_index({_COLUMNS}) VALUES ({_SECTION_ROW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS search_sections_au
+    AFTER UPDATE OF title, content, proposal_id ON proposal_sections BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        INSERT INTO search_index({_COLUMNS}) VALUES ({_SECTION_ROW});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_sections_ad AFTER DELETE ON proposal_sections BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+
+def owner_token(owner_id: int) -> str:
+    return f"owner{owner_id}"
+
+
+def fts_available(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def drop_search_index(conn: Connection) -> None:
+    """Drop the FTS table and its sync triggers."""
+    triggers = conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'")
+    ).scalars().all()
+    for trigger in triggers:
+        conn.execute(text(f"DROP TRIGGER {trigger}"))
+    conn.execute(text("DROP TABLE IF EXISTS search_index"))
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the FTS table and sync triggers; index existing rows on first creation.
+
+    An index from before the `owner` column is dropped and rebuilt.
+    """
+    if not fts_available(engine):
+        return
+    with engine.begin() as conn:
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(search_index)"))}
+        if columns and "owner" not in columns:
+            drop_search_index(conn)
+            columns = set()
+        for ddl in _DDL:
+            conn.execute(text(ddl))
+        if not columns:
+            rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    """Drop every indexed row and re-index all proposals and sections."""
+    conn.execute(text("DELETE FROM search_index"))
+    conn.execute(text(
+        f"INSERT INTO search_index({_COLUMNS}) "
+        f"SELECT id * 2, title, description, client_name, id, {_OWNER.format('owner_id')} FROM proposals"
+    ))
+    conn.execute(text(
+        f"INSERT INTO search_index({_COLUMNS}) "
+        f"SELECT s.id * 2 + 1, s.title, s.content, NULL, s.proposal_id, {_OWNER.format('p.owner_id')} "
+        "FROM proposal_sections s JOIN proposals p ON p.id = s.proposal_id"
+    ))
+    conn.execute(text("INSERT INTO search_index(search_index) VALUES ('optimize')"))
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every term must match, as a prefix."""
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _search_fts(db: Session, q: str, owner_id: int, limit: int, offset: int) -> List[dict]:
+    match = build_match_query(q)
+    if match is None:
+        return []
+    rows = db.execute(
+        text(
+            f"""
+            SELECT search_index.rowid AS rid,
+                   search_index.proposal_id AS proposal_id,
+                   highlight(search_index, 0, '<mark>', '</mark>') AS title,
+                   snippet(search_index, 1, '<mark>', '</mark>', '…', 16) AS snippet,
+                   bm25(search_index, {', '.join(map(str, BM25_WEIGHTS))}) AS score
+            FROM search_index
+            WHERE search_index MATCH :match
+            ORDER BY score, rid
+            LIMIT :limit OFFSET :offset
+            """
+        ),
+        {
+            "match": f"owner : {owner_token(owner_id)} AND {TEXT_COLUMNS} : ({match})",
+            "limit": limit,
+            "offset": offset,
+        },
+    ).mappings().all()
+    return [
+        {
+            "kind": SECTION_KIND if r["rid"] % 2 else PROPOSAL_KIND,
+            "id": r["rid"] // 2,
+            "proposal_id": r["proposal_id"],
+            "title": r["title"],
+            "snippet": r["snippet"],
+            # bm25() is lower-is-better; expose a higher-is-better score
+            "score": -r["score"],
+        }
+        for r in rows
+    ]
+
+
+def _search_like(db: Session, q: str, owner_id: int, limit: int, offset: int) -> List[dict]:
+    """Fallback for databases without FTS5: unranked substring match."""
+    pattern = f"%{q}%"
+    proposals = (
+        db.query(Proposal)
+        .filter(
+            Proposal.owner_id == owner_id,
+            Proposal.title.ilike(pattern) | Proposal.description.ilike(pattern) | Proposal.client_name.ilike(pattern),
+        )
+        .order_by(Proposal.id)
+        .limit(offset + limit)
+        .all()
+    )
+    sections = (
+        db.query(ProposalSection)
+        .join(Proposal)
+        .filter(Proposal.owner_id == owner_id, ProposalSection.title.ilike(pattern) | ProposalSection.content.ilike(pattern))
+        .order_by(ProposalSection.id)
+        .limit(offset + limit)
+        .all()
+    )
+    hits = [
+        {"kind": PROPOSAL_KIND, "id": p.id, "proposal_id": p.id, "title": p.title, "snippet": p.description, "score": 0.0}
+        for p in proposals
+    ] + [
+        {"kind": SECTION_KIND, "id": s.id, "proposal_id": s.proposal_id, "title": s.title, "snippet": s.content, "score": 0.0}
+        for s in sections
+    ]
+    return hits[offset:offset + limit]
+
+
+def search(db: Session, q: str, owner_id: int, limit: int = 20, offset: int = 0) -> dict:
+    """Ranked search over the proposals owned by *owner_id*.
+
+    Returns one page of hits split into ``proposals`` and ``sections`` (each in
+    rank order) and ``next_offset`` when more results are available.
+    """
+    runner = _search_fts if fts_available(db.get_bind()) else _search_like
+    hits = runner(db, q, owner_id, limit + 1, offset)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+    return {
+        "proposals": [h for h in hits if h["kind"] == PROPOSAL_KIND],
+        "sections": [h for h in hits if h["kind"] == SECTION_KIND],
+        "next_offset": offset + limit if has_more else None,
+    }
+
+
+if __name__ == "__main__":
+    from db import engine, Base
+
+    if "--rebuild" not in sys.argv:
+        print(__doc__)
+        sys.exit(1)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    print("Search index rebuilt.")
@@ -1,13 +1,17 @@
-from langchain_ollama import OllamaLLM
+from typing import Iterator
+
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
 
-# 1) Point at your local Ollama and choose llama3.2:latest
-llm = OllamaLLM(
-    model="llama3.2:latest",
-    base_url="http://localhost:11434",  # Ollama’s HTTP host
-    temperature=0.7,
-)
+from llm_cache import llm_cache, normalize_text
+from llm_client import get_llm
+from metrics import instrument_llm
+
+MODEL_NAME = "llama3.2:latest"
+TEMPERATURE = 0.7
+
+# 1) Point at your local Ollama (OLLAMA_BASE_URL) and choose llama3.2:latest.
+#    The shared client pools connections, applies timeouts and retries.
+llm = get_llm(MODEL_NAME, TEMPERATURE)
 
 # 2) Define the prompt template
 template = """
@@ -19,15 +23,31 @@ Summary:
 """
 prompt = PromptTemplate.from_template(template)
 
-# 3) Build the new-style chain
-chain = prompt | llm
+def summary_cache_key(title: str, description: str) -> str:
+    return llm_cache.make_key(
+        {"title": normalize_text(title), "description": normalize_text(description)},
+        MODEL_NAME, template, TEMPERATURE,
+    )
 
-def generate_summary(title: str, description: str) -> str:
+@instrument_llm("summary")
+def generate_summary(title: str, description: str, use_cache: bool = True) -> str:
     """
     Generate a one-sentence summary using LangChain + local Ollama.
+
+    Results are cached on (normalized title/description, model, prompt,
+    temperature); pass ``use_cache=False`` to force a fresh generation.
+    """
+    text = prompt.format(title=title, description=description)
+    key = summary_cache_key(title, description)
+    return llm_cache.get_or_compute(key, lambda: llm.invoke(text).strip(), bypass=not use_cache)
+
+def stream_summary(title: str, description: str) -> Iterator[str]:
+    """
+    Yield the summary token by token (same prompt as `generate_summary`).
+
+    Closing the generator closes the HTTP stream to Ollama, which stops generation.
     """
-    input_data = {"title": title, "description": description}
-    return chain.invoke(input_data).strip()
+    return llm.stream(prompt.format(title=title, description=description))
 
 if __name__ == "__main__":
     title = "CRM Solution Proposal"
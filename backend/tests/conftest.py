@@ -0,0 +1,11 @@
+"""Shared pytest setup: import backend modules from a scratch database and cache."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+scratch = Path(tempfile.mkdtemp(prefix="bidbuilder-tests-"))
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{scratch / 'test.db'}")
+os.environ.setdefault("LLM_CACHE_PATH", str(scratch / "llm_cache.db"))
+sys.path[:0] = [str(BACKEND), str(BACKEND / "benchmarks")]
@@ -0,0 +1,35 @@
+"""AnalyticsRefresher: the GROUP BY recompute stays off the writer connection."""
+from sqlalchemy import event
+
+from analytics import init_analytics, read_snapshot, refresher
+from db import Base, SessionLocal, engine, read_engine
+from models import Proposal
+
+Base.metadata.create_all(bind=engine)
+
+
+def record_statements(target, into):
+    def record(conn, cursor, statement, parameters, context, executemany):
+        into.append(" ".join(statement.split()).upper())
+    event.listen(target, "before_cursor_execute", record)
+    return lambda: event.remove(target, "before_cursor_execute", record)
+
+
+def test_refresh_aggregates_on_read_pool():
+    with SessionLocal() as db:
+        init_analytics(db)
+        db.add_all(Proposal(title=f"Analytics {i}", description="", status="Refresh Test") for i in range(3))
+        db.commit()
+
+    written, read = [], []
+    stop_writer, stop_reader = record_statements(engine, written), record_statements(read_engine, read)
+    try:
+        refresher.refresh_now()
+    finally:
+        stop_writer()
+        stop_reader()
+
+    assert any("GROUP BY" in statement for statement in read)
+    assert written and all(statement.startswith("UPDATE") for statement in written)
+    with SessionLocal() as db:
+        assert read_snapshot(db)["proposalsByStatus"]["Refresh Test"] == 3
@@ -0,0 +1,25 @@
+"""A deactivated user loses access on their next request, not when their token expires."""
+from fastapi.testclient import TestClient
+
+import main
+from db import SessionLocal
+from models import User
+
+
+def test_inactive_user_is_rejected():
+    with TestClient(main.app) as client:
+        user_id = client.post(
+            "/register", json={"username": "leaver", "email": "leaver@example.com", "password": "pw", "role": "user"},
+        ).json()["id"]
+        token = client.post("/login", data={"username": "leaver", "password": "pw"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/notifications/unread_count", headers=headers).status_code == 200
+        assert client.get("/list_proposal", headers=headers).status_code == 200  # caches the principal
+
+        with SessionLocal() as db:
+            db.get(User, user_id).is_active = False
+            db.commit()
+
+        assert client.get("/notifications/unread_count", headers=headers).status_code == 401  # sync dependency
+        assert client.get("/list_proposal", headers=headers).status_code == 401  # async dependency
+        assert client.get("/notifications/stream", params={"token": token}).status_code == 401
@@ -0,0 +1,18 @@
+"""PasswordHasher: a dead worker process fails one request, then the pool is replaced."""
+import os
+
+import pytest
+
+from hashing import HashPoolBroken, PasswordHasher
+
+
+def test_broken_pool_is_replaced():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    try:
+        with pytest.raises(HashPoolBroken):
+            hasher._run(os._exit, 1)  # the worker process dies mid-job
+        hashed = hasher.hash("pw")
+        assert hasher.verify_and_update("pw", hashed)[0]
+        assert hasher.stats()["restarts"] == 1
+    finally:
+        hasher.shutdown()
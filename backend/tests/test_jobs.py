@@ -0,0 +1,115 @@
+"""JobManager: the per-user limit under concurrent submits, and claiming jobs once."""
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import count
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+import jobs
+from db import Base, SessionLocal, engine
+from jobs import RUNNING, SUCCEEDED, SUMMARY, JobLimitExceeded, JobManager
+from models import SummaryJob, User
+
+Base.metadata.create_all(bind=engine)
+_usernames = count()
+
+
+@pytest.fixture
+def user_id():
+    with SessionLocal() as db:
+        name = f"jobs_user_{next(_usernames)}"
+        user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        return user.id
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Replaces the model call with one that records the job params and waits for `release`."""
+    calls, release = [], threading.Event()
+
+    def fake_run_job(kind, params, cancel_event):
+        calls.append(params)
+        release.wait(5)
+        return "done"
+
+    monkeypatch.setattr(jobs, "_run_job", fake_run_job)
+    yield calls, release
+    release.set()
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def job_status(job_id):
+    with SessionLocal() as db:
+        return db.get(SummaryJob, job_id).status
+
+
+def test_concurrent_submits_stay_within_the_limit(user_id, runs):
+    manager = JobManager(workers=2, max_per_user=2)
+    accepted, refused, start = [], [], threading.Barrier(8)
+    # a connection per submit, as separate worker processes would have
+    other_processes = create_engine(engine.url, connect_args={"check_same_thread": False, "timeout": 30}, poolclass=NullPool)
+
+    def submit(i):
+        start.wait()
+        with Session(other_processes) as db:
+            try:
+                accepted.append(manager.submit(db, user_id, SUMMARY, {"n": i}).id)
+            except JobLimitExceeded:
+                refused.append(i)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (len(accepted), len(refused)) == (2, 6)
+    runs[1].set()
+    wait_for(lambda: all(job_status(job_id) == SUCCEEDED for job_id in accepted))
+    manager.shutdown()
+
+
+def test_job_enqueued_twice_runs_once(user_id, runs):
+    calls, release = runs
+    manager, other_process = JobManager(workers=2, max_per_user=2), JobManager(workers=2, max_per_user=2)
+    with SessionLocal() as db:
+        job_id = manager.submit(db, user_id, SUMMARY, {"n": 1}).id
+    other_process._enqueue(job_id)
+    wait_for(lambda: job_status(job_id) == RUNNING)
+    time.sleep(0.2)
+    release.set()
+    wait_for(lambda: job_status(job_id) == SUCCEEDED)
+    assert calls == [{"n": 1}]
+    manager.shutdown()
+    other_process.shutdown()
+
+
+def test_resume_requeues_only_stale_running_jobs(user_id, runs):
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        # one job another worker is still running, one left behind by a crash an hour ago
+        fresh = SummaryJob(user_id=user_id, kind=SUMMARY, status=RUNNING, params={"n": "fresh"}, started_at=now)
+        stale = SummaryJob(user_id=user_id, kind=SUMMARY, status=RUNNING, params={"n": "stale"},
+                           started_at=now - timedelta(hours=1))
+        db.add_all([fresh, stale])
+        db.commit()
+        fresh_id, stale_id = fresh.id, stale.id
+    manager = JobManager(workers=2, max_per_user=2)
+    calls, release = runs
+    release.set()
+    assert manager.resume_pending() >= 1
+    wait_for(lambda: job_status(stale_id) == SUCCEEDED)
+    assert job_status(fresh_id) == RUNNING
+    assert {"n": "fresh"} not in calls
+    manager.shutdown()
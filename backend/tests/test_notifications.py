@@ -0,0 +1,33 @@
+"""NotificationOutbox: a batch of drafts is written as one INSERT."""
+from datetime import datetime
+
+from sqlalchemy import event
+
+from db import Base, SessionLocal, engine
+from models import Notification
+from notifications import Draft, NotificationOutbox
+
+Base.metadata.create_all(bind=engine)
+
+
+def test_batch_is_one_insert():
+    outbox = NotificationOutbox(batch_size=100, flush_interval=0.1, dedupe_window=60)
+    now = datetime.utcnow()
+    drafts = [Draft(user_id=1000 + i % 5, message=f"batch note {i}", created_at=now) for i in range(50)]
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        outbox.enqueue(drafts)  # writer thread not started: flushes synchronously
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(inserts) == 1
+    assert outbox.stats()["written"] == 50
+    with SessionLocal() as db:
+        stored = {(n.user_id, n.message) for n in db.query(Notification).filter(Notification.message.like("batch note %"))}
+    assert stored == {(d.user_id, d.message) for d in drafts}
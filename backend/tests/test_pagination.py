@@ -0,0 +1,41 @@
+"""Keyset pagination: notifications page newest-first by (created_at, id)."""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import main
+from db import SessionLocal
+from models import Notification
+from pagination import NEXT_CURSOR_HEADER
+
+
+def test_notifications_page_by_created_at_then_id():
+    with TestClient(main.app) as client:
+        user_id = client.post(
+            "/register", json={"username": "pager", "email": "pager@example.com", "password": "pw", "role": "user"},
+        ).json()["id"]
+        token = client.post("/login", data={"username": "pager", "password": "pw"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # ids ascend while created_at does not (the outbox stamps drafts when they are queued), with ties
+        base = datetime(2026, 1, 1)
+        offsets = [5, 1, 3, 3, 0, 4, 3]
+        with SessionLocal() as db:
+            rows = [Notification(user_id=user_id, message=f"n{i}", created_at=base + timedelta(minutes=m))
+                    for i, m in enumerate(offsets)]
+            db.add_all(rows)
+            db.commit()
+            expected = [n.message for n in sorted(rows, key=lambda n: (n.created_at, n.id), reverse=True)]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/notifications", params=params, headers=headers)
+            assert response.status_code == 200
+            seen += [n["message"] for n in response.json()]
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+        assert seen == expected
+
+        assert client.get("/notifications", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
@@ -0,0 +1,117 @@
+"""map_reduce_summarize against the Ollama stub (benchmarks/ollama_stub.py), and streamed chunking."""
+import logging
+import threading
+import time
+
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from common import write_sample_pdf
+import pdf_data_read
+from llm_client import get_llm
+from metrics import registry
+from ollama_stub import start_stub_server
+from pdf_data_read import SummaryCancelled, generate_summary_from_pdf, iter_chunks, map_reduce_summarize
+
+
+class CountingLLM:
+    """Wraps a real LLM handle and records every prompt sent to the model."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt: str) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+        return self.llm.invoke(prompt)
+
+
+def stub_llm(latency: float) -> CountingLLM:
+    server = start_stub_server(latency=latency)
+    return CountingLLM(get_llm("llama3.2", 0.0, base_url=f"http://127.0.0.1:{server.server_port}"))
+
+
+def test_map_reduce_summarize():
+    llm = stub_llm(latency=0.0)
+    timings = {}
+    summary = map_reduce_summarize([f"chunk {i} " * 50 for i in range(6)], llm, max_concurrency=3, timings=timings)
+    assert summary.startswith("Stub summary of ")
+    assert timings["llm_calls"] == len(llm.prompts) > 6
+
+
+def test_cancel_returns_without_waiting_for_in_flight_calls():
+    llm = stub_llm(latency=2.0)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.perf_counter()
+    with pytest.raises(SummaryCancelled):
+        map_reduce_summarize([f"chunk {i}" for i in range(8)], llm, max_concurrency=2, cancel_event=cancel)
+    assert time.perf_counter() - started < 1.5
+    time.sleep(2.5)  # let the in-flight calls finish: queued ones must never have started
+    assert len(llm.prompts) == 2
+
+
+def test_cancelled_before_start():
+    llm = stub_llm(latency=0.0)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(SummaryCancelled):
+        map_reduce_summarize(["a", "b"], llm, cancel_event=cancel)
+    assert llm.prompts == []
+
+
+def test_chunks_stream_as_pages_arrive():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=50)
+    pages = [f"page {p} " + " ".join(f"word{p}-{i}" for i in range(120)) for p in range(6)]
+    consumed = []
+
+    def page_source():
+        for page in pages:
+            consumed.append(page)
+            yield page
+
+    chunks = iter_chunks(page_source(), splitter)
+    next(chunks)
+    assert len(consumed) < len(pages)
+    # same chunks as splitting the whole text at once
+    assert list(iter_chunks(pages, splitter)) == splitter.split_text("\n".join(pages))
+
+
+def test_map_starts_before_the_last_chunk():
+    llm = stub_llm(latency=0.0)
+    mapped_while_producing = []
+
+    def chunk_source():
+        for i in range(6):
+            yield f"chunk {i} " * 50
+        deadline = time.monotonic() + 5
+        while not llm.prompts and time.monotonic() < deadline:
+            time.sleep(0.01)
+        mapped_while_producing.append(len(llm.prompts))
+
+    summary = map_reduce_summarize(chunk_source(), llm, max_concurrency=3)
+    assert summary.startswith("Stub summary of ")
+    assert mapped_while_producing[0] > 0
+
+
+def test_generate_summary_from_pdf(tmp_path):
+    llm = stub_llm(latency=0.0)
+    timings = {}
+    pdf = write_sample_pdf(str(tmp_path / "sample.pdf"), pages=4)
+    summary = generate_summary_from_pdf(pdf, llm=llm, timings=timings)
+    assert summary.startswith("Stub summary of ")
+    assert timings["chunks"] > 1 and timings["llm_calls"] == len(llm.prompts)
+
+
+def test_summarize_pdf_reports_stage_timings(tmp_path, monkeypatch, caplog):
+    llm = stub_llm(latency=0.0)
+    monkeypatch.setattr(pdf_data_read, "get_llm", lambda *args, **kwargs: llm)
+    pdf = write_sample_pdf(str(tmp_path / "timed.pdf"), pages=4)
+    with caplog.at_level(logging.INFO, logger="pdf_data_read"):
+        pdf_data_read.summarize_pdf(pdf, use_cache=False)
+    assert "extract_seconds=" in caplog.text and "map_seconds=" in caplog.text
+    exported = registry.render()
+    for stage in ("extract", "map", "reduce"):
+        assert f'bidbuilder_pdf_summary_stage_duration_seconds_count{{stage="{stage}"}}' in exported
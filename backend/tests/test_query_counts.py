@@ -0,0 +1,6 @@
+"""Every endpoint stays within its SQL statement budget, independent of data size (check_query_counts.py)."""
+import check_query_counts
+
+
+def test_endpoints_within_query_budgets():
+    assert check_query_counts.check() == []
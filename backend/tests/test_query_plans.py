@@ -0,0 +1,6 @@
+"""The hot endpoints' statements use indexes and read keyset pages in index order (check_query_plans.py)."""
+import check_query_plans
+
+
+def test_hot_endpoints_use_indexes():
+    assert check_query_plans.check() == []
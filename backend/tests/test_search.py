@@ -0,0 +1,62 @@
+"""GET /search: owner filtering inside FTS5, bm25 ranking and the highlighted response shape."""
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import main
+from db import Base, SessionLocal
+from models import Proposal, ProposalSection
+from search import ensure_search_index
+
+
+def register(client, name: str) -> tuple:
+    user_id = client.post(
+        "/register", json={"username": name, "email": f"{name}@example.com", "password": "pw", "role": "manager"},
+    ).json()["id"]
+    token = client.post("/login", data={"username": name, "password": "pw"}).json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+def test_search_ranks_and_filters_by_owner():
+    with TestClient(main.app) as client:
+        alice, alice_headers = register(client, "search_alice")
+        bob, bob_headers = register(client, "search_bob")
+        with SessionLocal() as db:
+            in_title = Proposal(title="Zephyr rollout", description="plan", owner_id=alice)
+            in_body = Proposal(title="Other", description="the zephyr rollout plan in detail", owner_id=alice)
+            others = Proposal(title="Zephyr rollout", description="", owner_id=bob)
+            db.add_all([in_title, in_body, others])
+            db.flush()
+            section = ProposalSection(proposal_id=in_body.id, title="Zephyr timeline", content="weeks of zephyr work")
+            db.add(section)
+            db.commit()
+            ids = (in_title.id, in_body.id, others.id, section.id)
+
+        body = client.get("/search", params={"q": "zeph"}, headers=alice_headers).json()
+        assert set(body) == {"proposals", "sections", "next_offset"}
+        assert [hit["id"] for hit in body["proposals"]] == [ids[0], ids[1]]  # title matches outrank body matches
+        assert body["proposals"][0]["title"] == "<mark>Zephyr</mark> rollout"
+        assert "<mark>zephyr</mark>" in body["proposals"][1]["snippet"]
+        assert body["proposals"][0]["score"] > body["proposals"][1]["score"]
+        assert [(hit["id"], hit["proposal_id"]) for hit in body["sections"]] == [(ids[3], ids[1])]
+        assert [hit["id"] for hit in client.get("/search", params={"q": "zephyr"}, headers=bob_headers).json()["proposals"]] == [ids[2]]
+
+        # handing a proposal over moves it, and its sections, to the new owner's results
+        with SessionLocal() as db:
+            db.get(Proposal, ids[1]).owner_id = bob
+            db.commit()
+        bob_hits = client.get("/search", params={"q": "zephyr"}, headers=bob_headers).json()
+        assert {hit["id"] for hit in bob_hits["proposals"]} == {ids[1], ids[2]}
+        assert [hit["id"] for hit in bob_hits["sections"]] == [ids[3]]
+        assert client.get("/search", params={"q": "zephyr"}, headers=alice_headers).json()["sections"] == []
+
+
+def test_index_without_owner_column_is_rebuilt(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO proposals (id, title, description, owner_id) VALUES (1, 'Legacy plan', '', 7)"))
+        conn.execute(text("CREATE VIRTUAL TABLE search_index USING fts5(title, body, client_name, proposal_id UNINDEXED)"))
+    ensure_search_index(engine)
+    with engine.connect() as conn:
+        hits = conn.execute(text("SELECT rowid FROM search_index WHERE search_index MATCH 'owner : owner7 AND legacy'")).all()
+    assert hits == [(2,)]
@@ -0,0 +1,132 @@
+"""uploads.py – Streaming, size-bounded file uploads.
+
+The multipart body is parsed as it arrives: each network chunk of the file
+part is appended to a uniquely named temp file (off the event loop) and the
+upload is aborted with 413 as soon as it passes the configured limit, so a
+request never holds more than one chunk in memory.  CPU/LLM-heavy work on the
+stored file is handed to a dedicated worker pool.
+"""
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Tuple, TypeVar
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # older python-multipart releases
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from config import settings
+
+T = TypeVar("T")
+
+# Allowance for multipart boundaries and part headers on top of the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+_worker_pool = ThreadPoolExecutor(max_workers=settings.PDF_WORKERS, thread_name_prefix="pdf-worker")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _disposition_params(value: bytes) -> dict:
+    _, params = parse_options_header(value)
+    return {k.decode("latin-1"): v.decode("utf-8", "replace") for k, v in params.items()}
+
+
+async def stream_upload_to_tempfile(
+    request: Request,
+    field_name: str = "file",
+    max_bytes: Optional[int] = None,
+    suffix: str = "",
+) -> Tuple[Path, Optional[str]]:
+    """Stream the *field_name* part of a multipart request into a temp file.
+
+    Returns ``(path, client_filename)``; the caller owns (and must delete) the file.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+    fd, tmp_name = tempfile.mkstemp(prefix="bidbuilder-upload-", suffix=suffix, dir=settings.UPLOAD_TMP_DIR)
+    out = os.fdopen(fd, "wb")
+    state = {"header_field": b"", "header_value": b"", "headers": {}, "target": False, "found": False, "filename": None, "size": 0}
+    pending = []
+
+    def on_part_begin():
+        state.update(header_field=b"", header_value=b"", headers={}, target=False)
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state.update(header_field=b"", header_value=b"")
+
+    def on_headers_finished():
+        disposition = _disposition_params(state["headers"].get(b"content-disposition", b""))
+        if disposition.get("name") == field_name and not state["found"]:
+            state.update(target=True, found=True, filename=disposition.get("filename"))
+
+    def on_part_data(data, start, end):
+        if not state["target"]:
+            return
+        state["size"] += end - start
+        if state["size"] > max_bytes:
+            raise UploadTooLarge()
+        pending.append(bytes(data[start:end]))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if pending:
+                data = b"".join(pending)
+                pending.clear()
+                await run_in_threadpool(out.write, data)
+        parser.finalize()
+        await run_in_threadpool(out.close)
+    except UploadTooLarge:
+        out.close()
+        os.unlink(tmp_name)
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+    except BaseException:
+        out.close()
+        os.unlink(tmp_name)
+        raise
+
+    if not state["found"]:
+        os.unlink(tmp_name)
+        raise HTTPException(status_code=422, detail=f"Missing file field '{field_name}'")
+    return Path(tmp_name), state["filename"]
+
+
+async def run_in_worker_pool(fn: Callable[..., T], *args) -> T:
+    """Run blocking extraction/summarization work on the dedicated PDF worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_worker_pool, fn, *args)
+
+
+def shutdown_worker_pool() -> None:
+    _worker_pool.shutdown(wait=False, cancel_futures=True)
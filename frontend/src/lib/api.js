@@ -42,6 +42,39 @@ export const apiRequest = async (endpoint, options = {}) => {
   }
 }
 
+// Cursor-paginated list endpoints return one page per request and put the
+// cursor for the next page in this header (absent on the last page)
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+const PAGE_SIZE = 500
+
+// Fetch every page of a cursor-paginated list endpoint and return all rows
+export const apiRequestAllPages = async (endpoint) => {
+  const headers = createAuthHeaders()
+  const separator = endpoint.includes('?') ? '&' : '?'
+  const rows = []
+  let cursor = null
+
+  try {
+    do {
+      const query = `limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '')
+      const response = await fetch(`${API_BASE_URL}${endpoint}${separator}${query}`, { headers })
+      const data = await response.json()
+
+      if (!response.ok) {
+        throw new Error(data.detail || `HTTP error! status: ${response.status}`)
+      }
+
+      rows.push(...data)
+      cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    } while (cursor)
+
+    return rows
+  } catch (error) {
+    console.error('API request failed:', error)
+    throw error
+  }
+}
+
 // Auth API functions
 export const authAPI = {
   // Login
@@ -79,7 +112,7 @@ export const authAPI = {
 export const proposalsAPI = {
   // Get all proposals
   getAll: async () => {
-    return apiRequest('/list_proposal')
+    return apiRequestAllPages('/list_proposal')
   },
 
   // Get single proposal
@@ -135,7 +168,7 @@ export const proposalsAPI = {
 
   // Get chat messages for a proposal
   getChatMessages: async (proposalId) => {
-    return apiRequest(`/proposals/${proposalId}/chat`)
+    return apiRequestAllPages(`/proposals/${proposalId}/chat`)
   },
 
   // Post a new chat message for a proposal
@@ -151,7 +184,7 @@ export const proposalsAPI = {
 export const templatesAPI = {
   // Get all templates
   getAll: async () => {
-    return apiRequest('/templates')
+    return apiRequestAllPages('/templates')
   },
 
   // Create template
@@ -183,7 +216,7 @@ export const analyticsAPI = {
 export const notificationsAPI = {
   // Get all notifications
   getAll: async () => {
-    return apiRequest('/notifications')
+    return apiRequestAllPages('/notifications')
   },
 
   // Mark notification as read (you might want to add this endpoint)